@@ -0,0 +1,135 @@
+# batch_analysis.py
+"""Fase 3 por lotes: analiza muchos `*_following_counts.csv` (o `.parquet`) en paralelo y sin ventanas.
+
+Uso:  python batch_analysis.py "*_following_counts.csv" [otros.csv ...] [--workers 8]
+                               [--output-dir graficos] [--summary benford_resumen.csv]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+COUNTS_SUFFIXES = ("_following_counts.csv", "_following_counts.parquet")
+DEFAULT_SUMMARY_CSV = "benford_resumen.csv"
+
+
+def account_name(counts_csv: str) -> str:
+    """Cuenta objetivo a partir del nombre del archivo (`<cuenta>_following_counts.csv` o `.parquet`)."""
+    name = os.path.basename(counts_csv)
+    for suffix in COUNTS_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return os.path.splitext(name)[0]
+
+
+def expand_inputs(patterns: list[str]) -> list[str]:
+    """Archivos y globs → lista ordenada de archivos sin duplicados."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(match for match in matches if match not in paths)
+    return paths
+
+
+def _init_worker():
+    # Backend sin pantalla antes de dibujar nada; también vale si pyplot ya estaba importado
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def analyze_one(counts_csv: str, graph_filename: str, streaming: bool = False, dpi: int = 300) -> dict:
+    """Analiza un archivo en el proceso actual y devuelve una fila del resumen (sin imprimir nada)."""
+    from data_analyzer import DataAnalyzer
+
+    row = {'cuenta': account_name(counts_csv), 'archivo': counts_csv, 'grafico': graph_filename}
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = DataAnalyzer(counts_csv, show_plot=False, dpi=dpi)
+            if streaming:
+                analysis = analyzer.analyze_streaming(graph_filename)
+            else:
+                analyzer.clean_and_prepare_data()
+                analysis = analyzer.analyze_and_plot_first_digit(graph_filename)
+    except Exception as e:
+        analysis = None
+        row['error'] = str(e)
+
+    row['segundos'] = round(time.perf_counter() - start, 3)
+    if analysis is None:
+        row.setdefault('error', "sin datos válidos")
+        row['grafico'] = None
+        return row
+    for name, test in analysis.tests.items():
+        row[f'{name}_n'] = test.n
+        row[f'{name}_mad'] = test.mad
+        row[f'{name}_conformidad'] = test.conformity
+        row[f'{name}_chi2_p'] = test.chi2_p
+        row[f'{name}_ks_p'] = test.ks_p
+    return row
+
+
+def analyze_many(inputs: list[str], output_dir: str = None, workers: int = None,
+                 summary_csv: str = DEFAULT_SUMMARY_CSV, streaming: bool = False, dpi: int = 300) -> pd.DataFrame:
+    """Analiza cada archivo de conteos en un pool de procesos y escribe un resumen por cuenta.
+
+    Cada proceso dibuja con el backend Agg y guarda `<cuenta>_benford_analysis.png` en
+    `output_dir` (por defecto, junto a su CSV). El tiempo total depende de los núcleos, no de las cuentas.
+    """
+    paths = expand_inputs(inputs)
+    if not paths:
+        print("No se encontró ningún archivo de conteos.")
+        return pd.DataFrame()
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    print(f"Analizando {len(paths)} archivos con {workers} proceso(s)...")
+
+    start_time = time.time()
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = {}
+        for path in paths:
+            graph = os.path.join(output_dir or os.path.dirname(path),
+                                 f"{account_name(path)}_benford_analysis.png")
+            futures[pool.submit(analyze_one, path, graph, streaming, dpi)] = path
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                row = future.result()
+            except Exception as e:
+                # Un proceso caído no debe tirar el lote entero
+                row = {'cuenta': account_name(futures[future]), 'archivo': futures[future], 'error': str(e)}
+            rows.append(row)
+            estado = f"❌ {row['error']}" if row.get('error') else row.get('primer_digito_conformidad')
+            print(f"[{done}/{len(paths)}] {row['cuenta']}: {estado}")
+
+    summary = pd.DataFrame(rows).sort_values('cuenta').reset_index(drop=True)
+    if summary_csv:
+        summary.to_csv(summary_csv, index=False)
+        print(f"\nResumen guardado en: {summary_csv}")
+
+    columns = [c for c in ('cuenta', 'primer_digito_n', 'primer_digito_mad', 'primer_digito_conformidad',
+                           'segundo_digito_mad', 'dos_primeros_mad') if c in summary.columns]
+    print(summary[columns].to_string(index=False))
+    print(f"Tiempo total del lote: {time.time() - start_time:.2f}s")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="archivos de conteos o globs")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, núcleos)")
+    parser.add_argument("--output-dir", default=None, help="carpeta de los gráficos")
+    parser.add_argument("--summary", default=DEFAULT_SUMMARY_CSV, help="CSV del resumen por cuenta")
+    parser.add_argument("--streaming", action="store_true", help="leer cada CSV por bloques")
+    parser.add_argument("--dpi", type=int, default=300)
+    args = parser.parse_args()
+    analyze_many(args.inputs, args.output_dir, args.workers, args.summary, args.streaming, args.dpi)
@@ -0,0 +1,31 @@
+# benchmarks/bench_benford.py
+"""Tiempo de `analyze_benford` (cuatro pruebas de dígitos + bootstrap) sobre conteos sintéticos.
+
+Uso:  python benchmarks/bench_benford.py [valores ...]      (por defecto 10M y 30M)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benford import analyze_benford  # noqa: E402
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000_000, 30_000_000]
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        # Log-uniforme entre 1 y 10^8: sigue la ley de Benford en los dígitos iniciales
+        values = (10 ** rng.uniform(0, 8, size)).astype(np.int64)
+        start = time.perf_counter()
+        analysis = analyze_benford(values, seed=0)
+        elapsed = time.perf_counter() - start
+        print(f"\n{size:,} valores: {elapsed:.2f}s ({size / elapsed:,.0f} valores/s)")
+        print(analysis.summary()[['n', 'chi2', 'chi2_p', 'mad', 'conformidad', 'ks_p', 'kuiper_p']].to_string())
+
+
+if __name__ == "__main__":
+    main()
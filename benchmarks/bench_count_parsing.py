@@ -0,0 +1,65 @@
+# benchmarks/bench_count_parsing.py
+"""Compara la conversión fila a fila (apply) con `parse_counts` y comprueba que dan lo mismo.
+
+Uso:  python benchmarks/bench_count_parsing.py [filas ...]      (por defecto 1M y 10M)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from count_parsing import convert_count_to_numeric, parse_counts  # noqa: E402
+
+
+def make_counts(n_rows: int, seed: int = 0) -> pd.Series:
+    """Mezcla realista de lo que escribe la Fase 2: números con separadores, K/M, centinelas y texto."""
+    rng = np.random.default_rng(seed)
+    base = np.exp(rng.uniform(0, np.log(5e7), n_rows)).astype(np.int64) + 1
+    kind = rng.choice(6, size=n_rows, p=[0.55, 0.15, 0.12, 0.05, 0.10, 0.03])
+    as_text = base.astype(str).astype(object)
+
+    thousands = kind == 1
+    as_text[thousands] = [f"{v:,}" for v in base[thousands]]
+    kilo = kind == 2
+    as_text[kilo] = [f"{v / 1000:.1f}K" for v in base[kilo]]
+    mega = kind == 3
+    as_text[mega] = [f"{v / 1e6:.2f}M" for v in base[mega]]
+    sentinel = kind == 4
+    as_text[sentinel] = rng.choice(['PRIVADA', 'NO_EXISTE', 'NO_ENCONTRADO', 'ERROR'], size=sentinel.sum())
+    texty = kind == 5
+    as_text[texty] = [f"{v} seguidores" for v in base[texty]]
+    return pd.Series(as_text).astype('string').astype(object if pd.__version__ < '3' else 'str')
+
+
+def check_equivalence(values: pd.Series):
+    expected = values.map(convert_count_to_numeric).astype('float64').to_numpy()
+    got = parse_counts(values).to_numpy()
+    if not np.array_equal(expected, got, equal_nan=True):
+        bad = np.flatnonzero(~((expected == got) | (np.isnan(expected) & np.isnan(got))))
+        raise AssertionError(f"{len(bad)} filas distintas, p. ej. {values.iloc[bad[:5]].tolist()}")
+
+
+def bench(n_rows: int):
+    values = make_counts(n_rows)
+    check_equivalence(values.iloc[:200_000])
+
+    start = time.perf_counter()
+    values.apply(convert_count_to_numeric)
+    slow = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parse_counts(values)
+    fast = time.perf_counter() - start
+
+    print(f"{n_rows:>12,} filas   apply: {slow:7.2f}s   parse_counts: {fast:6.2f}s   "
+          f"aceleración: x{slow / fast:.1f}")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+    for size in sizes:
+        bench(size)
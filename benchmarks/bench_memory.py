@@ -0,0 +1,97 @@
+# benchmarks/bench_memory.py
+"""Memoria de Chromium a lo largo de una Fase 2 larga contra el Instagram falso, sin reciclar y
+reciclando páginas y contexto (PageRecycler). Muestrea el RSS del navegador cada --every
+navegaciones y compara el primer y el último tramo: con reciclado, la curva debe quedar plana.
+
+Necesita psutil y `playwright install chromium`.
+
+Uso:  python benchmarks/bench_memory.py [--profiles 50000] [--concurrency 4] [--every 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_offline import UNTHROTTLED  # noqa: E402
+from browser_recycler import BrowserMemoryMonitor  # noqa: E402
+from fake_instagram import FakeInstagram, followee_name  # noqa: E402
+from rate_controller import RateController  # noqa: E402
+
+SCENARIOS = [
+    ("sin reciclar", {'page_navigations': 0, 'context_navigations': 0, 'memory_limit_mb': 0}),
+    ("reciclando", {'page_navigations': 200, 'context_navigations': 2000, 'memory_limit_mb': 1500}),
+]
+
+
+class RecordingMonitor(BrowserMemoryMonitor):
+    """Guarda cada muestra con el momento en que se tomó."""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    def sample(self):
+        sample = super().sample()
+        if sample:
+            self.history.append((time.perf_counter(), sample))
+        return sample
+
+
+def run_scenario(fake: FakeInstagram, workdir: str, usernames: list[str], concurrency: int, every: int,
+                 limits: dict) -> tuple:
+    from profile_scraper import ProfileScraper
+
+    monitor = RecordingMonitor()
+    scraper = ProfileScraper("bench", "bench", session_file=os.path.join(workdir, "sesion.json"),
+                             base_url=fake.url, rate_controller=RateController(**UNTHROTTLED),
+                             recycle_limits=dict(limits, memory_check_every=every, monitor=monitor))
+    start = time.perf_counter()
+    scraper.scrape_follower_counts(usernames, os.path.join(workdir, "conteos.csv"), concurrency=concurrency)
+    return time.perf_counter() - start, monitor.history, sum(scraper.recycler.recycled.values())
+
+
+def _tramo(history: list, first: bool) -> float:
+    # Media del primer / último décimo de las muestras
+    size = max(1, len(history) // 10)
+    part = history[:size] if first else history[-size:]
+    return sum(sample['navegador_mb'] for _, sample in part) / len(part)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--every", type=int, default=500, help="navegaciones entre muestras de memoria")
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--padding-kb", type=int, default=200, help="peso extra de cada perfil")
+    args = parser.parse_args()
+
+    if not BrowserMemoryMonitor().available:
+        sys.exit("Este benchmark necesita psutil: pip install psutil")
+
+    usernames = [followee_name(i) for i in range(args.profiles)]
+    with FakeInstagram(args.profiles, args.latency_ms, page_padding_kb=args.padding_kb) as fake:
+        for label, limits in SCENARIOS:
+            with tempfile.TemporaryDirectory() as workdir:
+                seconds, history, recycled = run_scenario(fake, workdir, usernames, args.concurrency,
+                                                          args.every, limits)
+            if not history:
+                print(f"{label}: sin muestras (¿menos de {args.every} navegaciones?)")
+                continue
+            peak = max(sample['navegador_mb'] for _, sample in history)
+            start_mb, end_mb = _tramo(history, True), _tramo(history, False)
+            print(f"\n{label}: {args.profiles} perfiles en {seconds:.0f}s, {recycled} reciclados")
+            print(f"   navegador: inicio {start_mb:.0f} MB → final {end_mb:.0f} MB "
+                  f"({end_mb - start_mb:+.0f} MB), pico {peak:.0f} MB")
+            for index in range(0, len(history), max(1, len(history) // 10)):
+                _, sample = history[index]
+                print(f"   muestra {index + 1:>4}: {sample['navegador_mb']:7.0f} MB "
+                      f"(renderers {sample['renderers_mb']:.0f} MB, {sample['procesos']} procesos)")
+
+
+if __name__ == "__main__":
+    main()
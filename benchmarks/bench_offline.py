@@ -0,0 +1,172 @@
+# benchmarks/bench_offline.py
+"""Mide las tres fases contra el Instagram falso local (benchmarks/fake_instagram.py).
+
+Informa usuarios/s de la Fase 1, perfiles/s y latencia p95 de la Fase 2, y filas/s con pico de
+memoria (RSS) de la Fase 3. Sirve de línea base repetible para comparar cada cambio de rendimiento.
+
+Uso:  python benchmarks/bench_offline.py [--followees 300] [--latency-ms 50] [--concurrency 4]
+                                         [--phases 1 2 3] [--rows 1000000] [--fetch-mode http]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_instagram import FakeInstagram, TARGET_ACCOUNT  # noqa: E402
+from rate_controller import RateController  # noqa: E402
+
+# Ritmo prácticamente sin freno: lo que se mide es la herramienta, no la pausa de cortesía
+UNTHROTTLED = {'initial_rate': 1000.0, 'max_rate': 1000.0, 'burst': 1000.0, 'max_in_flight': 64}
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB; macOS, en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_phase_1(fake: FakeInstagram, workdir: str, limit: int, capture_network: bool) -> dict:
+    from browser_session import BrowserSession
+    from followers_downloader import FollowersDownloader
+
+    output_csv = os.path.join(workdir, "seguidos.csv")
+
+    async def run():
+        session = BrowserSession("bench", "bench", session_file=os.path.join(workdir, "sesion.json"),
+                                 base_url=fake.url)
+        downloader = FollowersDownloader("bench", "bench", capture_network=capture_network,
+                                         rate_controller=RateController(**UNTHROTTLED), session=session)
+        try:
+            start = time.perf_counter()
+            await session.login()
+            login_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            await downloader.download_followers(TARGET_ACCOUNT, limit, output_csv)
+            return login_seconds, time.perf_counter() - start
+        finally:
+            await downloader.close()
+            await session.close()
+
+    login_seconds, elapsed = asyncio.run(run())
+    with open(output_csv, encoding="utf-8") as file:
+        users = sum(1 for _ in file) - 1
+    return {'usuarios': users, 'segundos': elapsed, 'login_s': login_seconds,
+            'usuarios_s': users / elapsed if elapsed else float('nan'), 'csv': output_csv}
+
+
+def bench_phase_2(fake: FakeInstagram, workdir: str, usernames: list[str], concurrency: int,
+                  fetch_mode: str, lean: bool) -> dict:
+    from profile_scraper import ProfileScraper
+
+    output_csv = os.path.join(workdir, "conteos.csv")
+    scraper = ProfileScraper("bench", "bench", session_file=os.path.join(workdir, "fase2.json"),
+                             fetch_mode=fetch_mode, lean=lean, base_url=fake.url,
+                             rate_controller=RateController(**UNTHROTTLED))
+    start = time.perf_counter()
+    scraper.scrape_follower_counts(usernames, output_csv, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    latency = scraper.wait_stats.summary().get('perfil', {})
+    return {'perfiles': len(usernames), 'segundos': elapsed,
+            'perfiles_s': len(usernames) / elapsed if elapsed else float('nan'),
+            'p50_ms': latency.get('p50', float('nan')) * 1000,
+            'p95_ms': latency.get('p95', float('nan')) * 1000}
+
+
+def _phase_3_child(csv_path: str, streaming: bool, results):
+    # Proceso aparte para que el pico de RSS sea solo el de la Fase 3
+    import matplotlib
+    matplotlib.use("Agg")
+    from data_analyzer import DataAnalyzer
+
+    graph = os.path.join(os.path.dirname(csv_path), "benford.png")
+    start = time.perf_counter()
+    analyzer = DataAnalyzer(csv_path)
+    if streaming:
+        analyzer.analyze_streaming(graph)
+    else:
+        analyzer.clean_and_prepare_data()
+        analyzer.analyze_and_plot_first_digit(graph)
+    results.put({'segundos': time.perf_counter() - start, 'rss_mb': _peak_rss_mb()})
+
+
+def bench_phase_3(workdir: str, rows: int, streaming: bool) -> dict:
+    from bench_count_parsing import make_counts
+    import pandas as pd
+
+    csv_path = os.path.join(workdir, "conteos_fase3.csv")
+    counts = make_counts(rows)
+    pd.DataFrame({'username': [f"u{i}" for i in range(rows)], 'followers_count': counts}) \
+        .to_csv(csv_path, index=False)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    child = context.Process(target=_phase_3_child, args=(csv_path, streaming, results))
+    child.start()
+    outcome = results.get()
+    child.join()
+    outcome.update(filas=rows, filas_s=rows / outcome['segundos'])
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phases", type=int, nargs="+", default=[1, 2, 3], choices=[1, 2, 3])
+    parser.add_argument("--followees", type=int, default=300, help="tamaño de la lista de seguidos")
+    parser.add_argument("--profiles", type=int, default=None,
+                        help="perfiles a visitar en la Fase 2 (por defecto, toda la lista)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--throttle-ratio", type=float, default=0.0, help="fracción de respuestas 429")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fetch-mode", choices=["browser", "http"], default="browser")
+    parser.add_argument("--lean", action="store_true")
+    parser.add_argument("--capture-network", action="store_true")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="filas del CSV de la Fase 3")
+    parser.add_argument("--streaming", action="store_true", help="Fase 3 por bloques")
+    args = parser.parse_args()
+
+    from fake_instagram import followee_name
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, \
+            FakeInstagram(args.followees, args.latency_ms, args.jitter_ms, args.throttle_ratio,
+                          page_padding_kb=50) as fake:
+        print(f"Instagram falso en {fake.url}: {args.followees} seguidos, "
+              f"{args.latency_ms:.0f}±{args.jitter_ms:.0f} ms por petición")
+
+        usernames = [followee_name(i) for i in range(args.followees)]
+        if 1 in args.phases:
+            results[1] = bench_phase_1(fake, workdir, args.followees, args.capture_network)
+            with open(results[1]['csv'], encoding="utf-8") as file:
+                usernames = [line.split(",")[0] for line in file.read().splitlines()[1:]]
+        if 2 in args.phases:
+            results[2] = bench_phase_2(fake, workdir, usernames[:args.profiles], args.concurrency,
+                                       args.fetch_mode, args.lean)
+        if 3 in args.phases:
+            results[3] = bench_phase_3(workdir, args.rows, args.streaming)
+
+    print("\n=== Resultados ===")
+    if 1 in results:
+        r = results[1]
+        print(f"Fase 1: {r['usuarios']} usuarios en {r['segundos']:.2f}s → {r['usuarios_s']:.1f} usuarios/s "
+              f"(login {r['login_s']:.2f}s)")
+    if 2 in results:
+        r = results[2]
+        print(f"Fase 2: {r['perfiles']} perfiles en {r['segundos']:.2f}s → {r['perfiles_s']:.2f} perfiles/s; "
+              f"latencia p50 {r['p50_ms']:.0f} ms, p95 {r['p95_ms']:.0f} ms "
+              f"(concurrencia {args.concurrency}, modo {args.fetch_mode})")
+    if 3 in results:
+        r = results[3]
+        print(f"Fase 3: {r['filas']} filas en {r['segundos']:.2f}s → {r['filas_s']:,.0f} filas/s; "
+              f"pico RSS {r['rss_mb']:.0f} MB ({'por bloques' if args.streaming else 'en memoria'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_parquet.py
+"""Compara el CSV de conteos con su Parquet: tamaño en disco, tiempo de carga para la Fase 3 y
+análisis por bloques, y comprueba que ambos dan el mismo resultado de Benford.
+
+Uso:  python benchmarks/bench_parquet.py [filas ...]      (por defecto 1M y 10M)
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib  # noqa: E402
+matplotlib.use("Agg")
+
+from bench_count_parsing import make_counts  # noqa: E402
+from columnar_store import csv_to_parquet  # noqa: E402
+from data_analyzer import DataAnalyzer  # noqa: E402
+
+
+def _timed_load(path: str):
+    analyzer = DataAnalyzer(path, show_plot=False)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.clean_and_prepare_data()
+    return time.perf_counter() - start, analyzer.df['followers_numeric']
+
+
+def _timed_streaming(path: str, graph: str):
+    analyzer = DataAnalyzer(path, show_plot=False)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analysis = analyzer.analyze_streaming(graph)
+    return time.perf_counter() - start, analysis
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            csv_path = os.path.join(workdir, "conteos.csv")
+            pd.DataFrame({'username': [f"u{i}" for i in range(rows)], 'followers_count': make_counts(rows)}) \
+                .to_csv(csv_path, index=False)
+            start = time.perf_counter()
+            parquet_path = csv_to_parquet(csv_path)
+            convert_seconds = time.perf_counter() - start
+
+            csv_load, csv_counts = _timed_load(csv_path)
+            parquet_load, parquet_counts = _timed_load(parquet_path)
+            assert csv_counts.reset_index(drop=True).equals(parquet_counts.reset_index(drop=True)), \
+                "El CSV y el Parquet no dan los mismos conteos"
+
+            graph = os.path.join(workdir, "benford.png")
+            csv_stream, csv_analysis = _timed_streaming(csv_path, graph)
+            parquet_stream, parquet_analysis = _timed_streaming(parquet_path, graph)
+            # El intervalo bootstrap es aleatorio; todo lo demás tiene que coincidir
+            without_ci = [{name: {k: v for k, v in test.items() if k != 'mad_ic'} for name, test in
+                           analysis.to_dict().items()} for analysis in (csv_analysis, parquet_analysis)]
+            assert without_ci[0] == without_ci[1], "Los análisis no coinciden"
+
+            csv_mb = os.path.getsize(csv_path) / 1e6
+            parquet_mb = os.path.getsize(parquet_path) / 1e6
+            print(f"\n{rows:,} filas (conversión a Parquet: {convert_seconds:.2f}s)")
+            print(f"  tamaño:          CSV {csv_mb:8.1f} MB   Parquet {parquet_mb:8.1f} MB   "
+                  f"({csv_mb / parquet_mb:.1f}x)")
+            print(f"  carga Fase 3:    CSV {csv_load:8.2f} s    Parquet {parquet_load:8.2f} s    "
+                  f"({csv_load / parquet_load:.1f}x)")
+            print(f"  por bloques:     CSV {csv_stream:8.2f} s    Parquet {parquet_stream:8.2f} s    "
+                  f"({csv_stream / parquet_stream:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_startup.py
+"""Tiempo de arranque de main_app: lo que costaba importar todo de entrada frente a las
+importaciones por fase. Cada medida es un intérprete nuevo (mediana de varias ejecuciones,
+descontando el arranque de Python vacío).
+
+Uso:  python benchmarks/bench_startup.py [--runs 7]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lo que importaba main_app al cargarse antes de las importaciones por fase (data_analyzer traía pyplot)
+EAGER_IMPORTS = ("followers_downloader, profile_scraper, data_analyzer, count_cache, sharded_scraper, "
+                 "pipeline, rate_controller, metrics, columnar_store, results_store, matplotlib.pyplot")
+SCENARIOS = [
+    ("todo de entrada (antes)", f"import {EAGER_IMPORTS}"),
+    ("main_app (ahora)", "import main_app"),
+    ("main_app + Fase 3", "import main_app, data_analyzer"),
+    ("main_app + Fase 2", "import main_app, profile_scraper, sharded_scraper, count_cache"),
+    ("main_app + Fase 1", "import main_app, followers_downloader"),
+]
+
+
+def _median_seconds(code: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    _median_seconds(f"import {EAGER_IMPORTS}", 1)  # calienta la caché de disco y los .pyc
+    baseline = _median_seconds("pass", args.runs)
+    print(f"Python vacío: {baseline * 1000:.0f} ms (descontado)\n")
+    eager = None
+    for label, code in SCENARIOS:
+        seconds = _median_seconds(code, args.runs) - baseline
+        eager = eager or seconds
+        print(f"{label:<26} {seconds * 1000:7.0f} ms   ({seconds / eager:5.1%} de antes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/check_count_parsing.py
+"""Comprueba que `parse_counts` (por columnas) da exactamente lo mismo que `convert_count_to_numeric`
+(fila a fila) en los casos límite: decimales con coma, separadores de miles, "mil" / "mill",
+sufijos sueltos, vacíos y NaN, los centinelas de la Fase 2 y columnas de enteros o de floats.
+
+Cada caso se comprueba solo, mezclado con todos los demás en la misma columna y con varios tipos
+de columna (object, string y, si está pyarrow, string[pyarrow]).
+
+Uso:  python benchmarks/check_count_parsing.py
+Sale con código 1 si algún resultado difiere.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from count_parsing import SENTINEL_VALUES, convert_count_to_numeric, parse_counts  # noqa: E402
+
+TEXT_CASES = [
+    # Abreviados: coma decimal, punto decimal, "mil", millones y sufijos sin número
+    "1,2K", "12,3K", "12.3K", "1.2M", "1,2M", "1,234.5K", "1.234,5K", "5k", "2m", " 3.5 K ",
+    "12,3 mil", "1.234,5 mil", "3 mill", "2,5 millones", "K", "M", "mil", "mill", "k seguidores",
+    # Separadores de miles y texto alrededor
+    "1.234", "1,234", "1.234.567", "1,234,567", "1 234", "1234", " 42 ", "1234 seguidores",
+    "1.234 seguidores", "0", "000", "-5", "-1,2K", "1e3", "abc", "12a34",
+    # Unicode y números que no caben en int64
+    "１２３", "1\u00a0234", "99999999999999999999", "1" * 19,
+    # Vacíos y centinelas (también en minúsculas y con espacios)
+    "", " ", "LIMITADO", "ERROR", " limitado ", "error", "Error_Desconocido",
+] + [value for value in SENTINEL_VALUES if value]
+MISSING_CASES = [None, np.nan, pd.NA]
+INT_CASES = [1234, 0, -3, 1, 10 ** 12]
+FLOAT_CASES = [1234.0, 12.7, 0.5, 0.0, -2.5, np.nan, 1e6]
+
+
+def _string_dtypes() -> list:
+    dtypes = [object, "string"]
+    try:
+        pd.Series(["1"]).astype("string[pyarrow]")
+        dtypes.append("string[pyarrow]")
+    except ImportError:
+        pass
+    return dtypes
+
+
+def _mismatches(values: pd.Series) -> list:
+    expected = values.map(convert_count_to_numeric).astype("float64").to_numpy()
+    got = parse_counts(values).to_numpy()
+    if got.dtype != np.float64:
+        return [("(columna)", "float64", got.dtype)]
+    same = (expected == got) | (np.isnan(expected) & np.isnan(got))
+    return [(values.iloc[i], expected[i], got[i]) for i in np.flatnonzero(~same)]
+
+
+def columns():
+    """(descripción, columna) de cada comprobación."""
+    for dtype in _string_dtypes():
+        for case in TEXT_CASES:
+            yield f"{case!r} ({dtype})", pd.Series([case]).astype(dtype)
+        yield f"todos los textos y vacíos ({dtype})", pd.Series(TEXT_CASES + MISSING_CASES).astype(dtype)
+    yield "solo vacíos", pd.Series(MISSING_CASES, dtype=object)
+    yield "columna vacía", pd.Series([], dtype=object)
+    yield "enteros", pd.Series(INT_CASES)
+    yield "floats con NaN", pd.Series(FLOAT_CASES)
+    yield "enteros y floats", pd.Series(INT_CASES + FLOAT_CASES, dtype=object)
+    yield "números y textos mezclados", pd.Series(INT_CASES + FLOAT_CASES + TEXT_CASES + MISSING_CASES,
+                                                  dtype=object)
+
+
+def main():
+    failures = 0
+    checked = 0
+    for label, values in columns():
+        checked += 1
+        errors = _mismatches(values)
+        if errors:
+            failures += 1
+            print(f"❌ {label}")
+            for value, expected, got in errors[:5]:
+                print(f"   {value!r}: fila a fila {expected}, por columnas {got}")
+    print(f"{'✅' if not failures else '❌'} {checked - failures}/{checked} columnas idénticas")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/check_extraction.py
+"""Comprueba la extracción de conteos (profile_extraction) contra el corpus de perfiles guardados
+en benchmarks/fixtures/perfiles (expected.json dice el estado y la fuente esperados de cada uno).
+
+Cada página se carga en Chromium headless y se extrae de dos formas: la actual (un `evaluate` con
+og:description, JSON embebido y cabecera) y la anterior (`page.content()` y búsqueda de texto),
+para ver los aciertos de cada una, los bytes que vuelven a Python y el tiempo por perfil. Con
+--padding-kb se añade relleno al cuerpo para simular el DOM de varios MB de un perfil real.
+
+Uso:  python benchmarks/check_extraction.py [--padding-kb 2048] [--repeat 10]
+Sale con código 1 si algún perfil no da el estado o la fuente esperados.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profile_extraction import ProfileExtraction, read_signals  # noqa: E402
+from profile_scraper import FOLLOWERS_SELECTOR  # noqa: E402
+from rate_controller import looks_throttled  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "perfiles")
+
+
+def load_corpus() -> list[tuple[str, str, dict]]:
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as file:
+        expected = json.load(file)
+    corpus = []
+    for name, case in sorted(expected.items()):
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as file:
+            corpus.append((name, file.read(), case))
+    return corpus
+
+
+def _padded(html: str, padding_kb: int) -> str:
+    if not padding_kb:
+        return html
+    # Nodos de verdad (no un comentario): el DOM crece igual que con los posts de un perfil
+    block = '<div class="post"><span>lorem ipsum dolor sit amet</span></div>'
+    filler = block * (padding_kb * 1024 // len(block))
+    return html.replace("</body>", f"<section>{filler}</section></body>")
+
+
+async def legacy_status(page) -> tuple[str, int]:
+    """La extracción anterior: selector del title y, si falla, el HTML entero a Python."""
+    elem = await page.query_selector(FOLLOWERS_SELECTOR)
+    if elem:
+        title = await elem.get_attribute("title")
+        return title.replace(",", "").replace(".", "").strip(), len(title)
+    page_text = await page.content()
+    transferred = len(page_text.encode("utf-8"))
+    if looks_throttled(page_text):
+        return "LIMITADO", transferred
+    if "private" in page_text.lower():
+        return "PRIVADA", transferred
+    if "Sorry" in page_text or "Lo sentimos" in page_text:
+        return "NO_EXISTE", transferred
+    return "NO_ENCONTRADO", transferred
+
+
+async def current_status(page, username: str) -> tuple[ProfileExtraction, int]:
+    signals = await read_signals(page, username)
+    return ProfileExtraction.from_signals(signals), len(json.dumps(signals))
+
+
+async def _timed(repeat: int, extract) -> tuple[object, int, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result, transferred = await extract()
+    return result, transferred, (time.perf_counter() - start) / repeat
+
+
+async def run(padding_kb: int, repeat: int) -> int:
+    from playwright.async_api import async_playwright
+
+    failures = 0
+    totals = {"legacy_ok": 0, "ok": 0, "legacy_bytes": 0, "bytes": 0, "legacy_s": 0.0, "s": 0.0}
+    corpus = load_corpus()
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        print(f"{'perfil':<36} {'esperado':>10} {'antes':>14} {'ahora':>10} {'fuente':>9} "
+              f"{'bytes antes':>12} {'ahora':>6}")
+        for name, html, case in corpus:
+            await page.set_content(_padded(html, padding_kb))
+            legacy, legacy_bytes, legacy_s = await _timed(repeat, lambda: legacy_status(page))
+            extraction, transferred, seconds = await _timed(
+                repeat, lambda: current_status(page, case["username"]))
+
+            ok = extraction.status == case["estado"] and extraction.source == case["fuente"]
+            failures += not ok
+            totals["legacy_ok"] += legacy == case["estado"]
+            totals["ok"] += ok
+            totals["legacy_bytes"] += legacy_bytes
+            totals["bytes"] += transferred
+            totals["legacy_s"] += legacy_s
+            totals["s"] += seconds
+            mark = "✅" if ok else "❌"
+            print(f"{name:<36} {case['estado']:>10} {legacy:>14} {extraction.status:>10} "
+                  f"{extraction.source:>9} {legacy_bytes:>12,} {transferred:>6} {mark}")
+        await browser.close()
+
+    n = len(corpus)
+    print(f"\nAciertos: antes {totals['legacy_ok']}/{n}, ahora {totals['ok']}/{n}")
+    print(f"Bytes devueltos a Python: antes {totals['legacy_bytes']:,}, ahora {totals['bytes']:,}")
+    print(f"Extracción por perfil: antes {totals['legacy_s'] / n * 1000:.2f} ms, "
+          f"ahora {totals['s'] / n * 1000:.2f} ms (relleno {padding_kb} KB)")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--padding-kb", type=int, default=0,
+                        help="Relleno añadido al cuerpo de cada página (KB)")
+    parser.add_argument("--repeat", type=int, default=5, help="Extracciones por página para el tiempo medio")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.padding_kb, max(1, args.repeat))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# benchmarks/check_phase1_session.py
+"""Comprueba sin Chromium (con benchmarks/fake_browser.py) la Fase 1 y la sesión compartida:
+el scroll del modal se detiene cuando la lista deja de crecer o tras MAX_THROTTLED_SCROLLS
+respuestas 429 seguidas, el CSV que se escribe, la reutilización o el rechazo de la sesión
+guardada en el login, y el reciclado del contexto de BrowserSession.
+
+Uso:  python benchmarks/check_phase1_session.py
+Sale con código 1 si alguna comprobación falla.
+"""
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import session_store  # noqa: E402
+from browser_session import BrowserSession  # noqa: E402
+from fake_browser import FakeBrowser, FakeResponse, attach  # noqa: E402
+from followers_downloader import MAX_THROTTLED_SCROLLS, FollowersDownloader  # noqa: E402
+from metrics import MetricsRecorder  # noqa: E402
+from rate_controller import RateController  # noqa: E402
+from session_store import SESSION_CHECK_PATH, SESSION_COOKIE  # noqa: E402
+
+UNTHROTTLED = {'initial_rate': 1000.0, 'max_rate': 1000.0, 'burst': 1000.0, 'max_in_flight': 64}
+SAVED_STATE = {"cookies": [{"name": SESSION_COOKIE, "value": "guardada", "expires": -1}], "origins": []}
+FOLLOWING_API = "/api/v1/friendships/1/following/"
+
+
+def _new_session(workdir: str, browser: FakeBrowser) -> BrowserSession:
+    return BrowserSession("bench", browser.password, session_file=os.path.join(workdir, "sesion.json"),
+                          base_url=browser.base_url)
+
+
+def _read_csv(path: str) -> list[list[str]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+async def _download(workdir: str, browser: FakeBrowser, limit: int, capture_network: bool = False):
+    session = _new_session(workdir, browser)
+    await attach(session, browser, SAVED_STATE)
+    metrics = MetricsRecorder()
+    downloader = FollowersDownloader("bench", browser.password, session=session, metrics=metrics,
+                                     capture_network=capture_network,
+                                     rate_controller=RateController(**UNTHROTTLED))
+    output_csv = os.path.join(workdir, "seguidos.csv")
+    try:
+        await downloader.download_followers("objetivo", limit, output_csv)
+    finally:
+        await downloader.close()
+        await session.close()
+    return _read_csv(output_csv), metrics
+
+
+# ---------------------------
+# FASE 1: SCROLL DEL MODAL
+# ---------------------------
+def check_scroll_until_no_growth(workdir: str) -> list[str]:
+    browser = FakeBrowser()
+    browser.scroll_steps = [
+        {"usernames": ["ana", "beto"], "grew": True},
+        {"usernames": ["carla", "ana"], "grew": True},
+        {"usernames": ["dani"], "grew": False},
+        # No debería llegar a pedirse: la lista ya no creció
+        {"usernames": ["nunca"], "grew": True},
+    ]
+    browser.final_harvest = ["eva", "beto"]
+    rows, _ = asyncio.run(_download(workdir, browser, limit=100))
+    errors = []
+    if len(browser.scroll_steps) != 1:
+        errors.append(f"scrolls de más o de menos: quedan {len(browser.scroll_steps)} pasos")
+    expected = [["username"], ["ana"], ["beto"], ["carla"], ["dani"], ["eva"]]
+    if rows != expected:
+        errors.append(f"CSV {rows}, esperado {expected}")
+    return errors
+
+
+def check_scroll_limit(workdir: str) -> list[str]:
+    browser = FakeBrowser()
+    browser.scroll_steps = [{"usernames": ["ana", "beto"], "grew": True},
+                            {"usernames": ["carla", "dani"], "grew": True},
+                            {"usernames": ["eva"], "grew": True}]
+    rows, _ = asyncio.run(_download(workdir, browser, limit=3))
+    errors = []
+    if rows != [["username"], ["ana"], ["beto"], ["carla"]]:
+        errors.append(f"el límite no corta la lista: {rows}")
+    if len(browser.scroll_steps) != 1:
+        errors.append(f"siguió haciendo scroll tras llegar al límite: quedan {len(browser.scroll_steps)} pasos")
+    return errors
+
+
+def check_throttled_streak(workdir: str) -> list[str]:
+    browser = FakeBrowser()
+    url = f"{browser.base_url}{FOLLOWING_API}"
+    first_page = FakeResponse(200, url, {"users": [{"username": "ana", "follower_count": 120},
+                                                   {"username": "beto"}], "next_max_id": "12"})
+    throttled = {"usernames": [], "grew": False, "responses": [FakeResponse(429, url)]}
+    browser.scroll_steps = [{"usernames": [], "grew": True, "responses": [first_page]}] + \
+        [dict(throttled) for _ in range(MAX_THROTTLED_SCROLLS + 1)]
+    rows, metrics = asyncio.run(_download(workdir, browser, limit=100, capture_network=True))
+    errors = []
+    if len(browser.scroll_steps) != 1:
+        errors.append(f"no se detuvo tras {MAX_THROTTLED_SCROLLS} scrolls con 429: "
+                      f"quedan {len(browser.scroll_steps)} pasos")
+    retries = metrics.counter_value('reintentos_total', tipo='scroll_429')
+    if retries != MAX_THROTTLED_SCROLLS:
+        errors.append(f"reintentos por 429: {retries}, esperados {MAX_THROTTLED_SCROLLS}")
+    expected = [["username", "followers_count"], ["ana", "120"], ["beto", ""]]
+    if rows != expected:
+        errors.append(f"CSV {rows}, esperado {expected}")
+    return errors
+
+
+def check_throttled_then_recovers(workdir: str) -> list[str]:
+    # Menos 429 seguidos que el máximo: se reintenta y la lista sigue
+    browser = FakeBrowser()
+    url = f"{browser.base_url}{FOLLOWING_API}"
+    throttled = {"usernames": [], "grew": False, "responses": [FakeResponse(429, url)]}
+    browser.scroll_steps = [dict(throttled) for _ in range(MAX_THROTTLED_SCROLLS - 1)] + [
+        {"usernames": [], "grew": True, "responses": [FakeResponse(200, url, {"users": [{"username": "ana"}]})]},
+    ]
+    rows, _ = asyncio.run(_download(workdir, browser, limit=100, capture_network=True))
+    if rows != [["username", "followers_count"], ["ana", ""]]:
+        return [f"la racha de 429 no se reinició: {rows}"]
+    return []
+
+
+# ---------------------------
+# LOGIN Y SESIÓN GUARDADA
+# ---------------------------
+async def _login(workdir: str, browser: FakeBrowser, password: str = None):
+    session = _new_session(workdir, browser)
+    if password is not None:
+        session.password = password
+    session_store.save_state(session.session_file, SAVED_STATE)
+    await attach(session, browser, session_store.load_state(session.session_file))
+    ok = await session.login(phase='1')
+    page = session.page
+    await session.close()
+    return ok, session, page
+
+
+def check_saved_session_reused(workdir: str) -> list[str]:
+    browser = FakeBrowser()
+    ok, session, page = asyncio.run(_login(workdir, browser))
+    errors = []
+    if not ok:
+        errors.append("la sesión guardada válida no se reutilizó")
+    if page.visits != [SESSION_CHECK_PATH.strip("/")] or page.filled:
+        errors.append(f"se rellenó el formulario o se visitó de más: {page.visits}, {page.filled}")
+    if session_store.load_state(session.session_file) != SAVED_STATE:
+        errors.append("se cambió el archivo de la sesión guardada")
+    return errors
+
+
+def check_saved_session_rejected(workdir: str) -> list[str]:
+    browser = FakeBrowser()
+    browser.session_valid = False
+    ok, session, page = asyncio.run(_login(workdir, browser))
+    errors = []
+    if not ok:
+        errors.append("tras rechazar la sesión guardada no se inició sesión con el formulario")
+    if page.filled.get('input[name="password"]') != browser.password:
+        errors.append("no se rellenó la contraseña")
+    saved = session_store.load_state(session.session_file) or {}
+    if [cookie["value"] for cookie in saved.get("cookies", [])] != ["nueva"]:
+        errors.append(f"no se guardó la sesión nueva: {saved}")
+    return errors
+
+
+def check_wrong_password(workdir: str) -> list[str]:
+    browser = FakeBrowser()
+    browser.session_valid = False
+    ok, session, _ = asyncio.run(_login(workdir, browser, password="otra"))
+    errors = []
+    if ok:
+        errors.append("el login con una contraseña incorrecta se dio por bueno")
+    if os.path.exists(session.session_file):
+        errors.append("quedó guardada la sesión rechazada")
+    return errors
+
+
+# ---------------------------
+# RECICLADO DEL CONTEXTO
+# ---------------------------
+async def _recycle(workdir: str):
+    browser = FakeBrowser()
+    session = _new_session(workdir, browser)
+    await attach(session, browser, SAVED_STATE)
+    errors = []
+
+    old_context = session.context
+    page = await session.new_page('2')
+    if not await session.recycle_context('2') or session.context is old_context:
+        errors.append("no se recicló el contexto de la Fase 2")
+    if not old_context.closed or not page.is_closed():
+        errors.append("el contexto anterior (o su página) quedó abierto")
+    if session.context.cookies != SAVED_STATE["cookies"]:
+        errors.append("el contexto nuevo perdió las cookies")
+
+    # Con una página de la Fase 1 abierta (tubería) no se toca el contexto
+    await session.acquire_page('1')
+    current = session.context
+    if await session.recycle_context('2') or session.context is not current:
+        errors.append("se recicló el contexto con una página de la Fase 1 abierta")
+    for phase_1_page in list(current.pages):
+        await phase_1_page.close()
+
+    # Navegador caído: se relanza y el contexto nuevo sale de la última sesión guardada
+    browser.connected = False
+    if not await session.recycle_context('2') or browser.launches != 1 or not browser.connected:
+        errors.append("no se relanzó el navegador caído")
+    if session.context.cookies != SAVED_STATE["cookies"]:
+        errors.append("tras relanzar, el contexto perdió las cookies")
+
+    await session.close()
+    if await session.recycle_context('2'):
+        errors.append("se recicló el contexto de una sesión cerrada")
+    return errors
+
+
+def check_recycle_context(workdir: str) -> list[str]:
+    return asyncio.run(_recycle(workdir))
+
+
+def main():
+    checks = [
+        ("scroll hasta que la lista deja de crecer", check_scroll_until_no_growth),
+        ("scroll hasta el límite de seguidos", check_scroll_limit),
+        (f"{MAX_THROTTLED_SCROLLS} scrolls con 429 seguidos detienen la lista", check_throttled_streak),
+        ("menos 429 seguidos: se reintenta", check_throttled_then_recovers),
+        ("sesión guardada reutilizada", check_saved_session_reused),
+        ("sesión guardada rechazada: login con formulario", check_saved_session_rejected),
+        ("contraseña incorrecta", check_wrong_password),
+        ("reciclado del contexto", check_recycle_context),
+    ]
+    failures = 0
+    for label, check in checks:
+        with tempfile.TemporaryDirectory() as workdir:
+            errors = check(workdir)
+        failures += bool(errors)
+        print(f"{'✅' if not errors else '❌'} {label}")
+        for error in errors:
+            print(f"   {error}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
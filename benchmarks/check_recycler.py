@@ -0,0 +1,119 @@
+# benchmarks/check_recycler.py
+"""Comprueba sin Chromium (con benchmarks/fake_browser.py) la vida de las páginas de la Fase 2:
+una página que cuelga se cierra y el worker sigue en otra, un renderer caído repite el mismo
+perfil, y las páginas y el contexto se reciclan conservando la sesión.
+
+Uso:  python benchmarks/check_recycler.py
+Sale con código 1 si alguna comprobación falla.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import results_store  # noqa: E402
+from browser_session import BrowserSession  # noqa: E402
+from fake_browser import FakeBrowser, attach  # noqa: E402
+from profile_scraper import ProfileScraper  # noqa: E402
+from rate_controller import RateController  # noqa: E402
+from session_store import SESSION_COOKIE  # noqa: E402
+
+UNTHROTTLED = {'initial_rate': 1000.0, 'max_rate': 1000.0, 'burst': 1000.0, 'max_in_flight': 64}
+SAVED_STATE = {"cookies": [{"name": SESSION_COOKIE, "value": "guardada", "expires": -1}], "origins": []}
+
+
+async def run_scrape(workdir: str, browser: FakeBrowser, usernames: list[str], concurrency: int = 1,
+                     recycle_limits: dict = None, profile_timeout: float = 5):
+    session = BrowserSession("bench", browser.password, session_file=os.path.join(workdir, "sesion.json"),
+                             base_url=browser.base_url)
+    await attach(session, browser, SAVED_STATE)
+    scraper = ProfileScraper("bench", browser.password, session=session, profile_timeout=profile_timeout,
+                             rate_controller=RateController(**UNTHROTTLED), recycle_limits=recycle_limits)
+    output_csv = os.path.join(workdir, "conteos.csv")
+    await scraper.scrape_follower_counts_async(usernames, output_csv, concurrency=concurrency)
+    await session.close()
+    return results_store.load_existing_results(output_csv), scraper
+
+
+def _pages(browser: FakeBrowser):
+    return [page for context in browser.contexts for page in context.pages]
+
+
+def check_hung_page(workdir: str, concurrency: int, hung_index: int) -> list[str]:
+    usernames = [f"u{i:03d}" for i in range(12)]
+    hung = usernames[hung_index]
+    browser = FakeBrowser()
+    browser.profiles[hung] = "hang"
+    results, _ = asyncio.run(run_scrape(workdir, browser, usernames, concurrency, profile_timeout=0.2))
+
+    errors = []
+    if results.get(hung) != "TIMEOUT":
+        errors.append(f"{hung} debería ser TIMEOUT y es {results.get(hung)}")
+    if any(not results.get(u, "").isdigit() for u in usernames if u != hung):
+        errors.append(f"perfiles sin conteo: {results}")
+    hung_pages = [page for page in _pages(browser) if hung in page.visits]
+    for page in hung_pages:
+        if page.visits[-1] != hung:
+            errors.append(f"la página colgada siguió usándose: {page.visits}")
+    # Al terminar, ninguna página abierta (tampoco la colgada)
+    if any(not page.is_closed() for page in _pages(browser)):
+        errors.append("quedaron páginas abiertas")
+    return errors
+
+
+def check_crash_retry(workdir: str) -> list[str]:
+    usernames = [f"u{i:03d}" for i in range(20)]
+    browser = FakeBrowser()
+    browser.profiles["u005"] = "crash"
+    browser.profiles["u013"] = "crash"
+    results, scraper = asyncio.run(run_scrape(workdir, browser, usernames, concurrency=3))
+    errors = []
+    if any(not results.get(u, "").isdigit() for u in usernames):
+        errors.append(f"un renderer caído dejó perfiles sin conteo: {results}")
+    if scraper.recycler.recycled[('pagina', 'caida')] != 2:
+        errors.append(f"reciclados por caída: {dict(scraper.recycler.recycled)}")
+    return errors
+
+
+def check_recycling(workdir: str) -> list[str]:
+    usernames = [f"u{i:03d}" for i in range(40)]
+    browser = FakeBrowser()
+    results, scraper = asyncio.run(run_scrape(
+        workdir, browser, usernames, concurrency=2,
+        recycle_limits={'page_navigations': 5, 'context_navigations': 15, 'memory_limit_mb': 0}))
+    errors = []
+    if any(not results.get(u, "").isdigit() for u in usernames):
+        errors.append(f"perfiles sin conteo: {results}")
+    if len(browser.contexts) < 3 or scraper.recycler.recycled[('contexto', 'navegaciones')] < 2:
+        errors.append(f"contextos: {len(browser.contexts)}, reciclados: {dict(scraper.recycler.recycled)}")
+    if any(context.cookies != SAVED_STATE["cookies"] for context in browser.contexts):
+        errors.append("un contexto reciclado perdió las cookies de la sesión")
+    # Sin contar la validación de la sesión guardada en la página del login
+    if max(sum(visit.startswith("u") for visit in page.visits) for page in _pages(browser)) > 5:
+        errors.append("una página superó el límite de navegaciones")
+    return errors
+
+
+def main():
+    checks = [
+        ("página colgada (worker 0, un worker)", lambda d: check_hung_page(d, 1, 0)),
+        ("página colgada (varios workers)", lambda d: check_hung_page(d, 3, 4)),
+        ("renderer caído: se repite el perfil", check_crash_retry),
+        ("reciclado de páginas y contexto", check_recycling),
+    ]
+    failures = 0
+    for label, check in checks:
+        with tempfile.TemporaryDirectory() as workdir:
+            errors = check(workdir)
+        failures += bool(errors)
+        print(f"{'✅' if not errors else '❌'} {label}")
+        for error in errors:
+            print(f"   {error}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
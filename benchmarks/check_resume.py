@@ -0,0 +1,142 @@
+# benchmarks/check_resume.py
+"""Comprueba sin Chromium (con benchmarks/fake_browser.py) que reanudar la Fase 2 sobre un CSV
+anterior no repite lo ya hecho y que el CSV compactado solo trae a los usuarios de la lista actual:
+los de una ejecución anterior que ya no se siguen no deben llegar a la Fase 3.
+
+Uso:  python benchmarks/check_resume.py
+Sale con código 1 si alguna comprobación falla.
+"""
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import results_store  # noqa: E402
+from browser_session import BrowserSession  # noqa: E402
+from fake_browser import FakeBrowser, attach  # noqa: E402
+from profile_scraper import ProfileScraper  # noqa: E402
+from rate_controller import RateController  # noqa: E402
+from sharded_scraper import merge_shard_results  # noqa: E402
+from session_store import SESSION_COOKIE  # noqa: E402
+
+UNTHROTTLED = {'initial_rate': 1000.0, 'max_rate': 1000.0, 'burst': 1000.0, 'max_in_flight': 64}
+SAVED_STATE = {"cookies": [{"name": SESSION_COOKIE, "value": "guardada", "expires": -1}], "origins": []}
+# CSV de una ejecución anterior: dos cuentas que ya no se siguen, una que quedó con error y una hecha
+PREVIOUS_ROWS = [("viejo1", "10"), ("a", "ERROR"), ("c", "30"), ("viejo2", "20")]
+USERNAMES = ["a", "b", "c"]
+EXPECTED_ROWS = [("a", "5"), ("b", "7"), ("c", "30")]
+
+
+def _write_previous(path: str):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["username", "followers_count"])
+        writer.writerows(PREVIOUS_ROWS)
+
+
+def _read_rows(path: str) -> list[tuple[str, str]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        return [(row["username"], row["followers_count"]) for row in csv.DictReader(file)]
+
+
+def _visits(browser: FakeBrowser) -> list[str]:
+    return sorted(visit for context in browser.contexts for page in context.pages
+                  for visit in page.visits if not visit.startswith("accounts"))
+
+
+async def _scraper(workdir: str, browser: FakeBrowser) -> ProfileScraper:
+    session = BrowserSession("bench", browser.password, session_file=os.path.join(workdir, "sesion.json"),
+                             base_url=browser.base_url)
+    await attach(session, browser, SAVED_STATE)
+    return ProfileScraper("bench", browser.password, session=session,
+                          rate_controller=RateController(**UNTHROTTLED))
+
+
+def check_resume_drops_stale_rows(workdir: str) -> list[str]:
+    output_csv = os.path.join(workdir, "conteos.csv")
+    _write_previous(output_csv)
+    browser = FakeBrowser()
+    browser.counts = {"a": 5, "b": 7}
+
+    async def run():
+        scraper = await _scraper(workdir, browser)
+        await scraper.scrape_follower_counts_async(USERNAMES, output_csv, resume=True)
+        await scraper.session.close()
+
+    asyncio.run(run())
+    errors = []
+    rows = _read_rows(output_csv)
+    if rows != EXPECTED_ROWS:
+        errors.append(f"CSV compactado {rows}, esperado {EXPECTED_ROWS}")
+    # "c" ya tenía conteo: no se vuelve a visitar
+    if _visits(browser) != ["a", "b"]:
+        errors.append(f"visitas {_visits(browser)}, esperadas ['a', 'b']")
+    return errors
+
+
+def check_stream_matches_listener(workdir: str) -> list[str]:
+    output_csv = os.path.join(workdir, "conteos.csv")
+    _write_previous(output_csv)
+    browser = FakeBrowser()
+    browser.counts = {"a": 5, "b": 7}
+    streamed = []
+
+    async def run():
+        scraper = await _scraper(workdir, browser)
+        source = asyncio.Queue()
+        for username in USERNAMES:
+            await source.put((username, None))
+        await source.put(None)
+        await scraper.scrape_stream(source, output_csv, listener=lambda username, count:
+                                    streamed.append((username, count)))
+        await scraper.session.close()
+
+    asyncio.run(run())
+    errors = []
+    rows = _read_rows(output_csv)
+    if rows != EXPECTED_ROWS:
+        errors.append(f"CSV compactado {rows}, esperado {EXPECTED_ROWS}")
+    if sorted(streamed) != sorted(rows):
+        errors.append(f"el CSV {rows} no coincide con lo que recibió el listener {streamed}")
+    if _visits(browser) != ["a", "b"]:
+        errors.append(f"visitas {_visits(browser)}, esperadas ['a', 'b']")
+    return errors
+
+
+def check_shard_merge(workdir: str) -> list[str]:
+    output_csv = os.path.join(workdir, "conteos.csv")
+    _write_previous(output_csv)
+    shard_csv = os.path.join(workdir, "shard0.csv")
+    with open(shard_csv, "w", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows([["username", "followers_count"], ["a", "5"], ["b", "7"], ["viejo3", "1"]])
+    existing = results_store.load_existing_results(output_csv)
+    merge_shard_results(USERNAMES, output_csv, ["a", "b"], [shard_csv], existing)
+    rows = _read_rows(output_csv)
+    if rows != EXPECTED_ROWS:
+        return [f"CSV unido {rows}, esperado {EXPECTED_ROWS}"]
+    return []
+
+
+def main():
+    checks = [
+        ("reanudar: el CSV compactado solo trae la lista actual", check_resume_drops_stale_rows),
+        ("en tubería: el CSV y el listener ven los mismos usuarios", check_stream_matches_listener),
+        ("shards: el CSV unido solo trae la lista actual", check_shard_merge),
+    ]
+    failures = 0
+    for label, check in checks:
+        with tempfile.TemporaryDirectory() as workdir:
+            errors = check(workdir)
+        failures += bool(errors)
+        print(f"{'✅' if not errors else '❌'} {label}")
+        for error in errors:
+            print(f"   {error}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
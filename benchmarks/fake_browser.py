@@ -0,0 +1,216 @@
+# benchmarks/fake_browser.py
+"""Navegador falso en memoria (navegador, contexto, página y modal) con la interfaz de Playwright
+que usa la herramienta, para comprobar sin Chromium el scroll de la Fase 1, el login con sesión
+guardada y el reciclado / reinicio de páginas de la Fase 2.
+
+`attach(session, browser)` lo conecta a una BrowserSession real (como si `start()` ya hubiera
+lanzado Chromium). El comportamiento se ajusta en el FakeBrowser: sesión guardada válida o no,
+contraseña correcta, perfiles que cuelgan o tumban el renderer y los scrolls del modal.
+"""
+import asyncio
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from session_store import SESSION_CHECK_PATH, SESSION_COOKIE
+
+
+class _Emitter:
+    def __init__(self):
+        self._handlers = {}
+
+    def on(self, event, handler):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, argument=None):
+        for handler in list(self._handlers.get(event, [])):
+            handler(argument)
+
+
+class FakeResponse:
+    def __init__(self, status: int = 200, url: str = "", payload: dict = None, headers: dict = None):
+        self.status = status
+        self.url = url
+        self.ok = 200 <= status < 300
+        self.headers = headers or {}
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+
+class FakeModal:
+    """Modal de seguidos: cada scroll consume el siguiente paso de `browser.scroll_steps`."""
+
+    def __init__(self, page):
+        self.page = page
+
+    async def evaluate(self, script, *args):
+        browser = self.page.context.browser
+        if not args:
+            # HARVEST_SCRIPT: lo que quede sin recoger al terminar
+            return list(browser.final_harvest)
+        step = browser.scroll_steps.pop(0) if browser.scroll_steps else {"usernames": [], "grew": False}
+        for response in step.get("responses", []):
+            self.page.emit("response", response)
+        return {"usernames": list(step.get("usernames", [])), "grew": step.get("grew", False)}
+
+
+class FakeKeyboard:
+    def __init__(self, page):
+        self.page = page
+
+    async def press(self, key):
+        browser = self.page.context.browser
+        if key == "Enter" and self.page.filled.get('input[name="password"]') == browser.password:
+            self.page.url = f"{browser.base_url}/"
+            self.page.context.cookies = [{"name": SESSION_COOKIE, "value": "nueva", "expires": -1}]
+
+
+class FakePage(_Emitter):
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+        self.url = "about:blank"
+        self.filled = {}
+        self.keyboard = FakeKeyboard(self)
+        self.visits = []
+        self._closed = False
+
+    def is_closed(self):
+        return self._closed
+
+    async def close(self):
+        if not self._closed:
+            self._closed = True
+            self.emit("close", self)
+
+    async def goto(self, url, wait_until=None):
+        browser = self.context.browser
+        path = url[len(browser.base_url):]
+        self.url = url
+        if path == SESSION_CHECK_PATH and not browser.session_valid:
+            self.url = f"{browser.base_url}/accounts/login/"
+        username = path.strip("/")
+        behavior = browser.profiles.get(username)
+        if behavior == "hang":
+            self.visits.append(username)
+            await asyncio.sleep(3600)
+        if behavior == "crash":
+            # Solo la primera vez: el reintento en una página nueva funciona
+            browser.profiles.pop(username)
+            self.emit("crash", self)
+            raise Exception("Target crashed")
+        self.visits.append(username)
+        return FakeResponse(200, self.url)
+
+    async def wait_for_selector(self, selector, timeout=None, state=None):
+        if "dialog" in selector:
+            return FakeModal(self)
+        if selector.startswith("xpath="):
+            # Pop-ups de después del login: no aparecen
+            raise PlaywrightTimeoutError(f"{selector} no aparece")
+        if selector.startswith("input") and "accounts/login" not in self.url:
+            raise PlaywrightTimeoutError(f"{selector} no aparece")
+        return None
+
+    async def wait_for_url(self, predicate, timeout=None):
+        if not predicate(self.url):
+            raise PlaywrightTimeoutError("sigue en la misma URL")
+
+    async def fill(self, selector, value):
+        self.filled[selector] = value
+
+    async def click(self, selector, timeout=None):
+        return None
+
+    async def evaluate(self, script, args=None):
+        # Extracción del perfil: el conteo sale de og:description
+        username = (args or {}).get("username", "")
+        return {"og": str(self.context.browser.counts.get(username, 1000 + len(username))), "json": None,
+                "header": None, "private": False, "missing": False, "throttled": False}
+
+
+class FakeContext(_Emitter):
+    def __init__(self, browser, storage_state=None):
+        super().__init__()
+        self.browser = browser
+        self.cookies = list((storage_state or {}).get("cookies", []))
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        if self.closed:
+            raise Exception("Contexto cerrado")
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def storage_state(self):
+        if self.closed or not self.browser.connected:
+            raise Exception("Contexto cerrado")
+        return {"cookies": list(self.cookies), "origins": []}
+
+    async def clear_cookies(self):
+        self.cookies = []
+
+    async def close(self):
+        self.closed = True
+        for page in self.pages:
+            await page.close()
+
+
+class FakeBrowser(_Emitter):
+    def __init__(self, base_url: str = "https://fake.test", password: str = "clave"):
+        super().__init__()
+        self.base_url = base_url
+        self.password = password
+        self.connected = True
+        self.session_valid = True
+        # {usuario: "hang" | "crash"}; el resto responde con su conteo
+        self.profiles = {}
+        self.counts = {}
+        self.scroll_steps = []
+        self.final_harvest = []
+        self.contexts = []
+        self.launches = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, storage_state=None):
+        context = FakeContext(self, storage_state)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+        self.emit("disconnected", self)
+
+
+class _FakeChromium:
+    def __init__(self, browser: FakeBrowser):
+        self.browser = browser
+
+    async def launch(self, **kwargs):
+        # Relanzar tras una caída: el mismo navegador falso vuelve a estar conectado
+        self.browser.connected = True
+        self.browser.launches += 1
+        return self.browser
+
+
+class _FakePlaywright:
+    def __init__(self, browser: FakeBrowser):
+        self.chromium = _FakeChromium(browser)
+
+    async def stop(self):
+        return None
+
+
+async def attach(session, browser: FakeBrowser, storage_state: dict = None):
+    """Deja `session` como tras `start()`, pero sobre el navegador falso."""
+    session.playwright = _FakePlaywright(browser)
+    session.browser = browser
+    session.context = await browser.new_context(storage_state)
+    session._session_restored = storage_state is not None
+    session.page = await session._open_page("login")
+    return session
@@ -0,0 +1,275 @@
+# benchmarks/fake_instagram.py
+"""Servidor local que imita lo justo de Instagram para medir las tres fases sin salir a la red.
+
+Sirve login, perfiles (públicos, privados e inexistentes, con conteos en formato K/M), el modal
+de seguidos con paginación JSON y el endpoint `web_profile_info`. Todo es determinista a partir
+del nombre de usuario, así que dos ejecuciones con los mismos parámetros son comparables.
+
+Uso suelto:  python benchmarks/fake_instagram.py [--port 8000] [--followees 1000] [--latency-ms 50]
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = "sessionid"
+TARGET_ACCOUNT = "cuenta_objetivo"
+PAGE_SIZE = 12
+TARGET_USER_ID = "1234567"
+
+_PRIVATE_MARKER = "This account is private"
+_MISSING_MARKER = "Sorry, this page isn't available."
+
+
+def followee_name(index: int) -> str:
+    return f"usuario_{index:06d}"
+
+
+def profile_for(username: str) -> dict:
+    """Perfil sintético estable: ~8 % privados, ~4 % inexistentes y conteos log-uniformes."""
+    seed = int.from_bytes(hashlib.sha1(username.encode()).digest()[:8], "big")
+    rng = random.Random(seed)
+    roll = rng.random()
+    if username == TARGET_ACCOUNT:
+        return {"exists": True, "private": False, "followers": 123456}
+    if roll < 0.04:
+        return {"exists": False}
+    count = int(10 ** rng.uniform(0, 7.5))
+    return {"exists": True, "private": roll < 0.12, "followers": count}
+
+
+def short_count(count: int) -> str:
+    """Texto visible al estilo de Instagram: 1.234, 12,3K, 4,5M."""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M".replace(".", ",")
+    if count >= 10_000:
+        return f"{count / 1_000:.1f}K".replace(".", ",")
+    return f"{count:,}".replace(",", ".")
+
+
+_LOGIN_PAGE = """<!doctype html><html><body>
+<form method="post" action="/accounts/login/">
+  <input name="username" type="text"><input name="password" type="password">
+  <button type="submit">Iniciar sesión</button>
+</form></body></html>"""
+
+_HOME_PAGE = """<!doctype html><html><body><main>Inicio</main>
+<button onclick="this.remove()">Ahora no</button>
+<button onclick="this.remove()">Ahora no</button>
+</body></html>"""
+
+# Modal de seguidos: pide páginas JSON a medida que se hace scroll, como el de verdad
+_FOLLOWING_PAGE = """<!doctype html><html><body>
+<div role="dialog"><div id="lista" style="height:400px; overflow-y:auto"></div></div>
+<script>
+const lista = document.getElementById('lista');
+let nextMaxId = '0', loading = false;
+async function loadMore() {
+  if (loading || nextMaxId === null) return;
+  loading = true;
+  const response = await fetch('/api/v1/friendships/%(user_id)s/following/?count=%(page_size)d&max_id=' + nextMaxId);
+  const data = await response.json();
+  for (const user of data.users) {
+    const row = document.createElement('div');
+    row.style.height = '60px';
+    row.innerHTML = '<a href="/' + user.username + '/">' + user.username + '</a>';
+    lista.appendChild(row);
+  }
+  nextMaxId = data.next_max_id || null;
+  loading = false;
+  if (lista.scrollHeight <= lista.clientHeight) loadMore();
+}
+lista.addEventListener('scroll', () => {
+  if (lista.scrollTop + lista.clientHeight >= lista.scrollHeight - 100) loadMore();
+});
+loadMore();
+</script></body></html>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeInstagram/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- utilidades ---
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, headers=None):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _logged_in(self) -> bool:
+        return f"{SESSION_COOKIE}=" in (self.headers.get("Cookie") or "")
+
+    def _json(self, payload: dict, status: int = 200):
+        self._send(status, json.dumps(payload), "application/json")
+
+    # --- rutas ---
+    def do_POST(self):
+        fake = self.server.fake
+        fake.wait()
+        if urlparse(self.path).path == "/accounts/login/":
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            cookie = f"{SESSION_COOKIE}=fake-{int(time.time())}; Path=/; Max-Age=86400"
+            self._redirect("/", {"Set-Cookie": cookie})
+        else:
+            self._send(404, "")
+
+    def do_GET(self):
+        fake = self.server.fake
+        fake.wait()
+        url = urlparse(self.path)
+        path = url.path
+        parts = [part for part in path.split("/") if part]
+
+        if path == "/robots.txt":
+            return self._send(200, "User-agent: *\n", "text/plain")
+        if path == "/accounts/login/":
+            return self._send(200, _LOGIN_PAGE)
+        if path == "/":
+            return self._send(200, _HOME_PAGE) if self._logged_in() else self._redirect("/accounts/login/")
+        if path == "/accounts/edit/":
+            return self._send(200, "<html><body>Editar perfil</body></html>") if self._logged_in() \
+                else self._redirect("/accounts/login/")
+        if not self._logged_in():
+            return self._redirect("/accounts/login/")
+        if fake.should_throttle():
+            return self._send(429, "<html><body>Please wait a few minutes before you try again.</body></html>")
+
+        if path == "/api/v1/users/web_profile_info/":
+            username = parse_qs(url.query).get("username", [""])[0]
+            return self._profile_json(username)
+        if len(parts) == 5 and parts[:2] == ["api", "v1"] and parts[2] == "friendships":
+            return self._following_json(parse_qs(url.query))
+        if len(parts) == 2 and parts[1] == "following":
+            return self._send(200, _FOLLOWING_PAGE % {"user_id": TARGET_USER_ID, "page_size": PAGE_SIZE})
+        if len(parts) == 1:
+            return self._profile_page(parts[0])
+        return self._send(404, f"<html><body>{_MISSING_MARKER}</body></html>")
+
+    def _profile_page(self, username: str):
+        fake = self.server.fake
+        profile = profile_for(username)
+        if not profile["exists"]:
+            return self._send(404, f"<html><body><h2>{_MISSING_MARKER}</h2></body></html>")
+        header = f'<h2>{escape(username)}</h2><a href="/{escape(username)}/following/">seguidos</a>'
+        if profile["private"]:
+            body = f"{header}<h2>{_PRIVATE_MARKER}</h2>"
+        else:
+            count = profile["followers"]
+            body = (f'{header}<ul><li><span dir="auto"><span title="{count:,}">{short_count(count)}</span>'
+                    f' followers</span></li></ul>')
+        return self._send(200, f"<!doctype html><html><body>{body}{fake.padding}</body></html>")
+
+    def _profile_json(self, username: str):
+        profile = profile_for(username)
+        if not profile["exists"]:
+            return self._json({"message": "not found"}, 404)
+        user = {"username": username, "is_private": profile["private"]}
+        if not profile["private"]:
+            user["edge_followed_by"] = {"count": profile["followers"]}
+        return self._json({"data": {"user": user}, "status": "ok"})
+
+    def _following_json(self, query: dict):
+        fake = self.server.fake
+        start = int(query.get("max_id", ["0"])[0] or 0)
+        count = int(query.get("count", [str(PAGE_SIZE)])[0])
+        end = min(start + count, fake.followees)
+        users = []
+        for index in range(start, end):
+            username = followee_name(index)
+            profile = profile_for(username)
+            user = {"username": username}
+            if profile["exists"] and not profile["private"]:
+                user["follower_count"] = profile["followers"]
+            users.append(user)
+        payload = {"users": users, "status": "ok"}
+        if end < fake.followees:
+            payload["next_max_id"] = str(end)
+        return self._json(payload)
+
+
+class FakeInstagram:
+    """Arranca el servidor en un hilo: `with FakeInstagram(followees=500) as fake: fake.url ...`."""
+
+    def __init__(self, followees: int = 1000, latency_ms: float = 0, jitter_ms: float = 0,
+                 throttle_ratio: float = 0.0, page_padding_kb: int = 0, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.followees = followees
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_ratio = throttle_ratio
+        # Relleno para que los perfiles pesen algo parecido a una página real
+        self.padding = f"<!-- {'x' * page_padding_kb * 1024} -->" if page_padding_kb else ""
+        self._random = random.Random(0)
+        self._random_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def wait(self):
+        if self.latency_ms or self.jitter_ms:
+            with self._random_lock:
+                jitter = self._random.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def should_throttle(self) -> bool:
+        if not self.throttle_ratio:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.throttle_ratio
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-instagram", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--followees", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--throttle-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+    with FakeInstagram(args.followees, args.latency_ms, throttle_ratio=args.throttle_ratio,
+                       port=args.port) as fake:
+        print(f"Instagram falso en {fake.url} (objetivo: {TARGET_ACCOUNT}). Ctrl+C para salir.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
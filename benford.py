@@ -0,0 +1,301 @@
+# benford.py
+import math
+
+import numpy as np
+import pandas as pd
+
+# 10**0 .. 10**18: todo lo que cabe en int64
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
+def digit_exponents(values: np.ndarray) -> np.ndarray:
+    """Número de dígitos menos uno de cada valor (> 0), calculado sin pasar por texto."""
+    values = np.asarray(values, dtype=np.int64)
+    exponents = np.floor(np.log10(values)).astype(np.int64)
+    # log10 en coma flotante puede fallar por uno cerca de las potencias de 10: se corrige
+    exponents -= _POWERS_OF_TEN[exponents] > values
+    below_top = exponents < len(_POWERS_OF_TEN) - 1
+    next_power = _POWERS_OF_TEN[np.minimum(exponents + 1, len(_POWERS_OF_TEN) - 1)]
+    exponents += below_top & (values >= next_power)
+    return exponents
+
+
+def first_digits(values: np.ndarray) -> np.ndarray:
+    """Primer dígito (1-9) de cada valor entero positivo, de forma aritmética."""
+    values = np.asarray(values, dtype=np.int64)
+    return values // _POWERS_OF_TEN[digit_exponents(values)]
+
+
+# --- Pruebas de dígitos -------------------------------------------------------------------------
+
+# Dígitos que cubre cada prueba y proporciones esperadas exactas (Benford; uniforme en los dos últimos)
+TEST_DIGITS = {
+    'primer_digito': np.arange(1, 10),
+    'segundo_digito': np.arange(0, 10),
+    'dos_primeros': np.arange(10, 100),
+    'dos_ultimos': np.arange(0, 100),
+}
+EXPECTED = {
+    'primer_digito': np.log10(1 + 1 / TEST_DIGITS['primer_digito']),
+    'segundo_digito': np.log10(1 + 1 / (10 * np.arange(1, 10)[:, None] + np.arange(10))).sum(axis=0),
+    'dos_primeros': np.log10(1 + 1 / TEST_DIGITS['dos_primeros']),
+    'dos_ultimos': np.full(100, 0.01),
+}
+ALL_TESTS = tuple(TEST_DIGITS)
+
+# Umbrales de MAD de Nigrini (Benford's Law, 2012): conformidad cercana / aceptable / marginal
+NIGRINI_MAD_BANDS = {
+    'primer_digito': (0.006, 0.012, 0.015),
+    'segundo_digito': (0.008, 0.010, 0.012),
+    'dos_primeros': (0.0012, 0.0018, 0.0022),
+}
+CONFORMITY_LABELS = ("conformidad cercana", "conformidad aceptable", "conformidad marginal", "no conformidad")
+
+
+def digit_counts(values: np.ndarray, tests=ALL_TESTS, exponents: np.ndarray = None) -> dict:
+    """Conteos por dígito de cada prueba (arrays alineados con TEST_DIGITS), en una pasada vectorizada.
+
+    El segundo dígito y los dos primeros solo existen para valores >= 10; los dos últimos se
+    toman de valores >= 100, para que no coincidan con los dígitos iniciales.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    values = values[values > 0]
+    if exponents is None:
+        exponents = digit_exponents(values)
+    counts = {}
+    if 'primer_digito' in tests:
+        counts['primer_digito'] = np.bincount(values // _POWERS_OF_TEN[exponents], minlength=10)[1:10]
+    if 'segundo_digito' in tests or 'dos_primeros' in tests:
+        multi = exponents >= 1
+        first_two = values[multi] // _POWERS_OF_TEN[exponents[multi] - 1]
+        if 'segundo_digito' in tests:
+            counts['segundo_digito'] = np.bincount(first_two % 10, minlength=10)
+        if 'dos_primeros' in tests:
+            counts['dos_primeros'] = np.bincount(first_two, minlength=100)[10:100]
+    if 'dos_ultimos' in tests:
+        counts['dos_ultimos'] = np.bincount(values[exponents >= 2] % 100, minlength=100)
+    return {name: counts[name].astype(np.int64) for name in tests}
+
+
+def chi2_sf(statistic: float, dof: int) -> float:
+    """P(X² >= statistic) con `dof` grados de libertad (función gamma incompleta regularizada)."""
+    if statistic <= 0:
+        return 1.0
+    a, x = dof / 2.0, statistic / 2.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        # Serie de la gamma inferior P(a, x); Q = 1 - P
+        term = total = 1.0 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Fracción continua de la gamma superior (método de Lentz)
+    tiny = 1e-300
+    b = x + 1 - a
+    c, d = 1 / tiny, 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def _ks_sf(lam: float) -> float:
+    """Cola asintótica de Kolmogorov-Smirnov."""
+    if lam < 0.2:
+        return 1.0
+    total = sum((-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam) for j in range(1, 101))
+    return min(1.0, max(0.0, 2 * total))
+
+
+def _kuiper_sf(lam: float) -> float:
+    """Cola asintótica de Kuiper."""
+    if lam < 0.4:
+        return 1.0
+    total = sum((4 * j * j * lam * lam - 1) * math.exp(-2 * j * j * lam * lam) for j in range(1, 101))
+    return min(1.0, max(0.0, 2 * total))
+
+
+class DigitTestResult:
+    """Resultado de una prueba de dígitos: proporciones, bondad de ajuste e intervalos bootstrap.
+
+    KS y Kuiper usan las colas asintóticas de distribuciones continuas: con dígitos (discretos)
+    los p-valores son conservadores.
+    """
+
+    def __init__(self, name: str, counts: np.ndarray, bootstrap: int = 1000, confidence: float = 0.95,
+                 seed=None):
+        self.name = name
+        self.digits = TEST_DIGITS[name]
+        self.expected = EXPECTED[name]
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.n = int(self.counts.sum())
+        self.observed = self.counts / self.n if self.n else np.zeros(len(self.digits))
+
+        n = max(self.n, 1)
+        expected_counts = self.expected * self.n
+        self.chi2 = float(((self.counts - expected_counts) ** 2 / expected_counts).sum()) if self.n else float('nan')
+        self.chi2_dof = len(self.digits) - 1
+        self.chi2_p = chi2_sf(self.chi2, self.chi2_dof) if self.n else float('nan')
+
+        deviation = self.observed - self.expected
+        self.mad = float(np.abs(deviation).mean())
+        # Z por dígito con corrección por continuidad (Nigrini)
+        self.z_scores = np.maximum(np.abs(deviation) - 1 / (2 * n), 0) / \
+            np.sqrt(self.expected * (1 - self.expected) / n)
+
+        cumulative = np.cumsum(self.observed) - np.cumsum(self.expected)
+        self.ks = float(np.abs(cumulative).max())
+        self.kuiper = float(max(cumulative.max(), 0) + max(-cumulative.min(), 0))
+        root_n = math.sqrt(n)
+        self.ks_p = _ks_sf((root_n + 0.12 + 0.11 / root_n) * self.ks) if self.n else float('nan')
+        self.kuiper_p = _kuiper_sf((root_n + 0.155 + 0.24 / root_n) * self.kuiper) if self.n else float('nan')
+        # Valores críticos al 5 % (asintóticos)
+        self.ks_critical = 1.36 / root_n
+        self.kuiper_critical = 1.747 / root_n
+
+        self.confidence = confidence
+        self.ci_low, self.ci_high, self.mad_ci = self._bootstrap(bootstrap, confidence, seed)
+
+    def _bootstrap(self, rounds: int, confidence: float, seed):
+        """Remuestreo multinomial de los conteos: coste O(rounds × dígitos), independiente de n."""
+        if not rounds or not self.n:
+            nan = np.full(len(self.digits), np.nan)
+            return nan, nan, (float('nan'), float('nan'))
+        rng = np.random.default_rng(seed)
+        samples = rng.multinomial(self.n, self.observed, size=rounds) / self.n
+        tail = (1 - confidence) / 2 * 100
+        low, high = np.percentile(samples, [tail, 100 - tail], axis=0)
+        mads = np.abs(samples - self.expected).mean(axis=1)
+        mad_low, mad_high = np.percentile(mads, [tail, 100 - tail])
+        return low, high, (float(mad_low), float(mad_high))
+
+    @property
+    def conformity(self):
+        """Banda de Nigrini según el MAD (None en la prueba de los dos últimos dígitos, que no tiene)."""
+        bands = NIGRINI_MAD_BANDS.get(self.name)
+        if bands is None or not self.n:
+            return None
+        for limit, label in zip(bands, CONFORMITY_LABELS):
+            if self.mad <= limit:
+                return label
+        return CONFORMITY_LABELS[-1]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tabla por dígito: conteo, proporción observada y esperada, Z e intervalo bootstrap."""
+        return pd.DataFrame({
+            'conteo': self.counts,
+            'observado': self.observed,
+            'esperado': self.expected,
+            'z': self.z_scores,
+            'ic_inferior': self.ci_low,
+            'ic_superior': self.ci_high,
+        }, index=pd.Index(self.digits, name='digito'))
+
+    def to_dict(self) -> dict:
+        return {
+            'prueba': self.name, 'n': self.n,
+            'chi2': self.chi2, 'chi2_gl': self.chi2_dof, 'chi2_p': self.chi2_p,
+            'mad': self.mad, 'mad_ic': list(self.mad_ci), 'conformidad': self.conformity,
+            'ks': self.ks, 'ks_p': self.ks_p, 'kuiper': self.kuiper, 'kuiper_p': self.kuiper_p,
+        }
+
+
+class BenfordAnalysis:
+    """Conjunto de pruebas sobre los mismos datos; `tests[nombre]` es un DigitTestResult."""
+
+    def __init__(self, counts_by_test: dict, bootstrap: int = 1000, confidence: float = 0.95, seed=None):
+        rng = np.random.default_rng(seed)
+        self.tests = {
+            name: DigitTestResult(name, counts, bootstrap, confidence, rng)
+            for name, counts in counts_by_test.items()
+        }
+
+    def __getitem__(self, name: str) -> DigitTestResult:
+        return self.tests[name]
+
+    @property
+    def first_digit(self) -> DigitTestResult:
+        return self.tests['primer_digito']
+
+    def summary(self) -> pd.DataFrame:
+        """Una fila por prueba con los estadísticos de bondad de ajuste."""
+        return pd.DataFrame([test.to_dict() for test in self.tests.values()]).set_index('prueba')
+
+    def to_dict(self) -> dict:
+        return {name: test.to_dict() for name, test in self.tests.items()}
+
+
+def analyze_benford(values: np.ndarray, tests=ALL_TESTS, bootstrap: int = 1000,
+                    confidence: float = 0.95, seed=None) -> BenfordAnalysis:
+    """Todas las pruebas de dígitos sobre conteos enteros positivos (los <= 0 se ignoran)."""
+    return BenfordAnalysis(digit_counts(values, tests), bootstrap, confidence, seed)
+
+
+class BenfordAccumulator:
+    """Conteos de todas las pruebas de dígitos y estadísticas básicas, acumulados bloque a bloque.
+
+    La memoria no depende del número de valores: solo se guardan contadores y un histograma
+    logarítmico (BINS_PER_DECADE cubetas por década) para aproximar la mediana.
+    """
+
+    BINS_PER_DECADE = 200
+
+    def __init__(self):
+        self.digit_counts = np.zeros(10, dtype=np.int64)
+        self.test_counts = {name: np.zeros(len(TEST_DIGITS[name]), dtype=np.int64) for name in ALL_TESTS}
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self._log_histogram = np.zeros(19 * self.BINS_PER_DECADE + 1, dtype=np.int64)
+
+    def update(self, values: np.ndarray):
+        """Añade un bloque de conteos enteros positivos."""
+        values = np.asarray(values, dtype=np.int64)
+        if values.size == 0:
+            return
+        for name, counts in digit_counts(values, exponents=digit_exponents(values)).items():
+            self.test_counts[name] += counts
+        self.digit_counts[1:] = self.test_counts['primer_digito']
+        self.count += int(values.size)
+        self.total += int(values.sum())
+        chunk_min, chunk_max = int(values.min()), int(values.max())
+        self.minimum = chunk_min if self.minimum is None else min(self.minimum, chunk_min)
+        self.maximum = chunk_max if self.maximum is None else max(self.maximum, chunk_max)
+        buckets = np.floor(np.log10(values) * self.BINS_PER_DECADE).astype(np.int64)
+        self._log_histogram += np.bincount(buckets, minlength=len(self._log_histogram))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def approximate_median(self) -> float:
+        """Mediana aproximada (error relativo < 0,6 %) a partir del histograma logarítmico."""
+        if not self.count:
+            return float('nan')
+        cumulative = np.cumsum(self._log_histogram)
+        bucket = int(np.searchsorted(cumulative, (self.count + 1) / 2))
+        estimate = 10 ** ((bucket + 0.5) / self.BINS_PER_DECADE)
+        return float(min(max(estimate, self.minimum), self.maximum))
+
+    def analysis(self, bootstrap: int = 1000, confidence: float = 0.95, seed=None) -> BenfordAnalysis:
+        """Las mismas pruebas que `analyze_benford`, a partir de los conteos acumulados."""
+        return BenfordAnalysis(self.test_counts, bootstrap, confidence, seed)
+
+    def first_digit_counts(self) -> pd.Series:
+        """Conteo por primer dígito con índice 1..9, igual que en el análisis en memoria."""
+        return pd.Series(self.digit_counts[1:], index=range(1, 10))
@@ -0,0 +1,278 @@
+# browser_recycler.py
+"""Memoria acotada en ejecuciones largas de la Fase 2.
+
+Con miles de navegaciones en las mismas páginas, la memoria de Chromium no para de crecer hasta
+que la máquina usa swap o el renderer se cae. `PageRecycler` da a cada página una vida limitada
+(N navegaciones), recicla el contexto entero (conservando cookies y storage) cada M navegaciones
+o cuando el navegador supera un límite de memoria, y reinicia las páginas caídas para repetir el
+mismo perfil. La memoria se mide con psutil si está instalado; sin él, solo se recicla por número
+de navegaciones.
+"""
+import asyncio
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from metrics import MetricsRecorder
+
+# Ejecutables de Chromium que lanza Playwright (incluido el "headless shell")
+CHROMIUM_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+# Techo para cerrar una página colgada (segundos)
+PAGE_CLOSE_TIMEOUT = 5
+
+
+class BrowserMemoryMonitor:
+    """RSS de los procesos de Chromium hijos de este proceso (total y solo renderers), en MB.
+
+    Es la suma de RSS de cada proceso: cuenta dos veces la memoria compartida, así que sirve para
+    ver la tendencia y fijar un límite, no como cifra exacta.
+    """
+
+    def __init__(self):
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        self._psutil = psutil
+        self.samples = 0
+        self.first = None
+        self.peak = None
+        self.last = None
+
+    @property
+    def available(self) -> bool:
+        return self._psutil is not None
+
+    def _browser_processes(self):
+        psutil = self._psutil
+        for process in psutil.Process(os.getpid()).children(recursive=True):
+            try:
+                name = process.name().lower()
+                if any(chromium in name for chromium in CHROMIUM_PROCESS_NAMES):
+                    yield process, process.memory_info().rss, "--type=renderer" in process.cmdline()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+    def sample(self):
+        """{'navegador_mb', 'renderers_mb', 'procesos', 'python_mb'} o None si no hay psutil."""
+        if not self.available:
+            return None
+        total = renderers = 0
+        processes = 0
+        for _, rss, is_renderer in self._browser_processes():
+            processes += 1
+            total += rss
+            if is_renderer:
+                renderers += rss
+        mb = 1024 * 1024
+        sample = {'navegador_mb': round(total / mb, 1), 'renderers_mb': round(renderers / mb, 1),
+                  'procesos': processes,
+                  'python_mb': round(self._psutil.Process(os.getpid()).memory_info().rss / mb, 1)}
+        self.samples += 1
+        self.first = self.first or sample
+        if self.peak is None or sample['navegador_mb'] > self.peak['navegador_mb']:
+            self.peak = sample
+        self.last = sample
+        return sample
+
+
+class PageRecycler:
+    """Vida de las páginas (y del contexto) de una fase sobre una BrowserSession compartida.
+
+    Cada visita se hace dentro de `visit()`: así se sabe cuántas hay en curso y el contexto solo se
+    recicla cuando no queda ninguna (las nuevas esperan). `page_for()` entrega una página lista
+    para navegar y la renueva si está cerrada, caída, gastada o es de un contexto anterior.
+    """
+
+    def __init__(self, session, phase: str = '2', open_page=None, page_navigations: int = 200,
+                 context_navigations: int = 2000, memory_limit_mb: float = 1500,
+                 memory_check_every: int = 25, metrics: MetricsRecorder = None,
+                 monitor: BrowserMemoryMonitor = None):
+        self.session = session
+        self.phase = phase
+        # Cómo abrir una página nueva (p. ej. la del worker 0 reutiliza la del login)
+        self.open_page = open_page or (lambda worker_id: session.new_page(phase))
+        # 0 o None desactiva cada criterio
+        self.page_navigations = page_navigations or 0
+        self.context_navigations = context_navigations or 0
+        self.memory_limit_mb = memory_limit_mb or 0
+        self.memory_check_every = max(1, memory_check_every)
+        self.metrics = metrics or MetricsRecorder()
+        self.monitor = monitor or BrowserMemoryMonitor()
+        self.recycled = Counter()
+        self.navigations = 0
+        self._context_count = 0
+        self._page_counts = {}
+        self._page_generation = {}
+        # Páginas que no deben volver a usarse: {página: "caida" (renderer caído) o "error"}
+        self._retired = {}
+        self._generation = 0
+        self._in_flight = 0
+        self._pending = None
+        self._ready = asyncio.Event()
+        self._ready.set()
+        self._browser_watched = None
+
+    # ---------------------------
+    # VISITAS Y PÁGINAS
+    # ---------------------------
+    @asynccontextmanager
+    async def visit(self):
+        """Una visita en curso; al salir la última, se hace el reciclado del contexto pendiente."""
+        await self._ready.wait()
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if self._pending and self._in_flight == 0:
+                await self._recycle_context()
+
+    async def page_for(self, page, worker_id: int):
+        """La página con la que hacer la próxima navegación (nueva si `page` ya no sirve)."""
+        reason = self._retire_reason(page)
+        if reason:
+            # Las cerradas por un reciclado del contexto ya cuentan en ese evento
+            if reason not in ("inicio", "cerrada", "contexto"):
+                self._record('pagina', reason)
+            if page is not None:
+                await self._close_page(page)
+            page = await self.open_page(worker_id)
+            self._track(page)
+        return page
+
+    def navigated(self, page):
+        """Cuenta una navegación; marca el contexto para reciclar por navegaciones o por memoria."""
+        self.navigations += 1
+        self._context_count += 1
+        self._page_counts[page] = self._page_counts.get(page, 0) + 1
+        if self.context_navigations and self._context_count >= self.context_navigations:
+            self._request_context_recycle('navegaciones')
+        elif self.navigations % self.memory_check_every == 0:
+            sample = self.monitor.sample()
+            if sample:
+                self.metrics.set_gauge('memoria_navegador_mb', sample['navegador_mb'], tipo='total')
+                self.metrics.set_gauge('memoria_navegador_mb', sample['renderers_mb'], tipo='renderers')
+                if self.memory_limit_mb and sample['navegador_mb'] >= self.memory_limit_mb:
+                    self._request_context_recycle('memoria')
+
+    def crashed(self, page) -> bool:
+        """True si el renderer de `page` (o el navegador entero) se cayó; se mira dentro de la visita,
+        antes de que un reciclado del contexto cierre la página por su cuenta."""
+        if page is None:
+            return False
+        browser = self.session.browser
+        return (self._retired.get(page) == "caida" or page.is_closed()
+                or (browser is not None and not browser.is_connected()))
+
+    async def discard(self, page):
+        """Cierra ya una página colgada o con error, sin esperar a la próxima visita del worker."""
+        self._record('pagina', 'error')
+        self._retired.pop(page, None)
+        await self._close_page(page)
+
+    def retire(self, page):
+        """Da `page` por inservible (colgada o con error): `page_for` la cambiará por una nueva."""
+        if page is not None:
+            self._retired.setdefault(page, "error")
+
+    def _retire_reason(self, page):
+        if page is None:
+            return "inicio"
+        if page in self._retired:
+            return self._retired[page]
+        if page.is_closed():
+            return "cerrada"
+        if self._page_generation.get(page) != self._generation:
+            return "contexto"
+        if self.page_navigations and self._page_counts.get(page, 0) >= self.page_navigations:
+            return "navegaciones"
+        return None
+
+    def _track(self, page):
+        self._page_counts[page] = 0
+        self._page_generation[page] = self._generation
+        page.on("crash", lambda _: self._mark_crashed(page))
+        page.on("close", lambda _: self._forget(page))
+        browser = self.session.browser
+        if browser is not None and browser is not self._browser_watched:
+            self._browser_watched = browser
+            browser.on("disconnected", lambda _: self._on_browser_disconnected())
+
+    def _on_browser_disconnected(self):
+        # Al cerrar la sesión también se desconecta: eso no es una caída
+        if not self.session.closed:
+            self._request_context_recycle('caida_navegador')
+
+    def _mark_crashed(self, page):
+        self._retired[page] = "caida"
+
+    def _forget(self, page):
+        self._page_counts.pop(page, None)
+        self._page_generation.pop(page, None)
+        self._retired.pop(page, None)
+
+    @staticmethod
+    async def _close_page(page):
+        try:
+            if not page.is_closed():
+                await asyncio.wait_for(page.close(), timeout=PAGE_CLOSE_TIMEOUT)
+        except Exception:
+            pass
+
+    # ---------------------------
+    # CONTEXTO
+    # ---------------------------
+    def _request_context_recycle(self, reason: str):
+        if self._pending is None or reason == 'caida_navegador':
+            self._pending = reason
+        # Las visitas nuevas esperan; la última en curso hace el reciclado al salir
+        self._ready.clear()
+        if self._in_flight == 0:
+            asyncio.get_running_loop().create_task(self._recycle_context())
+
+    async def _recycle_context(self):
+        reason, self._pending = self._pending, None
+        if reason is None:
+            return
+        try:
+            before = self.monitor.last
+            recycled = await self.session.recycle_context(self.phase)
+            # Sin contexto nuevo (otra fase tiene páginas abiertas) se renuevan al menos las páginas
+            kind = 'contexto' if recycled else 'paginas'
+            self._generation += 1
+            self._context_count = 0
+            self._retired.clear()
+            after = self.monitor.sample()
+            self._record(kind, reason, before=before, after=after)
+            print(f"♻️ Reciclado ({kind}, {reason}) tras {self.navigations} navegaciones"
+                  + (f": {before['navegador_mb']:.0f} MB → {after['navegador_mb']:.0f} MB"
+                     if before and after else ""))
+        except Exception as e:
+            print(f"No se pudo reciclar el contexto del navegador: {e}")
+        finally:
+            self._ready.set()
+
+    def _record(self, kind: str, reason: str, before: dict = None, after: dict = None):
+        self.recycled[(kind, reason)] += 1
+        self.metrics.increment('reciclados_total', tipo=kind, motivo=reason)
+        fields = {'tipo': kind, 'motivo': reason, 'navegaciones': self.navigations}
+        if before:
+            fields['memoria_antes_mb'] = before['navegador_mb']
+        if after:
+            fields['memoria_despues_mb'] = after['navegador_mb']
+        self.metrics.event('reciclado', **fields)
+
+    def print_report(self, title: str = "Reciclado del navegador"):
+        if not self.navigations:
+            return
+        detail = ", ".join(f"{kind}/{reason}={n}" for (kind, reason), n in sorted(self.recycled.items()))
+        print(f"\n♻️ {title}: {self.navigations} navegaciones, {sum(self.recycled.values())} reciclados "
+              f"({detail or 'ninguno'}).")
+        if not self.monitor.available:
+            print("   Memoria: sin psutil (pip install psutil) solo se recicla por número de navegaciones.")
+        elif self.monitor.samples:
+            first, peak, last = self.monitor.first, self.monitor.peak, self.monitor.last
+            print(f"   Memoria del navegador: inicio {first['navegador_mb']:.0f} MB, "
+                  f"pico {peak['navegador_mb']:.0f} MB, final {last['navegador_mb']:.0f} MB "
+                  f"(renderers {last['renderers_mb']:.0f} MB, {last['procesos']} procesos).")
@@ -0,0 +1,245 @@
+# browser_session.py
+import asyncio
+import time
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from wait_stats import WaitStats
+from metrics import MetricsRecorder
+from resource_blocker import ResourceBlocker
+import session_store
+
+INSTAGRAM_URL = "https://www.instagram.com"
+
+# Techos de espera de las dos fases: se espera la condición real y, como mucho, este tiempo
+LOGIN_TIMEOUT_MS = 15000
+PAGE_TIMEOUT_MS = 15000  # perfil objetivo y modal de seguidos (Fase 1)
+SCROLL_TIMEOUT = 5  # segundos a que la lista crezca tras cada scroll (Fase 1)
+PROFILE_READY_TIMEOUT_MS = 5000  # datos del perfil visitado (Fase 2)
+
+
+class BrowserSession:
+    """Un Chromium de Playwright y un contexto con la sesión iniciada, compartidos por las fases.
+
+    La Fase 1 (lista de seguidos) y la Fase 2 (conteos) piden sus páginas a la misma sesión, así
+    que "ejecutar todo" arranca un solo navegador y hace un solo login. El navegador se lanza con
+    el primer `login()`; si nadie lo necesita (todo servido por la caché), no se abre. Usa los
+    navegadores que instala `playwright install`: no descarga nada en cada ejecución.
+    """
+
+    def __init__(self, username, password, lean: bool = False, session_file: str = None,
+                 base_url: str = INSTAGRAM_URL, metrics: MetricsRecorder = None,
+                 wait_stats: WaitStats = None, headless: bool = True):
+        self.username = username
+        self.password = password
+        self.base_url = base_url.rstrip("/")
+        self.headless = headless
+        # Sesión guardada (cookies / storage_state) para no repetir el login en cada ejecución
+        self.session_file = session_file or session_store.default_session_path(username)
+        # Modo ligero: no descargar imágenes, vídeo, fuentes ni tracking (en todo el contexto)
+        self.resource_blocker = ResourceBlocker() if lean else None
+        self.wait_stats = wait_stats or WaitStats()
+        # Login y bytes descargados por fase (según la página que los pidió)
+        self.metrics = metrics or MetricsRecorder()
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self._page_phases = {}
+        self._login_page_taken = False
+        self._logged_in = None
+        self._login_lock = asyncio.Lock()
+        self._session_restored = False
+        self._closed = False
+
+    async def start(self):
+        if self._closed:
+            raise RuntimeError("La sesión del navegador ya fue cerrada y no puede reutilizarse")
+        if self.context:
+            return
+
+        self.playwright = await async_playwright().start()
+        await self._launch()
+        saved_state = session_store.load_state(self.session_file)
+        await self._new_context(saved_state)
+        self._session_restored = saved_state is not None
+        self.page = await self._open_page("login")
+
+    async def _launch(self):
+        # Sin ventana por defecto; /dev/shm suele ser pequeño en contenedores y tumba los renderers
+        self.browser = await self.playwright.chromium.launch(headless=self.headless,
+                                                             args=["--disable-dev-shm-usage"])
+
+    async def _new_context(self, storage_state):
+        self.context = await self.browser.new_context(storage_state=storage_state)
+        if self.resource_blocker:
+            await self.resource_blocker.attach(self.context)
+
+    async def _open_page(self, phase: str):
+        page = await self.context.new_page()
+        self._page_phases[page] = phase
+        page.on("response", lambda response: self._count_response_bytes(page, response))
+        page.on("close", lambda _: self._page_phases.pop(page, None))
+        return page
+
+    def _count_response_bytes(self, page, response):
+        # Aproximado: solo las respuestas que declaran Content-Length
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.metrics.increment('bytes_descargados_total', int(length),
+                                   fase=self._page_phases.get(page, "login"))
+
+    async def new_page(self, phase: str):
+        """Página nueva en el contexto con sesión; `phase` etiqueta sus bytes en las métricas."""
+        await self.start()
+        return await self._open_page(phase)
+
+    async def acquire_page(self, phase: str):
+        """La página del login la primera vez (ahorra abrir otra); después, una nueva."""
+        await self.start()
+        if not self._login_page_taken and self.page and not self.page.is_closed():
+            self._login_page_taken = True
+            self._page_phases[self.page] = phase
+            return self.page
+        return await self._open_page(phase)
+
+    async def recycle_context(self, phase: str) -> bool:
+        """Cambia el contexto por uno nuevo con las mismas cookies y storage, liberando sus páginas
+        y renderers (y relanza el navegador si se cayó). No lo hace, y devuelve False, si otra fase
+        tiene páginas abiertas en él (p. ej. la Fase 1 en tubería)."""
+        if self.context is None or self._closed:
+            return False
+        if any(owner not in (phase, "login") for page, owner in self._page_phases.items() if not page.is_closed()):
+            return False
+        try:
+            state = await self.context.storage_state()
+            session_store.save_state(self.session_file, state)
+        except Exception:
+            # Contexto o navegador caídos: la última sesión guardada
+            state = session_store.load_state(self.session_file)
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+        if not self.browser.is_connected():
+            await self._launch()
+        await self._new_context(state)
+        self._page_phases.clear()
+        self.page = None
+        self._login_page_taken = True
+        return True
+
+    # ---------------------------
+    # LOGIN
+    # ---------------------------
+    async def login(self, phase: str = None) -> bool:
+        """Reutiliza la sesión guardada si sigue siendo válida; si no, inicia sesión (una sola vez
+        aunque lo pidan las dos fases a la vez)."""
+        async with self._login_lock:
+            if self._logged_in is None:
+                start = time.perf_counter()
+                self._logged_in = await self._login_flow()
+                self.metrics.record_duration('login_segundos', time.perf_counter() - start, fase=phase,
+                                             ok=self._logged_in, sesion_guardada=self._session_restored)
+            return self._logged_in
+
+    async def _restore_session(self) -> bool:
+        """Valida la sesión guardada con una sola carga de página que exige estar logueado."""
+        try:
+            with self.wait_stats.measure('sesion_validacion'):
+                await self.page.goto(f"{self.base_url}{session_store.SESSION_CHECK_PATH}",
+                                     wait_until="domcontentloaded")
+        except Exception as e:
+            print(f"No se pudo validar la sesión guardada: {e}")
+            return False
+        return "accounts/login" not in self.page.url
+
+    async def _login_flow(self) -> bool:
+        await self.start()
+
+        if self._session_restored:
+            if await self._restore_session():
+                print("✅ Sesión guardada reutilizada.")
+                return True
+            print("La sesión guardada fue rechazada; se inicia sesión de nuevo.")
+            session_store.delete_state(self.session_file)
+            await self.context.clear_cookies()
+            self._session_restored = False
+
+        print("Iniciando sesión en Instagram...")
+        await self.page.goto(f"{self.base_url}/accounts/login/")
+
+        try:
+            # Esperar inputs (en vez de una pausa fija tras cargar)
+            with self.wait_stats.measure('login_formulario'):
+                await self.page.wait_for_selector('input[name="username"]', timeout=10000)
+                await self.page.wait_for_selector('input[name="password"]', timeout=10000)
+
+            # Llenar credenciales
+            await self.page.fill('input[name="username"]', self.username)
+            await self.page.fill('input[name="password"]', self.password)
+
+            # 🔥 MÉTODO ESTABLE: ENTER (evita problemas con el botón)
+            await self.page.keyboard.press("Enter")
+
+            # Esperar a salir de la pantalla de login (con techo de 15 s)
+            try:
+                with self.wait_stats.measure('login_redireccion'):
+                    await self.page.wait_for_url(lambda url: "accounts/login" not in url,
+                                                 timeout=LOGIN_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                pass
+
+            # Verificar si sigue en login
+            if "accounts/login" in self.page.url:
+                print("❌ Login fallido (sigue en pantalla de login)")
+                return False
+
+            print("✅ Sesión iniciada exitosamente.")
+            await self._handle_popups()
+            await self._save_session()
+            return True
+
+        except Exception as e:
+            print(f"Error durante el login: {e}")
+            return False
+
+    async def _save_session(self):
+        try:
+            session_store.save_state(self.session_file, await self.context.storage_state())
+            print(f"Sesión guardada en: {self.session_file}")
+        except Exception as e:
+            print(f"No se pudo guardar la sesión: {e}")
+
+    async def _handle_popups(self):
+        # "Guardar información" y "Notificaciones": como mucho dos pop-ups seguidos
+        selector = "xpath=//button[contains(text(), 'Ahora no') or contains(text(), 'Not Now')]"
+        try:
+            for _ in range(2):
+                try:
+                    with self.wait_stats.measure('popup'):
+                        button = await self.page.wait_for_selector(selector, timeout=3000)
+                        await button.click()
+                        await button.wait_for_element_state('hidden', timeout=3000)
+                except:
+                    break
+
+        except Exception as e:
+            print(f"No se pudieron cerrar pop-ups: {e}")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def close(self):
+        if self._closed:
+            return
+        # Marcada antes de cerrar: la desconexión del navegador que sigue no es una caída
+        self._closed = True
+        try:
+            if self.browser:
+                await self.browser.close()
+            if self.playwright:
+                await self.playwright.stop()
+        except:
+            pass
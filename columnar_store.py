@@ -0,0 +1,127 @@
+# columnar_store.py
+"""Conteos en Parquet: columnas tipadas en lugar de texto, para que la Fase 3 no tenga que convertir nada.
+
+Esquema: username (texto), followers_count (entero con nulos), status (categoría: OK, PRIVADA,
+NO_EXISTE, ...), scraped_at (marca de tiempo UTC) y, al combinar varias cuentas, cuenta.
+Necesita pyarrow (opcional); el CSV sigue siendo el formato por defecto.
+
+Uso:  python columnar_store.py a_following_counts.csv [b.csv ...] -o combinado.parquet
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from count_parsing import parse_counts
+
+PARQUET_SUFFIX = ".parquet"
+# Estados posibles de una fila; OK significa que hay conteo
+STATUS_VALUES = ['OK', 'PRIVADA', 'NO_EXISTE', 'NO_ENCONTRADO', 'ERROR', 'TIMEOUT', 'LIMITADO', 'DESCONOCIDO']
+
+
+def is_parquet(path: str) -> bool:
+    return str(path).lower().endswith(PARQUET_SUFFIX)
+
+
+def parquet_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + PARQUET_SUFFIX
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("El formato Parquet necesita pyarrow: pip install pyarrow") from e
+
+
+def counts_frame(raw_counts: pd.Series, usernames: pd.Series, scraped_at=None) -> pd.DataFrame:
+    """Texto de la Fase 2 → columnas tipadas. `scraped_at`: epoch común, o Serie por fila (NaN = desconocida)."""
+    numeric = parse_counts(raw_counts)
+    valid = numeric.notna() & (numeric >= 0)
+    counts = numeric.where(valid).round().astype('Int64')
+
+    text = raw_counts.fillna('').astype(str).str.strip()
+    status = pd.Series(np.where(valid, 'OK', np.where(text.isin(STATUS_VALUES), text, 'DESCONOCIDO')),
+                       index=raw_counts.index)
+
+    if scraped_at is None:
+        scraped_at = time.time()
+    if not isinstance(scraped_at, pd.Series):
+        scraped_at = pd.Series(scraped_at, index=raw_counts.index, dtype='float64')
+    return pd.DataFrame({
+        'username': usernames.astype(str).to_numpy(),
+        'followers_count': counts.array,
+        'status': pd.Categorical(status, categories=STATUS_VALUES),
+        'scraped_at': pd.to_datetime(scraped_at.to_numpy(), unit='s', utc=True).floor('s'),
+    })
+
+
+def write_counts_parquet(frame: pd.DataFrame, path: str):
+    """Escribe de forma atómica (archivo temporal + renombrado), comprimido con zstd."""
+    _require_pyarrow()
+    tmp_path = f"{path}.tmp"
+    frame.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+    os.replace(tmp_path, path)
+
+
+def csv_to_parquet(csv_path: str, parquet_path: str = None, scraped_times: dict = None) -> str:
+    """Convierte un CSV de conteos de la Fase 2. La hora de cada fila sale de `scraped_times`
+    ({username: epoch}, p. ej. de la caché) y, si no está, de la última escritura del CSV."""
+    parquet_path = parquet_path or parquet_path_for(csv_path)
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    fallback = os.path.getmtime(csv_path)
+    scraped_at = raw['username'].map(scraped_times).fillna(fallback).astype('float64') \
+        if scraped_times else fallback
+    write_counts_parquet(counts_frame(raw['followers_count'], raw['username'], scraped_at), parquet_path)
+    return parquet_path
+
+
+def combine_to_parquet(csv_paths: list[str], parquet_path: str) -> str:
+    """Varios CSV de conteos en un solo Parquet, con la columna `cuenta` (categoría)."""
+    from batch_analysis import account_name
+
+    frames = []
+    for path in csv_paths:
+        raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+        frame = counts_frame(raw['followers_count'], raw['username'], os.path.getmtime(path))
+        frame.insert(0, 'cuenta', account_name(path))
+        frames.append(frame)
+    combined = pd.concat(frames, ignore_index=True)
+    combined['cuenta'] = combined['cuenta'].astype('category')
+    write_counts_parquet(combined, parquet_path)
+    return parquet_path
+
+
+def read_counts(path: str, columns: list[str] = None) -> pd.DataFrame:
+    """Lee solo las columnas pedidas; followers_count llega ya como entero con nulos."""
+    _require_pyarrow()
+    return pd.read_parquet(path, columns=columns, engine='pyarrow')
+
+
+def iter_positive_counts(path: str, batch_size: int = 1_000_000):
+    """Bloques de conteos > 0 (np.int64) leyendo solo la columna followers_count."""
+    _require_pyarrow()
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=['followers_count']):
+        column = batch.column(0)
+        rows = len(column)
+        positive = pc.filter(column, pc.fill_null(pc.greater(column, 0), False))
+        yield rows, positive.to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="CSV de conteos de la Fase 2")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Parquet de salida (con varios CSV se combinan en uno solo)")
+    args = parser.parse_args()
+    if len(args.inputs) == 1:
+        print(f"Guardado en: {csv_to_parquet(args.inputs[0], args.output)}")
+    else:
+        print(f"Guardado en: {combine_to_parquet(args.inputs, args.output or 'conteos_combinados.parquet')}")
@@ -0,0 +1,112 @@
+# count_cache.py
+import sqlite3
+import time
+
+DEFAULT_CACHE_FILE = "follower_counts_cache.sqlite"
+
+# Estados definitivos pero más volátiles que un conteo: caducan antes
+SHORT_TTL_STATUSES = {'PRIVADA', 'NO_EXISTE'}
+# Estados que nunca se guardan: se deben volver a intentar
+UNCACHEABLE_STATUSES = {'ERROR', 'NO_ENCONTRADO', 'TIMEOUT', 'LIMITADO', ''}
+
+
+class FollowerCountCache:
+    """Caché persistente (SQLite) de conteos por usuario, con TTL y tamaño máximo."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl_seconds: float = 7 * 24 * 3600,
+                 status_ttl_seconds: float = 24 * 3600, max_entries: int = 200_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.status_ttl_seconds = status_ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS follower_counts ("
+            " username TEXT PRIMARY KEY,"
+            " followers_count TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_follower_counts_fetched_at ON follower_counts (fetched_at)"
+        )
+        self._conn.commit()
+
+    def _ttl_for(self, followers_count: str) -> float:
+        return self.status_ttl_seconds if followers_count in SHORT_TTL_STATUSES else self.ttl_seconds
+
+    def get(self, username: str):
+        """Devuelve el conteo guardado si sigue vigente; si no, None (y cuenta como fallo)."""
+        row = self._conn.execute(
+            "SELECT followers_count, fetched_at FROM follower_counts WHERE username = ?", (username,)
+        ).fetchone()
+        if row and time.time() - row[1] <= self._ttl_for(row[0]):
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, username: str, followers_count: str, fetched_at: float = None):
+        if followers_count in UNCACHEABLE_STATUSES:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO follower_counts (username, followers_count, fetched_at) VALUES (?, ?, ?)",
+            (username, followers_count, fetched_at or time.time())
+        )
+        self._conn.commit()
+        self._puts_since_evict += 1
+        # La expulsión se hace por lotes para no contar la tabla en cada inserción
+        if self._puts_since_evict >= 500:
+            self.evict()
+
+    def fetched_times(self, usernames: list[str]) -> dict:
+        """{username: fetched_at} de los usuarios que están en la caché (vigentes o no)."""
+        times = {}
+        usernames = list(usernames)
+        for start in range(0, len(usernames), 500):
+            batch = usernames[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT username, fetched_at FROM follower_counts WHERE username IN ({', '.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            times.update(rows)
+        return times
+
+    def evict(self):
+        """Borra lo caducado y, si aún sobra, las entradas más antiguas hasta `max_entries`."""
+        now = time.time()
+        placeholders = ", ".join("?" * len(SHORT_TTL_STATUSES))
+        self._conn.execute(
+            "DELETE FROM follower_counts WHERE"
+            f" (followers_count IN ({placeholders}) AND fetched_at < ?)"
+            " OR fetched_at < ?",
+            (*SHORT_TTL_STATUSES, now - self.status_ttl_seconds, now - self.ttl_seconds)
+        )
+        (total,) = self._conn.execute("SELECT COUNT(*) FROM follower_counts").fetchone()
+        if total > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM follower_counts WHERE username IN ("
+                " SELECT username FROM follower_counts ORDER BY fetched_at LIMIT ?)",
+                (total - self.max_entries,)
+            )
+        self._conn.commit()
+        self._puts_since_evict = 0
+
+    def print_report(self):
+        total = self.hits + self.misses
+        if not total:
+            return
+        print(f"\n🗃️ Caché de conteos: {self.hits} aciertos ({self.hits / total:.1%}), "
+              f"{self.misses} fallos ({self.misses / total:.1%}).")
+
+    def close(self):
+        try:
+            self.evict()
+            self._conn.close()
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,153 @@
+# count_parsing.py
+import re
+
+import numpy as np
+import pandas as pd
+
+SENTINEL_VALUES = ['', 'PRIVADA', 'NO_EXISTE', 'NO_ENCONTRADO', 'ERROR', 'TIMEOUT', 'LIMITADO', 'ERROR_DESCONOCIDO']
+
+# Formatos habituales que se resuelven por columnas. Solo aceptan ASCII imprimible, así que
+# cualquier cosa rara (tabuladores, Unicode, signos negativos) cae en la ruta fila a fila y el
+# resultado es siempre idéntico al de `convert_count_to_numeric`.
+_SENTINEL_PATTERN = r' *(?:' + '|'.join(v for v in SENTINEL_VALUES if v) + r')? *'
+_SUFFIX_PATTERN = r' *[0-9][0-9,]*(?:\.[0-9]+)? *[{suffix}] *'
+# ASCII imprimible sin K, M ni '-': el valor es siempre la concatenación de sus dígitos
+# ("1,234", "1.234.567", "1234 seguidores"...), tanto si int() funciona como si no
+_DIGITS_TEXT_PATTERN = r'[\x20-\x2c\x2e-\x4a\x4c\x4e-\x6a\x6c\x6e-\x7e]*'
+_PLAIN_PATTERN = r' *[0-9][0-9,.]* *'
+# Más dígitos que esto no caben sin pérdida en int64: se dejan a la ruta fila a fila
+_MAX_DIGITS = 18
+
+
+def convert_count_to_numeric(count_str):
+    """Convierte el conteo a número entero, manejando diferentes formatos."""
+    if pd.isna(count_str):
+        return np.nan
+
+    # Si ya es numérico, retornarlo directamente
+    if isinstance(count_str, (int, float)):
+        return int(count_str) if count_str > 0 else np.nan
+
+    s = str(count_str).strip().upper()
+
+    # Si está vacío o es un string no numérico especial
+    if s in SENTINEL_VALUES:
+        return np.nan
+
+    # Manejar formatos con K (miles) y M (millones)
+    if 'K' in s:
+        try:
+            num = float(s.replace('K', '').replace(',', '').strip())
+            return int(num * 1000)
+        except ValueError:
+            return np.nan
+    elif 'M' in s:
+        try:
+            num = float(s.replace('M', '').replace(',', '').strip())
+            return int(num * 1000000)
+        except ValueError:
+            return np.nan
+
+    # Limpiar el string: quitar comas, puntos que sean separadores de miles
+    s_clean = s.replace(',', '').replace('.', '')
+
+    try:
+        num = int(s_clean)
+        return num if num > 0 else np.nan
+    except ValueError:
+        # Si falla, intentar extraer números del string
+        numbers = re.findall(r'\d+', s)
+        if numbers:
+            try:
+                num = int(''.join(numbers))
+                return num if num > 0 else np.nan
+            except ValueError:
+                return np.nan
+        return np.nan
+
+
+def _parse_numeric_column(values: pd.Series) -> pd.Series:
+    numbers = values.astype('float64')
+    # Igual que int(x) si x > 0: se trunca (0.5 → 0) y lo no positivo queda como NaN
+    return pd.Series(np.where(numbers > 0, np.trunc(numbers), np.nan), index=values.index)
+
+
+def _scale_suffix(raw: pd.Series, suffix: str, factor: int) -> np.ndarray:
+    cleaned = raw.str.replace(f'[ ,{suffix}{suffix.lower()}]', '', regex=True)
+    # float() de Python sobre cada cadena (mismo redondeo que la versión escalar)
+    numbers = np.asarray(cleaned, dtype=object).astype(np.float64)
+    return np.trunc(numbers * factor)
+
+
+def _strip_separators(values: pd.Series) -> pd.Series:
+    return values.str.replace(',', '', regex=False).str.replace('.', '', regex=False) \
+        .str.replace(' ', '', regex=False)
+
+
+def _strip_non_digits(values: pd.Series) -> pd.Series:
+    return values.str.replace(r'[^0-9]+', '', regex=True)
+
+
+def _as_string_column(values: pd.Series) -> pd.Series:
+    # Con pyarrow las operaciones de texto corren en C sobre toda la columna
+    try:
+        return values.astype('string[pyarrow]')
+    except ImportError:
+        return values.astype('string')
+
+
+def parse_counts(values: pd.Series) -> pd.Series:
+    """Versión por columnas de `convert_count_to_numeric`: mismos resultados, como float64 con NaN."""
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == 'empty':
+        return pd.Series(np.nan, index=values.index, dtype='float64')
+    if inferred in ('integer', 'floating', 'mixed-integer-float'):
+        return _parse_numeric_column(values)
+    if inferred != 'string':
+        # Tipos mezclados: no merece la pena, ruta fila a fila
+        return values.map(convert_count_to_numeric).astype('float64')
+
+    result = np.full(len(values), np.nan)
+    raw = _as_string_column(values)
+    missing = raw.isna().to_numpy()
+
+    def matches(mask, pattern, **kwargs):
+        # Solo se evalúa el regex sobre las filas de `mask`
+        found = np.zeros(len(raw), dtype=bool)
+        if mask.any():
+            found[mask] = raw[mask].str.fullmatch(pattern, **kwargs).fillna(False).to_numpy(dtype=bool)
+        return found
+
+    # Casi todo son dígitos con separadores o texto: se resuelve primero y el resto ya es poco
+    is_digits = matches(~missing, _DIGITS_TEXT_PATTERN)
+    rest = ~missing & ~is_digits
+    is_sentinel = matches(rest, _SENTINEL_PATTERN, case=False)
+    rest &= ~is_sentinel
+    is_k = matches(rest, _SUFFIX_PATTERN.format(suffix='kK'))
+    is_m = matches(rest & ~is_k, _SUFFIX_PATTERN.format(suffix='mM'))
+
+    # Lo habitual ("1,234", "1.234.567") se limpia con reemplazos literales, mucho más baratos;
+    # el resto de filas con texto se limpia con un regex
+    is_plain = matches(is_digits, _PLAIN_PATTERN)
+    for mask, clean in ((is_plain, _strip_separators), (is_digits & ~is_plain, _strip_non_digits)):
+        if not mask.any():
+            continue
+        digits = clean(raw[mask])
+        lengths = digits.str.len().to_numpy()
+        # Vacío → sin dígitos → NaN; demasiado largo → ruta fila a fila
+        convertible = (lengths > 0) & (lengths <= _MAX_DIGITS)
+        indices = np.flatnonzero(mask)
+        is_digits[indices[lengths > _MAX_DIGITS]] = False
+        numbers = digits[convertible].astype('int64').to_numpy(dtype=np.float64)
+        result[indices[convertible]] = np.where(numbers > 0, numbers, np.nan)
+    if is_k.any():
+        result[is_k] = _scale_suffix(raw[is_k], 'K', 1000)
+    if is_m.any():
+        result[is_m] = _scale_suffix(raw[is_m], 'M', 1000000)
+
+    # Lo que no encaja en ningún formato conocido se convierte fila a fila
+    slow = ~(missing | is_sentinel | is_digits | is_k | is_m)
+    if slow.any():
+        result[slow] = values[slow].map(convert_count_to_numeric).astype('float64').to_numpy()
+
+    return pd.Series(result, index=values.index)
@@ -1,69 +1,44 @@
 # data_analyzer.py
 import pandas as pd
-import matplotlib.pyplot as plt
 from collections import Counter
+import time
 import numpy as np
+from metrics import MetricsRecorder
+from columnar_store import is_parquet, iter_positive_counts, read_counts
+from count_parsing import convert_count_to_numeric, parse_counts
+from benford import BenfordAccumulator, BenfordAnalysis, EXPECTED, analyze_benford, first_digits
 
 
 class DataAnalyzer:
     """Clase para limpiar datos, aplicar análisis del primer dígito y graficar (Ley de Benford)."""
 
-    def __init__(self, input_csv_path):
+    def __init__(self, input_csv_path, metrics: MetricsRecorder = None, show_plot: bool = True,
+                 dpi: int = 300):
         self.input_csv_path = input_csv_path
+        # Sin ventana (servidores sin pantalla, análisis por lotes): solo se guarda el PNG
+        self.show_plot = show_plot
+        self.dpi = dpi
         self.df = pd.DataFrame()
+        # Último resultado de las pruebas de Benford (BenfordAnalysis)
+        self.benford_result = None
+        # Tiempos de lectura, conversión, histograma y gráfico
+        self.metrics = metrics or MetricsRecorder()
 
     def _convert_count_to_numeric(self, count_str):
         """Convierte el conteo a número entero, manejando diferentes formatos."""
-        if pd.isna(count_str):
-            return np.nan
-
-        # Si ya es numérico, retornarlo directamente
-        if isinstance(count_str, (int, float)):
-            return int(count_str) if count_str > 0 else np.nan
-
-        s = str(count_str).strip().upper()
-
-        # Si está vacío o es un string no numérico especial
-        if s in ['', 'PRIVADA', 'NO_EXISTE', 'NO_ENCONTRADO', 'ERROR', 'TIMEOUT', 'ERROR_DESCONOCIDO']:
-            return np.nan
-
-        # Manejar formatos con K (miles) y M (millones)
-        if 'K' in s:
-            try:
-                num = float(s.replace('K', '').replace(',', '').strip())
-                return int(num * 1000)
-            except ValueError:
-                return np.nan
-        elif 'M' in s:
-            try:
-                num = float(s.replace('M', '').replace(',', '').strip())
-                return int(num * 1000000)
-            except ValueError:
-                return np.nan
-
-        # Limpiar el string: quitar comas, puntos que sean separadores de miles
-        s_clean = s.replace(',', '').replace('.', '')
-
-        try:
-            num = int(s_clean)
-            return num if num > 0 else np.nan
-        except ValueError:
-            # Si falla, intentar extraer números del string
-            import re
-            numbers = re.findall(r'\d+', s)
-            if numbers:
-                try:
-                    num = int(''.join(numbers))
-                    return num if num > 0 else np.nan
-                except ValueError:
-                    return np.nan
-            return np.nan
+        return convert_count_to_numeric(count_str)
 
     def clean_and_prepare_data(self):
-        """Lee el CSV, elimina filas no numéricas y prepara los datos."""
+        """Lee el CSV (o el Parquet tipado), elimina filas no numéricas y prepara los datos."""
+        parquet = is_parquet(self.input_csv_path)
         try:
-            self.df = pd.read_csv(self.input_csv_path)
-            print(f" Leídos {len(self.df)} registros del CSV.")
+            with self.metrics.timer('analisis_segundos', etapa='lectura'):
+                if parquet:
+                    # Solo la columna necesaria, ya como entero: no hay nada que convertir
+                    self.df = read_counts(self.input_csv_path, columns=['followers_count'])
+                else:
+                    self.df = pd.read_csv(self.input_csv_path)
+            print(f" Leídos {len(self.df)} registros del {'Parquet' if parquet else 'CSV'}.")
 
             # Mostrar una muestra de los datos crudos
             print("\n Muestra de datos crudos:")
@@ -78,7 +53,11 @@ class DataAnalyzer:
 
         # Aplicar la limpieza
         print("\n Limpiando datos...")
-        self.df['followers_numeric'] = self.df['followers_count'].apply(self._convert_count_to_numeric)
+        with self.metrics.timer('analisis_segundos', etapa='conversion'):
+            if parquet:
+                self.df['followers_numeric'] = self.df['followers_count'].astype('float64')
+            else:
+                self.df['followers_numeric'] = parse_counts(self.df['followers_count'])
 
         # Mostrar estadísticas de la limpieza
         total_rows = len(self.df)
@@ -104,47 +83,138 @@ class DataAnalyzer:
             self.df = pd.DataFrame()
 
     def analyze_and_plot_first_digit(self, graph_filename: str):
-        """Saca el primer dígito, calcula frecuencias y grafica la Ley de Benford."""
+        """Pruebas de Benford (primer, segundo, dos primeros y dos últimos dígitos) y gráfico.
+
+        Devuelve el BenfordAnalysis (también queda en `self.benford_result`).
+        """
         if self.df.empty:
             print("No hay datos limpios para analizar.")
-            return
-
-        # Sacar el primer dígito de la izquierda
-        self.df['first_digit'] = self.df['followers_numeric'].astype(str).str[0].astype(int)
+            return None
 
-        # Verificar que solo tengamos dígitos del 1-9
-        valid_digits = self.df[self.df['first_digit'].between(1, 9)]
+        with self.metrics.timer('analisis_segundos', etapa='histograma'):
+            values = self.df['followers_numeric'].to_numpy()
+            # Sacar el primer dígito de la izquierda (aritméticamente, sin pasar por texto)
+            self.df['first_digit'] = first_digits(values)
+            analysis = analyze_benford(values)
 
-        if len(valid_digits) == 0:
+        if analysis.first_digit.n == 0:
             print("No hay dígitos válidos (1-9) para analizar.")
-            return
-
-        # Conteo de cada dígito (1 al 9)
-        digit_counts = valid_digits['first_digit'].value_counts().sort_index()
+            return None
+        return self._report_benford(analysis, graph_filename)
+
+    def _report_benford(self, analysis: BenfordAnalysis, graph_filename: str) -> BenfordAnalysis:
+        """Imprime la tabla del primer dígito y las pruebas, y genera el gráfico (común a todos los modos)."""
+        self.benford_result = analysis
+        first = analysis.first_digit
+        digit_counts = pd.Series(first.counts, index=range(1, 10))
         total_count = digit_counts.sum()
         frequencies = (digit_counts / total_count) * 100
 
         print("\n" + "=" * 50)
         print("RESULTADOS DEL ANÁLISIS DEL PRIMER DÍGITO")
         print("=" * 50)
-        for digit in range(1, 10):
+        for i, digit in enumerate(range(1, 10)):
             count = digit_counts.get(digit, 0)
             freq = frequencies.get(digit, 0)
-            print(f"Dígito {digit}: {count:4d} ocurrencias ({freq:6.2f}%)")
+            print(f"Dígito {digit}: {count:4d} ocurrencias ({freq:6.2f}%)   "
+                  f"IC {first.confidence:.0%} [{first.ci_low[i] * 100:6.2f}%, {first.ci_high[i] * 100:6.2f}%]   "
+                  f"Benford {first.expected[i] * 100:6.2f}%")
 
         print(f"\nTotal de números analizados: {total_count}")
+        self._print_tests(analysis)
 
         # Gráfico
         self._create_benford_plot(frequencies, digit_counts, graph_filename)
+        return analysis
+
+    def _print_tests(self, analysis: BenfordAnalysis):
+        print("\n" + "=" * 50)
+        print("PRUEBAS DE BONDAD DE AJUSTE")
+        print("=" * 50)
+        for test in analysis.tests.values():
+            if not test.n:
+                print(f"{test.name:<15} sin datos suficientes")
+                continue
+            print(f"{test.name:<15} n={test.n:<10} chi²({test.chi2_dof})={test.chi2:10.2f} p={test.chi2_p:.4f}   "
+                  f"MAD={test.mad:.5f} [{test.mad_ci[0]:.5f}, {test.mad_ci[1]:.5f}]"
+                  f"{f' ({test.conformity})' if test.conformity else ''}")
+            print(f"{'':<15} KS={test.ks:.5f} p={test.ks_p:.4f}   Kuiper={test.kuiper:.5f} p={test.kuiper_p:.4f}")
+
+    def analyze_streaming(self, graph_filename: str, chunksize: int = 1_000_000):
+        """Análisis de Benford leyendo el CSV por bloques, con memoria acotada por `chunksize`.
+
+        Produce las mismas tablas, pruebas y gráfico que `clean_and_prepare_data` +
+        `analyze_and_plot_first_digit`; la mediana es aproximada.
+        """
+        accumulator = BenfordAccumulator()
+        total_rows = 0
+        # Por etapa, sumando todos los bloques
+        seconds = {'lectura': 0.0, 'conversion': 0.0, 'histograma': 0.0}
+        try:
+            parquet = is_parquet(self.input_csv_path)
+            if parquet:
+                # Bloques ya tipados y filtrados (> 0): no hay etapa de conversión
+                chunks = iter_positive_counts(self.input_csv_path, chunksize)
+            else:
+                reader = pd.read_csv(self.input_csv_path, usecols=['followers_count'], chunksize=chunksize)
+                chunks = ((len(chunk), chunk['followers_count']) for chunk in reader)
+            start = time.perf_counter()
+            for rows, values in chunks:
+                parsed_at = time.perf_counter()
+                seconds['lectura'] += parsed_at - start
+                total_rows += rows
+                if not parquet:
+                    numeric = parse_counts(values).to_numpy()
+                    values = numeric[numeric > 0].astype(np.int64)
+                counted_at = time.perf_counter()
+                seconds['conversion'] += counted_at - parsed_at
+                accumulator.update(values)
+                start = time.perf_counter()
+                seconds['histograma'] += start - counted_at
+        except FileNotFoundError:
+            print(f" Error: Archivo '{self.input_csv_path}' no encontrado.")
+            return None
+        except Exception as e:
+            print(f" Error al leer el CSV: {e}")
+            return None
+
+        for stage, stage_seconds in seconds.items():
+            self.metrics.record_duration('analisis_segundos', stage_seconds, etapa=stage)
+        print(f" Leídos {total_rows} registros del {'Parquet' if parquet else 'CSV'} (por bloques de {chunksize}).")
+        return self.report_accumulator(accumulator, graph_filename, total_rows)
+
+    def report_accumulator(self, accumulator: BenfordAccumulator, graph_filename: str, total_rows: int):
+        """Estadísticas, pruebas y gráfico a partir de un acumulador ya lleno (por bloques o en tubería).
+
+        Devuelve el BenfordAnalysis, o None si no hay datos válidos.
+        """
+        print(f"Datos válidos: {accumulator.count}")
+        print(f"Datos inválidos/eliminados: {total_rows - accumulator.count}")
+
+        if not accumulator.count:
+            print("No hay datos válidos para analizar.")
+            return None
+
+        print(f"\n Datos finales para análisis: {accumulator.count} registros")
+        print(" Estadísticas de seguidores:")
+        print(f"   Mínimo: {accumulator.minimum}")
+        print(f"   Máximo: {accumulator.maximum}")
+        print(f"   Media: {accumulator.mean:.2f}")
+        print(f"   Mediana (aprox.): {accumulator.approximate_median:.1f}")
+
+        return self._report_benford(accumulator.analysis(), graph_filename)
 
     def _create_benford_plot(self, frequencies: pd.Series, digit_counts: pd.Series, filename: str):
         """Genera y guarda el gráfico de Benford mostrando números reales."""
-        # Distribución teórica de Benford (%)
-        benford_data = {
-            1: 30.1, 2: 17.6, 3: 12.5, 4: 9.7, 5: 7.9,
-            6: 6.7, 7: 5.8, 8: 5.1, 9: 4.6
-        }
-        benford_df = pd.Series(benford_data)
+        start = time.perf_counter()
+        # pyplot (medio segundo de importación) solo cuando hay algo que dibujar
+        if not self.show_plot:
+            import matplotlib
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        # Distribución teórica de Benford (%), exacta: log10(1 + 1/d)
+        benford_df = pd.Series(EXPECTED['primer_digito'] * 100, index=range(1, 10))
 
         # Asegurar que el índice coincida (1-9) y llenar con 0 los dígitos faltantes
         frequencies = frequencies.reindex(range(1, 10), fill_value=0)
@@ -185,8 +255,13 @@ class DataAnalyzer:
         plt.tight_layout()
 
         # Guardar el gráfico
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
+        plt.savefig(filename, dpi=self.dpi, bbox_inches='tight')
         print(f"\n📸 Gráfico de Benford guardado en: **{filename}**")
+        # Sin contar la ventana interactiva, que espera al usuario
+        self.metrics.record_duration('analisis_segundos', time.perf_counter() - start, etapa='grafico')
 
         # Mostrar el gráfico
-        plt.show()
\ No newline at end of file
+        if self.show_plot:
+            plt.show()
+        # Liberar la figura: en lotes o ejecuciones largas se acumularían
+        plt.close()
\ No newline at end of file
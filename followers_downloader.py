@@ -1,123 +1,220 @@
 # followers_downloader.py
+import asyncio
 import csv
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from wait_stats import WaitStats
+from browser_session import BrowserSession, INSTAGRAM_URL, PAGE_TIMEOUT_MS, SCROLL_TIMEOUT
+from following_capture import FollowingResponseCapture
+from rate_controller import RateController
+from metrics import MetricsRecorder
+
+# Scrolls seguidos con 429 antes de dar la lista por terminada
+MAX_THROTTLED_SCROLLS = 5
+
+FOLLOWING_LINK_SELECTOR = "a[href*='/following/']"
+MODAL_SELECTOR = "div[role='dialog']"
+
+# Devuelve solo los usuarios de enlaces que aún no se habían visto (marcados con data-ig-seen),
+# así cada llamada cuesta O(nuevos) en vez de O(todos).
+_HARVEST_JS = """
+const harvest = (modal) => {
+    const reserved = new Set(['explore', 'accounts', 'p', 'reel', 'reels', 'stories', 'direct', 'tv']);
+    const names = [];
+    for (const link of modal.querySelectorAll('a[href]:not([data-ig-seen])')) {
+        link.setAttribute('data-ig-seen', '1');
+        const match = new URL(link.href, location.href).pathname.match(/^\\/([A-Za-z0-9._]+)\\/?$/);
+        if (match && !reserved.has(match[1])) names.push(match[1]);
+    }
+    return names;
+};
+"""
+
+HARVEST_SCRIPT = "(modal) => {" + _HARVEST_JS + "return harvest(modal);\n}"
+
+# Recoge lo nuevo, hace scroll y espera (MutationObserver) a que aparezcan enlaces nuevos o al
+# tiempo límite: una sola ida y vuelta al navegador por scroll.
+HARVEST_AND_SCROLL_SCRIPT = "(modal, timeoutMs) => new Promise((done) => {" + _HARVEST_JS + """
+const usernames = harvest(modal);
+const scroller = modal.__igScroller || (modal.__igScroller =
+    [modal, ...modal.querySelectorAll('div')].find(el => el.scrollHeight > el.clientHeight + 1 &&
+        /(auto|scroll)/.test(getComputedStyle(el).overflowY)) || modal);
+let finished = false;
+const finish = (grew) => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done({usernames: usernames, grew: grew});
+};
+const observer = new MutationObserver(() => {
+    if (modal.querySelector('a[href]:not([data-ig-seen])')) finish(true);
+});
+observer.observe(modal, {childList: true, subtree: true});
+const timer = setTimeout(() => finish(false), timeoutMs);
+scroller.scrollTop = scroller.scrollHeight;
+if (modal.querySelector('a[href]:not([data-ig-seen])')) finish(true);
+})"""
 
 
 class FollowersDownloader:
-    """Descarga los SEGUIDOS de una cuenta de Instagram usando Selenium"""
+    """Descarga los SEGUIDOS de una cuenta de Instagram usando Playwright (el mismo navegador que la Fase 2)"""
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, lean=False, session_file=None, capture_network=False,
+                 rate_controller: RateController = None, base_url: str = INSTAGRAM_URL,
+                 metrics: MetricsRecorder = None, session: BrowserSession = None):
         self.username = username
         self.password = password
-
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--disable-notifications")
-
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
-        self.wait = WebDriverWait(self.driver, 15)
-
-        self._login()
-
-    # ---------------------------
-    # LOGIN
-    # ---------------------------
-    def _login(self):
-        self.driver.get("https://www.instagram.com/accounts/login/")
-        time.sleep(4)
-
-        username_input = self.wait.until(
-            EC.presence_of_element_located((By.NAME, "username"))
-        )
-        password_input = self.driver.find_element(By.NAME, "password")
-
-        username_input.send_keys(self.username)
-        password_input.send_keys(self.password)
-        password_input.send_keys(Keys.ENTER)
-
-        time.sleep(6)
-
-        # Botones opcionales "Guardar info" y "Notificaciones"
-        for _ in range(2):
-            try:
-                btn = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Ahora no')]"))
-                )
-                btn.click()
-                time.sleep(2)
-            except:
-                pass
+        # Modo red: usuarios (y conteos, si vienen) sacados de las respuestas JSON del modal
+        self.capture = FollowingResponseCapture() if capture_network else None
+        # Ritmo de la cuenta (compartido con la Fase 2 si se pasa el mismo); cada scroll pide una página
+        self.rate_controller = rate_controller or RateController()
+        # Métricas estructuradas: login, cada scroll, usuarios y bytes
+        self.metrics = metrics or MetricsRecorder()
+        self.wait_stats = WaitStats()
+        # Navegador y login compartidos con la Fase 2 si se pasa la sesión; si no, uno propio
+        # (con la sesión guardada en `session_file` y, en modo ligero, sin imágenes ni tracking)
+        self._owns_session = session is None
+        self.session = session or BrowserSession(username, password, lean=lean, session_file=session_file,
+                                                 base_url=base_url, metrics=self.metrics,
+                                                 wait_stats=self.wait_stats)
+        self.base_url = self.session.base_url
+        self.page = None
+
+    async def _get_page(self):
+        if self.page is None or self.page.is_closed():
+            self.page = await self.session.acquire_page('1')
+            if self.capture:
+                self.page.on("response", self.capture.on_response)
+        return self.page
 
     # ---------------------------
     # DESCARGA DE SEGUIDOS
     # ---------------------------
-    def download_and_save_followers(self, target_account, limit, output_csv):
-        self.driver.get(f"https://www.instagram.com/{target_account}/")
-        time.sleep(5)
+    async def download_followers(self, target_account, limit, output_csv, on_batch=None):
+        """Recorre el modal de seguidos y guarda la lista en `output_csv`.
+
+        Si se pasa `on_batch` (corrutina), se le entregan los usuarios nuevos [(username, conteo o
+        None)] en cuanto se descubren, para que la Fase 2 pueda empezar sin esperar al CSV.
+        """
+        if not await self.session.login(phase='1'):
+            raise RuntimeError("No se pudo iniciar sesión en Instagram")
+        page = await self._get_page()
+        await page.goto(f"{self.base_url}/{target_account}/", wait_until="domcontentloaded")
 
         # 👉 BOTÓN DE SEGUIDOS (FOLLOWING)
-        following_btn = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//a[contains(@href,'/following/')]"))
-        )
-        following_btn.click()
-        time.sleep(3)
+        with self.wait_stats.measure('perfil_objetivo'):
+            await page.click(FOLLOWING_LINK_SELECTOR, timeout=PAGE_TIMEOUT_MS)
 
         # Modal
-        modal = self.wait.until(
-            EC.presence_of_element_located((By.XPATH, "//div[@role='dialog']"))
-        )
+        with self.wait_stats.measure('modal'):
+            modal = await page.wait_for_selector(MODAL_SELECTOR, timeout=PAGE_TIMEOUT_MS)
 
-        usernames = set()
-        last_count = 0
-
-        print("📥 Extrayendo SEGUIDOS...")
-
-        while len(usernames) < limit:
-            links = modal.find_elements(By.XPATH, ".//a[contains(@href,'/')]")
-
-            for link in links:
-                username = link.get_attribute("href").split("/")[-2]
-                if username and username not in usernames:
-                    usernames.add(username)
+        # dict para conservar el orden de aparición sin duplicados: username → conteo (o None)
+        usernames = {}
 
+        async def add(batch):
+            new = []
+            for username, count in batch:
                 if len(usernames) >= limit:
                     break
+                if username not in usernames:
+                    new.append((username, count))
+                if usernames.get(username) is None:
+                    usernames[username] = count
+            if on_batch and new:
+                await on_batch(new)
 
-            # Scroll dentro del modal
-            self.driver.execute_script(
-                "arguments[0].scrollTop = arguments[0].scrollHeight", modal
-            )
-            time.sleep(2)
+        print("📥 Extrayendo SEGUIDOS...")
+        throttled_in_a_row = 0
+        if self.capture:
+            # Lo que llegó al abrir el modal (primera página) cuenta desde el principio
+            await add(await self.capture.drain())
 
-            # Si no hay cambios, detener
-            if len(usernames) == last_count:
-                print("⚠️ No se detectan más usuarios.")
-                break
+        while len(usernames) < limit:
+            await self.rate_controller.throttle()
+            before = len(usernames)
+            # Las respuestas del scroll llegan mientras se espera el evaluate: contar desde antes
+            throttled_before = self.capture.throttled if self.capture else 0
+            start = time.perf_counter()
+            # Lo nuevo desde el último scroll + scroll + espera a que la lista crezca, en una llamada
+            with self.wait_stats.measure('scroll_lista'):
+                result = await modal.evaluate(HARVEST_AND_SCROLL_SCRIPT, SCROLL_TIMEOUT * 1000)
+
+            if self.capture:
+                # El scroll solo sirve para pedir la siguiente página; los datos salen del JSON
+                network_users = await self.capture.drain()
+                await add(network_users)
+                if self.capture.throttled > throttled_before:
+                    # 429 en la paginación: bajar el ritmo y volver a intentar el mismo scroll
+                    self.rate_controller.record_congestion("429 en la lista de seguidos")
+                    self.metrics.increment('reintentos_total', tipo='scroll_429')
+                    throttled_in_a_row += 1
+                    if throttled_in_a_row >= MAX_THROTTLED_SCROLLS:
+                        print("⚠️ Instagram sigue limitando la lista; se guarda lo recopilado.")
+                        break
+                    continue
+                throttled_in_a_row = 0
+                self.rate_controller.record_success()
+                if not self.capture.has_more or (not result["grew"] and not network_users):
+                    print("⚠️ No quedan más páginas de seguidos.")
+                    break
+            else:
+                await add((username, None) for username in result["usernames"])
+                self.rate_controller.record_success()
+
+                # Si la lista dejó de crecer, recoger lo último y detener
+                if not result["grew"]:
+                    await add((username, None) for username in await modal.evaluate(HARVEST_SCRIPT))
+                    print("⚠️ No se detectan más usuarios.")
+                    break
 
-            last_count = len(usernames)
+            self._record_scroll(len(usernames) - before, result["grew"], time.perf_counter() - start)
             print(f"   ➜ {len(usernames)} seguidos recopilados")
 
-        # Guardar CSV
+        # Guardar CSV (en modo red, con el conteo de seguidores cuando la respuesta lo trae)
         with open(output_csv, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
-            writer.writerow(["username"])
-            for u in usernames:
-                writer.writerow([u])
+            if self.capture:
+                writer.writerow(["username", "followers_count"])
+                for u, count in usernames.items():
+                    writer.writerow([u, "" if count is None else count])
+            else:
+                writer.writerow(["username"])
+                for u in usernames:
+                    writer.writerow([u])
 
         print(f"\n✅ {len(usernames)} seguidos guardados en {output_csv}")
+        self.wait_stats.print_report("Tiempos de espera (Fase 1)")
+        self.rate_controller.print_report("Ritmo de scroll (Fase 1)")
+        self.metrics.set_gauge('ritmo_peticiones', self.rate_controller.rate, fase='1')
+        if self.capture:
+            known = sum(count is not None for count in usernames.values())
+            print(f"🌐 {self.capture.pages} páginas de red leídas; "
+                  f"{known} conteos obtenidos sin visitar el perfil.")
+        if self.session.resource_blocker:
+            self.session.resource_blocker.print_report("Modo ligero (Fase 1)")
+
+    def download_and_save_followers(self, target_account, limit, output_csv):
+        """Versión síncrona con navegador propio: abre, descarga y cierra en un solo bucle."""
+        async def run():
+            try:
+                await self.download_followers(target_account, limit, output_csv)
+            finally:
+                await self.close()
+
+        asyncio.run(run())
+
+    def _record_scroll(self, new_users: int, grew: bool, seconds: float):
+        self.metrics.increment('usuarios_descubiertos_total', new_users)
+        self.metrics.observe('scroll_segundos', seconds)
+        self.metrics.event('scroll', nuevos=new_users, crecio=grew, seconds=round(seconds, 4))
 
-    def close_driver(self):
+    async def close(self):
+        """Cierra el navegador si es propio; con una sesión compartida, solo la página de la Fase 1."""
         try:
-            self.driver.quit()
+            if self._owns_session:
+                await self.session.close()
+            elif self.page and not self.page.is_closed():
+                await self.page.close()
         except:
             pass
@@ -0,0 +1,79 @@
+# following_capture.py
+import re
+
+# Respuestas paginadas con las que Instagram rellena el modal de "seguidos"
+FOLLOWING_URL_PATTERN = re.compile(r"/api/v1/friendships/\d+/following/|/graphql/query")
+
+
+def _follower_count(user: dict):
+    if isinstance(user.get("follower_count"), int):
+        return user["follower_count"]
+    edge = user.get("edge_followed_by")
+    if isinstance(edge, dict) and isinstance(edge.get("count"), int):
+        return edge["count"]
+    return None
+
+
+def parse_following_payload(payload: dict) -> tuple[list[tuple[str, int]], bool]:
+    """Extrae [(username, follower_count o None)] y si quedan más páginas de una respuesta.
+
+    Entiende la API REST (`users` + `next_max_id`) y la GraphQL (`edge_follow.edges` + `page_info`).
+    """
+    users = []
+    has_more = False
+
+    if isinstance(payload.get("users"), list):
+        for user in payload["users"]:
+            if isinstance(user, dict) and user.get("username"):
+                users.append((user["username"], _follower_count(user)))
+        has_more = bool(payload.get("next_max_id")) or bool(payload.get("has_more"))
+        return users, has_more
+
+    edge_follow = (((payload.get("data") or {}).get("user") or {}).get("edge_follow") or {})
+    for edge in edge_follow.get("edges", []):
+        node = edge.get("node") or {}
+        if node.get("username"):
+            users.append((node["username"], _follower_count(node)))
+    has_more = bool((edge_follow.get("page_info") or {}).get("has_next_page"))
+    return users, has_more
+
+
+class FollowingResponseCapture:
+    """Recoge las respuestas JSON del modal de seguidos (evento "response" de la página de Playwright)."""
+
+    def __init__(self):
+        self._pending = []
+        self.pages = 0
+        self.has_more = True
+        # Respuestas 429 de la paginación (Instagram frenando el scroll)
+        self.throttled = 0
+
+    def on_response(self, response):
+        """Listener de `page.on("response")`: aparta las páginas de la lista para leerlas después."""
+        if FOLLOWING_URL_PATTERN.search(response.url):
+            if response.status == 429:
+                self.throttled += 1
+            else:
+                self._pending.append(response)
+
+    async def drain(self) -> list[tuple[str, int]]:
+        """Lee las respuestas apartadas desde la última llamada y devuelve sus usuarios."""
+        responses, self._pending = self._pending, []
+        users = []
+        for response in responses:
+            users.extend(await self._read_body(response))
+        return users
+
+    async def _read_body(self, response) -> list[tuple[str, int]]:
+        try:
+            payload = await response.json()
+        except Exception:
+            return []
+        if not isinstance(payload, dict):
+            return []
+        users, has_more = parse_following_payload(payload)
+        # Otras consultas GraphQL de la página no traen usuarios: se ignoran
+        if users:
+            self.has_more = has_more
+            self.pages += 1
+        return users
@@ -1,85 +1,371 @@
+import argparse
+import asyncio
+import functools
 import os
 import sys
-from followers_downloader import FollowersDownloader
-from profile_scraper import ProfileScraper
-from data_analyzer import DataAnalyzer
-from credentials import USERNAME, PASSWORD, CUENTA_OBJETIVO, LIMITE_SEGUIDORES
+from count_cache import DEFAULT_CACHE_FILE
+from metrics import MetricsRecorder
+import results_store
+# Playwright, pandas y matplotlib se importan al empezar la fase que los usa:
+# la Fase 3 sola arranca sin cargar los navegadores
+
+try:
+    import credentials  # solo las Fases 1 y 2 necesitan usuario y contraseña
+except ImportError:
+    credentials = None
+
+USERNAME = getattr(credentials, "USERNAME", None)
+PASSWORD = getattr(credentials, "PASSWORD", None)
+CUENTA_OBJETIVO = getattr(credentials, "CUENTA_OBJETIVO", None)
+LIMITE_SEGUIDORES = getattr(credentials, "LIMITE_SEGUIDORES", None)
+CUENTAS_OBJETIVO = getattr(credentials, "CUENTAS_OBJETIVO", [])  # varios objetivos con la Fase 2 compartida
+
+# Ajustes opcionales de credentials.py
+CONCURRENCIA = getattr(credentials, "CONCURRENCIA", 1)  # páginas en paralelo en la Fase 2
+MODO_LIGERO = getattr(credentials, "MODO_LIGERO", False)  # bloquea imágenes, vídeo, fuentes y tracking
+USAR_CACHE = getattr(credentials, "USAR_CACHE", True)  # caché local de conteos entre ejecuciones
+CACHE_TTL_HORAS = getattr(credentials, "CACHE_TTL_HORAS", 168)
+ANALISIS_POR_BLOQUES = getattr(credentials, "ANALISIS_POR_BLOQUES", False)  # Fase 3 con memoria acotada
+CAPTURA_RED = getattr(credentials, "CAPTURA_RED", False)  # Fase 1 desde las respuestas JSON del modal
+MODO_OBTENCION = getattr(credentials, "MODO_OBTENCION", "browser")  # Fase 2: "browser" o "http"
+PROCESOS = getattr(credentials, "PROCESOS", 1)  # Fase 2 repartida en varios procesos/navegadores
+CUENTAS_EXTRA = getattr(credentials, "CUENTAS_EXTRA", [])  # [(usuario, contraseña), ...] para los procesos
+EN_TUBERIA = getattr(credentials, "EN_TUBERIA", False)  # opción 0 con las fases solapadas
+# Ritmo adaptativo por cuenta (peticiones/s): arranca en el inicial y se ajusta solo entre mín. y máx.
+RITMO_INICIAL = getattr(credentials, "RITMO_INICIAL", 0.3)
+RITMO_MINIMO = getattr(credentials, "RITMO_MINIMO", 0.05)
+RITMO_MAXIMO = getattr(credentials, "RITMO_MAXIMO", 2.0)
+PETICIONES_EN_VUELO = getattr(credentials, "PETICIONES_EN_VUELO", 2)  # por cuenta
+# Métricas de cada ejecución: JSON lines (None para desactivar) y textfile de Prometheus opcional
+METRICAS_JSONL = getattr(credentials, "METRICAS_JSONL", "metricas.jsonl")
+METRICAS_PROMETHEUS = getattr(credentials, "METRICAS_PROMETHEUS", None)
+MOSTRAR_GRAFICO = getattr(credentials, "MOSTRAR_GRAFICO", True)  # False en servidores sin pantalla
+FORMATO_CONTEOS = getattr(credentials, "FORMATO_CONTEOS", "csv")  # "csv" o "parquet" (requiere pyarrow)
+NAVEGADOR_VISIBLE = getattr(credentials, "NAVEGADOR_VISIBLE", False)  # True para ver la ventana de Chromium
+# Memoria acotada en la Fase 2 (0 desactiva cada criterio; la memoria se mide con psutil si está)
+RECICLAR_PAGINA_CADA = getattr(credentials, "RECICLAR_PAGINA_CADA", 200)  # navegaciones por página
+RECICLAR_CONTEXTO_CADA = getattr(credentials, "RECICLAR_CONTEXTO_CADA", 2000)  # navegaciones por contexto
+LIMITE_MEMORIA_NAVEGADOR_MB = getattr(credentials, "LIMITE_MEMORIA_NAVEGADOR_MB", 1500)
 
 
 class MainApp:
     """Clase principal que coordina las fases del programa."""
 
-    def __init__(self, username, password, target_account, limit):
+    def __init__(self, username, password, target_account, limit, concurrency=1, lean=False,
+                 use_cache=True, cache_ttl_hours=168, streaming_analysis=False, capture_network=False,
+                 fetch_mode="browser", shards=1, extra_accounts=None, pipelined=False,
+                 rate_limits=None, metrics=None, show_plot=True, counts_format="csv",
+                 followers_list_csv=None, output_counts_csv=None, graph_filename=None, rate_controller=None,
+                 headless=True, recycle_limits=None):
         self.username = username
         self.password = password
         self.target_account = target_account
         self.limit = limit
+        self.concurrency = concurrency
+        self.lean = lean
+        self.use_cache = use_cache
+        self.cache_ttl_hours = cache_ttl_hours
+        # Fase 3 por bloques, con memoria acotada (para archivos de conteos muy grandes)
+        self.streaming_analysis = streaming_analysis
+        # Fase 1 desde las respuestas JSON del modal en vez del DOM
+        self.capture_network = capture_network
+        # Fase 2: "browser" (render completo) o "http" (endpoint JSON con las cookies de la sesión)
+        self.fetch_mode = fetch_mode
+        # Fase 2 en varios procesos (cada uno con su navegador); las cuentas se reparten entre ellos
+        self.shards = shards
+        self.accounts = [(username, password)] + list(extra_accounts or [])
+        # "Ejecutar todo" solapando las fases en vez de encadenarlas
+        self.pipelined = pipelined
+        # Argumentos de RateController; la cuenta principal comparte uno entre la Fase 1 y la 2
+        # (y entre objetivos, si se pasa uno ya creado)
+        self.rate_limits = dict(rate_limits or {})
+        self._rate_controller = rate_controller
+        # Métricas compartidas por las tres fases (MetricsRecorder)
+        self.metrics = metrics or MetricsRecorder()
+        # Abrir la ventana del gráfico al terminar la Fase 3 (el PNG se guarda siempre)
+        self.show_plot = show_plot
+        # "parquet": además del CSV de trabajo, conteos tipados que la Fase 3 lee sin convertir texto
+        if counts_format not in ("csv", "parquet"):
+            raise ValueError(f"Formato de conteos desconocido: {counts_format}")
+        self.counts_format = counts_format
+        # Chromium sin ventana (por defecto) y argumentos de PageRecycler para la Fase 2
+        self.headless = headless
+        self.recycle_limits = dict(recycle_limits or {})
 
-        # 🔹 Nombres de archivos (texto)
-        self.followers_list_csv = f"{target_account}_following_list.csv"
-        self.output_counts_csv = f"{target_account}_following_counts.csv"
-        self.graph_filename = f"{target_account}_benford_analysis.png"
+        # 🔹 Nombres de archivos (texto); por defecto, derivados de la cuenta objetivo
+        self.followers_list_csv = followers_list_csv or f"{target_account}_following_list.csv"
+        self.output_counts_csv = output_counts_csv or f"{target_account}_following_counts.csv"
+        self.graph_filename = graph_filename or f"{target_account}_benford_analysis.png"
+        self.output_counts_parquet = os.path.splitext(self.output_counts_csv)[0] + ".parquet"
+        # Caché de conteos junto a los CSV, compartida entre objetivos y ejecuciones
+        self.cache_file = os.path.join(os.path.dirname(self.output_counts_csv) or ".", DEFAULT_CACHE_FILE)
 
         print(f"Iniciando análisis de Benford para los SEGUIDOS de: {target_account}")
 
+    @property
+    def rate_controller(self):
+        """RateController de la cuenta principal, compartido por la Fase 1 y la 2 (se crea al usarlo)."""
+        if self._rate_controller is None:
+            from rate_controller import RateController
+            self._rate_controller = RateController(**self.rate_limits)
+        return self._rate_controller
+
+    def _has_credentials(self):
+        if self.username and self.password:
+            return True
+        print("\nFaltan USERNAME y PASSWORD (credentials.py). Solo la Fase 3 funciona sin ellos.")
+        return False
+
+    def _run_with_browser(self, *steps):
+        """Ejecuta las fases de navegador [(fase, corrutina(sesión)), ...] en un solo bucle asyncio,
+        con un navegador y un login compartidos (el navegador se abre solo si alguna lo necesita)."""
+        if not self._has_credentials():
+            return
+        from browser_session import BrowserSession
+
+        async def run():
+            session = BrowserSession(self.username, self.password, lean=self.lean, metrics=self.metrics,
+                                     headless=self.headless)
+            try:
+                for phase, step in steps:
+                    with self.metrics.timer('fase_segundos', fase=phase, objetivo=self.target_account):
+                        await step(session)
+            finally:
+                session.wait_stats.print_report("Tiempos de espera (login)")
+                await session.close()
+
+        asyncio.run(run())
+
     # Fase 1: descarga de nombres de usuario
-    def _run_phase_1_download(self):
+    async def _run_phase_1_download(self, session, targets=None):
+        """`targets`: [(cuenta, CSV de la lista), ...] con la misma página; por defecto, la de la app."""
+        from followers_downloader import FollowersDownloader
+
         print("\n--- Fase 1: Descarga de usuarios seguidos ---")
-        downloader = FollowersDownloader(self.username, self.password)
+        downloader = FollowersDownloader(self.username, self.password, capture_network=self.capture_network,
+                                         rate_controller=self.rate_controller, metrics=self.metrics,
+                                         session=session)
         try:
-            downloader.download_and_save_followers(
-                self.target_account,
-                self.limit,
-                self.followers_list_csv
-            )
-        except Exception as e:
-            print(f"Error en la Fase 1: {e}")
+            for target_account, followers_list_csv in targets or [(self.target_account, self.followers_list_csv)]:
+                try:
+                    await downloader.download_followers(
+                        target_account,
+                        self.limit,
+                        followers_list_csv
+                    )
+                except Exception as e:
+                    print(f"Error en la Fase 1 ({target_account}): {e}")
         finally:
-            downloader.close_driver()
+            await downloader.close()
 
     # Fase 2: recopilación de conteos
-    def _run_phase_2_scrape_counts(self):
+    async def _run_phase_2_scrape_counts(self, session):
         if not os.path.exists(self.followers_list_csv):
             print(f"\nEl archivo '{self.followers_list_csv}' no fue encontrado. Ejecuta la Fase 1 primero.")
             return
+        from count_cache import FollowerCountCache
+        from profile_scraper import ProfileScraper
+        from rate_controller import RateController
 
         print("\n--- Fase 2: Recopilación de conteo de seguidores de los seguidos ---")
-        scraper = ProfileScraper(self.username, self.password)
+        cache_kwargs = {'path': self.cache_file, 'ttl_seconds': self.cache_ttl_hours * 3600} \
+            if self.use_cache else None
+        cache = FollowerCountCache(**cache_kwargs) if cache_kwargs and self.shards <= 1 else None
+        scraper = ProfileScraper(self.username, self.password, cache=cache, fetch_mode=self.fetch_mode,
+                                 rate_controller=self.rate_controller, metrics=self.metrics, session=session,
+                                 recycle_limits=self.recycle_limits)
         usernames_to_count = scraper.read_usernames_from_csv(self.followers_list_csv)
+        known_counts = scraper.read_known_counts_from_csv(self.followers_list_csv)
 
         if usernames_to_count:
             try:
-                scraper.scrape_follower_counts(usernames_to_count, self.output_counts_csv)
+                # Reanuda sobre el CSV existente: solo se procesa lo pendiente o fallido.
+                # Los shards son procesos con su propio navegador; sin shards se usa la sesión común
+                if self.shards > 1:
+                    from sharded_scraper import run_sharded_scrape
+
+                    # Esperar a los procesos bloquea: en un hilo, para no parar el bucle de eventos
+                    await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                        run_sharded_scrape, usernames_to_count, self.output_counts_csv, self.accounts,
+                        self.shards, concurrency=self.concurrency, resume=True,
+                        known_counts=known_counts, cache_kwargs=cache_kwargs, metrics=self.metrics,
+                        scraper_kwargs={'lean': self.lean, 'fetch_mode': self.fetch_mode,
+                                        'headless': self.headless,
+                                        'recycle_limits': self.recycle_limits,
+                                        # límites por cuenta: se reparten entre sus procesos
+                                        'rate_controller': RateController(**self.rate_limits)}))
+                else:
+                    await scraper.scrape_follower_counts_async(usernames_to_count, self.output_counts_csv,
+                                                               concurrency=self.concurrency, resume=True,
+                                                               known_counts=known_counts)
             except Exception as e:
                 print(f"Error en la Fase 2: {e}")
+            finally:
+                self._write_counts_parquet(cache)
+                if cache:
+                    cache.close()
         else:
             print("No hay usuarios para contar. Terminando Fase 2.")
 
+    def _write_counts_parquet(self, cache=None):
+        """Con FORMATO_CONTEOS = "parquet", guarda también los conteos tipados (la hora de cada fila,
+        de la caché si está disponible)."""
+        if self.counts_format != "parquet" or not os.path.exists(self.output_counts_csv):
+            return
+        try:
+            from columnar_store import csv_to_parquet
+
+            scraped_times = None
+            if cache:
+                scraped_times = cache.fetched_times(
+                    list(results_store.load_existing_results(self.output_counts_csv)))
+            csv_to_parquet(self.output_counts_csv, self.output_counts_parquet, scraped_times)
+            print(f"Conteos tipados guardados en: {self.output_counts_parquet}")
+        except Exception as e:
+            print(f"No se pudo guardar el Parquet de conteos: {e}")
+
     # Fase 3: análisis de Benford
     def _run_phase_3_analyze(self):
-        if not os.path.exists(self.output_counts_csv):
-            print(f"\nEl archivo '{self.output_counts_csv}' no fue encontrado. Ejecuta la Fase 2 primero.")
+        counts_file = self.output_counts_csv
+        if self.counts_format == "parquet" and os.path.exists(self.output_counts_parquet):
+            counts_file = self.output_counts_parquet
+        if not os.path.exists(counts_file):
+            print(f"\nEl archivo '{counts_file}' no fue encontrado. Ejecuta la Fase 2 primero.")
             return
+        from data_analyzer import DataAnalyzer
 
         print("\n--- Fase 3: Limpieza y análisis de Benford (seguidos) ---")
-        analyzer = DataAnalyzer(self.output_counts_csv)
+        analyzer = DataAnalyzer(counts_file, metrics=self.metrics, show_plot=self.show_plot)
+        if self.streaming_analysis:
+            analyzer.analyze_streaming(self.graph_filename)
+            return
         analyzer.clean_and_prepare_data()
         analyzer.analyze_and_plot_first_digit(self.graph_filename)
 
-    # Ejecuta la fase seleccionada
+    # Fases 1 → 2 → 3 solapadas
+    async def _run_pipelined(self, session):
+        from count_cache import FollowerCountCache
+        from followers_downloader import FollowersDownloader
+        from pipeline import run_pipelined
+        from profile_scraper import ProfileScraper
+
+        print("\n--- Fases 1 → 2 → 3 en tubería ---")
+        cache = FollowerCountCache(self.cache_file, ttl_seconds=self.cache_ttl_hours * 3600) \
+            if self.use_cache else None
+        # Las dos fases comparten navegador, login y ritmo de la cuenta
+        scraper = ProfileScraper(self.username, self.password, cache=cache, fetch_mode=self.fetch_mode,
+                                 rate_controller=self.rate_controller, metrics=self.metrics, session=session,
+                                 recycle_limits=self.recycle_limits)
+        downloader = FollowersDownloader(self.username, self.password, capture_network=self.capture_network,
+                                         rate_controller=self.rate_controller, metrics=self.metrics,
+                                         session=session)
+        try:
+            await run_pipelined(
+                downloader, scraper, self.target_account, self.limit, self.followers_list_csv,
+                self.output_counts_csv, self.graph_filename, concurrency=self.concurrency,
+                metrics=self.metrics, show_plot=self.show_plot
+            )
+        finally:
+            self._write_counts_parquet(cache)
+            if cache:
+                cache.close()
+
+    def _timed_phase(self, phase, run):
+        with self.metrics.timer('fase_segundos', fase=phase, objetivo=self.target_account):
+            run()
+
+    # Ejecuta la fase seleccionada y vuelca las métricas al terminar
     def run_phase(self, phase_to_run):
-        if phase_to_run == 1:
-            self._run_phase_1_download()
-        elif phase_to_run == 2:
-            self._run_phase_2_scrape_counts()
-        elif phase_to_run == 3:
-            self._run_phase_3_analyze()
-        elif phase_to_run == 0:
-            self._run_phase_1_download()
-            self._run_phase_2_scrape_counts()
-            self._run_phase_3_analyze()
-        else:
-            print("\nOpción no válida. Selecciona 0, 1, 2 o 3.")
+        try:
+            if phase_to_run == 1:
+                self._run_with_browser((1, self._run_phase_1_download))
+            elif phase_to_run == 2:
+                self._run_with_browser((2, self._run_phase_2_scrape_counts))
+            elif phase_to_run == 3:
+                self._timed_phase(3, self._run_phase_3_analyze)
+            elif phase_to_run == 0 and self.pipelined:
+                self._run_with_browser(('tuberia', self._run_pipelined))
+            elif phase_to_run == 0:
+                # Un solo navegador y un solo login para la Fase 1 y la 2
+                self._run_with_browser((1, self._run_phase_1_download), (2, self._run_phase_2_scrape_counts))
+                self._timed_phase(3, self._run_phase_3_analyze)
+            else:
+                print("\nOpción no válida. Selecciona 0, 1, 2 o 3.")
+        finally:
+            self.metrics.close()
+
+
+class MultiTargetApp:
+    """Varias cuentas objetivo: Fase 1 por objetivo, Fase 2 una sola vez sobre la unión de sus
+    listas (cada seguido se visita una vez) y Fase 3 por lotes, un análisis por objetivo."""
+
+    def __init__(self, targets, combined_name="objetivos", **app_kwargs):
+        self.targets = list(dict.fromkeys(targets))
+        metrics = app_kwargs.pop('metrics', None) or MetricsRecorder()
+        # La app combinada hace la Fase 2 con sus propios archivos (<combined_name>_following_*.csv)
+        self.combined = MainApp(target_account=combined_name, metrics=metrics, **app_kwargs)
+        self.metrics = metrics
+        self.apps = {target: MainApp(target_account=target, metrics=metrics,
+                                     rate_controller=self.combined.rate_controller, **app_kwargs)
+                     for target in self.targets}
+        self.summary_csv = f"{combined_name}_benford_resumen.csv"
+
+    async def _run_phase_1_download(self, session):
+        await self.combined._run_phase_1_download(
+            session, [(target, app.followers_list_csv) for target, app in self.apps.items()])
+
+    async def _run_phase_2_scrape_counts(self, session):
+        from multi_target import merge_following_lists, split_counts
+
+        total, unique = merge_following_lists([app.followers_list_csv for app in self.apps.values()],
+                                              self.combined.followers_list_csv)
+        if total:
+            print(f"\n{len(self.apps)} objetivos: {total} seguidos en total, {unique} únicos "
+                  f"({1 - unique / total:.0%} de visitas ahorradas)")
+        self.metrics.set_gauge('multi_objetivo_seguidos', total, tipo='total')
+        self.metrics.set_gauge('multi_objetivo_seguidos', unique, tipo='unicos')
+        await self.combined._run_phase_2_scrape_counts(session)
+
+        if not os.path.exists(self.combined.output_counts_csv):
+            return
+        written = split_counts(self.combined.output_counts_csv,
+                               {app.followers_list_csv: app.output_counts_csv for app in self.apps.values()})
+        print(f"Conteos repartidos en {len(written)} archivos por objetivo.")
+        for app in self.apps.values():
+            app._write_counts_parquet()
+
+    def _run_phase_3_analyze(self):
+        from batch_analysis import analyze_many
+
+        counts_files = []
+        for app in self.apps.values():
+            if app.counts_format == "parquet" and os.path.exists(app.output_counts_parquet):
+                counts_files.append(app.output_counts_parquet)
+            elif os.path.exists(app.output_counts_csv):
+                counts_files.append(app.output_counts_csv)
+        if not counts_files:
+            print("\nNo hay archivos de conteos por objetivo. Ejecuta la Fase 2 primero.")
+            return
+
+        print("\n--- Fase 3: Análisis de Benford por objetivo (por lotes, sin ventanas) ---")
+        with self.metrics.timer('analisis_segundos', etapa='lote'):
+            analyze_many(counts_files, summary_csv=self.summary_csv, streaming=self.combined.streaming_analysis)
+
+    def run_phase(self, phase_to_run):
+        browser_phases = {1: self._run_phase_1_download, 2: self._run_phase_2_scrape_counts}
+        try:
+            if phase_to_run == 0:
+                # La tubería es por objetivo; con varios, las fases van encadenadas (con un solo navegador)
+                self.combined._run_with_browser((1, browser_phases[1]), (2, browser_phases[2]))
+                self.combined._timed_phase(3, self._run_phase_3_analyze)
+            elif phase_to_run in browser_phases:
+                self.combined._run_with_browser((phase_to_run, browser_phases[phase_to_run]))
+            elif phase_to_run == 3:
+                self.combined._timed_phase(3, self._run_phase_3_analyze)
+            else:
+                print("\nOpción no válida. Selecciona 0, 1, 2 o 3.")
+        finally:
+            self.metrics.close()
 
 
 def display_menu():
@@ -104,19 +390,77 @@ def display_menu():
             print("Entrada inválida. Ingresa un número.")
 
 
-if __name__ == '__main__':
-    phase = -1
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Análisis de Benford de los seguidos de una cuenta de Instagram.",
+        epilog="Sin argumentos y en una terminal, muestra el menú. Los valores por defecto salen de credentials.py.")
+    parser.add_argument("phase", nargs="?", type=int, choices=[0, 1, 2, 3],
+                        help="0 = todo (1 → 2 → 3), 1 = lista de seguidos, 2 = conteos, 3 = análisis")
+    parser.add_argument("--target", default=None, help="cuenta objetivo (por defecto, CUENTA_OBJETIVO)")
+    parser.add_argument("--targets", nargs="+", default=None,
+                        help="varias cuentas objetivo: cada seguido se visita una sola vez en la Fase 2 "
+                             "(por defecto, CUENTAS_OBJETIVO)")
+    parser.add_argument("--combined-name", default="objetivos",
+                        help="prefijo de los archivos comunes con --targets (lista, conteos y resumen)")
+    parser.add_argument("--limit", type=int, default=LIMITE_SEGUIDORES, help="máximo de seguidos en la Fase 1")
+    parser.add_argument("--followers-list", default=None, help="CSV de la Fase 1 (lista de seguidos)")
+    parser.add_argument("--counts", default=None, help="CSV (o Parquet) de conteos de la Fase 2")
+    parser.add_argument("--graph", default=None, help="PNG del gráfico de la Fase 3")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCIA, help="páginas en paralelo en la Fase 2")
+    parser.add_argument("--fetch-mode", choices=["browser", "http"], default=MODO_OBTENCION)
+    parser.add_argument("--counts-format", choices=["csv", "parquet"], default=FORMATO_CONTEOS)
+    parser.add_argument("--streaming", action="store_true", default=ANALISIS_POR_BLOQUES,
+                        help="Fase 3 por bloques, con memoria acotada")
+    parser.add_argument("--no-plot", dest="show_plot", action="store_false", default=MOSTRAR_GRAFICO,
+                        help="no abrir la ventana del gráfico (el PNG se guarda igual)")
+    parser.add_argument("--headed", action="store_true", default=NAVEGADOR_VISIBLE,
+                        help="mostrar la ventana de Chromium (por defecto, sin ventana)")
+    args = parser.parse_args(argv)
 
-    if len(sys.argv) > 1:
-        try:
-            phase = int(sys.argv[1])
-        except ValueError:
-            print("El argumento debe ser un número entero (0, 1, 2 o 3).")
-            sys.exit(1)
+    # El menú solo en uso interactivo; un script nunca se queda esperando en input()
+    given = sys.argv[1:] if argv is None else argv
+    if args.phase is None and (given or not sys.stdin.isatty()):
+        parser.error("indica la fase a ejecutar (0, 1, 2 o 3)")
+    # CUENTAS_OBJETIVO solo si la línea de comandos no apunta ya a una cuenta (--target o sus archivos)
+    if args.targets is None and not (args.target or args.followers_list or args.counts or args.graph):
+        args.targets = CUENTAS_OBJETIVO
+    if args.targets:
+        if args.followers_list or args.counts or args.graph:
+            parser.error("con --targets los archivos salen de cada cuenta; quita --followers-list/--counts/--graph")
+        return args
+    args.target = args.target or CUENTA_OBJETIVO
+    if not args.target and args.counts:
+        from batch_analysis import account_name
+        args.target = account_name(args.counts)
+    if not args.target:
+        parser.error("indica la cuenta objetivo (--target o CUENTA_OBJETIVO en credentials.py)")
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
 
-    app = MainApp(USERNAME, PASSWORD, CUENTA_OBJETIVO, LIMITE_SEGUIDORES)
+    settings = dict(username=USERNAME, password=PASSWORD, limit=args.limit,
+                    concurrency=args.concurrency, lean=MODO_LIGERO,
+                    use_cache=USAR_CACHE, cache_ttl_hours=CACHE_TTL_HORAS,
+                    streaming_analysis=args.streaming, capture_network=CAPTURA_RED,
+                    fetch_mode=args.fetch_mode, shards=PROCESOS, extra_accounts=CUENTAS_EXTRA,
+                    pipelined=EN_TUBERIA,
+                    rate_limits={'initial_rate': RITMO_INICIAL, 'min_rate': RITMO_MINIMO,
+                                 'max_rate': RITMO_MAXIMO, 'max_in_flight': PETICIONES_EN_VUELO},
+                    metrics=MetricsRecorder(METRICAS_JSONL, METRICAS_PROMETHEUS),
+                    show_plot=args.show_plot, counts_format=args.counts_format, headless=not args.headed,
+                    recycle_limits={'page_navigations': RECICLAR_PAGINA_CADA,
+                                    'context_navigations': RECICLAR_CONTEXTO_CADA,
+                                    'memory_limit_mb': LIMITE_MEMORIA_NAVEGADOR_MB})
+    if args.targets:
+        app = MultiTargetApp(args.targets, args.combined_name, **settings)
+    else:
+        app = MainApp(target_account=args.target, followers_list_csv=args.followers_list,
+                      output_counts_csv=args.counts, graph_filename=args.graph, **settings)
 
-    if phase == -1:
+    phase = args.phase
+    if phase is None:
         phase = display_menu()
 
     app.run_phase(phase)
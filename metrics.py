@@ -0,0 +1,192 @@
+# metrics.py
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+METRIC_PREFIX = "benford_ig_"
+# Cubetas (segundos) de los histogramas de Prometheus
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def status_label(count) -> str:
+    """Estado de un resultado de perfil para las métricas: "OK" si es un conteo, si no el centinela."""
+    count = str(count)
+    return "OK" if count.isdigit() else count or "VACIO"
+
+
+class MetricsRecorder:
+    """Métricas de una ejecución: eventos en JSON lines y agregados para Prometheus.
+
+    Pensado para dejarlo siempre activo: cada evento es un `dict` serializado a un búfer que se
+    vuelca cada `flush_every` líneas, y los agregados son contadores en memoria. Sin `path` ni
+    `prometheus_path` solo se agrega (lo usan las clases cuando no se les pasa uno).
+    """
+
+    def __init__(self, path: str = None, prometheus_path: str = None, run_id: str = None,
+                 flush_every: int = 200, buckets: tuple = DEFAULT_BUCKETS):
+        self.path = path
+        self.prometheus_path = prometheus_path
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.flush_every = max(1, flush_every)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._lines = []
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    # Los procesos de los shards escriben sus eventos en el mismo archivo (en modo append), pero
+    # el textfile de Prometheus solo lo escribe el proceso principal: los agregados de cada shard
+    # vuelven con `snapshot()` y se suman con `merge()`
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state.update(_lines=[], _counters={}, _gauges={}, _histograms={}, prometheus_path=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # --- eventos ---
+    def event(self, name: str, **fields):
+        if not self.path:
+            return
+        record = {"ts": round(time.time(), 3), "run": self.run_id, "pid": os.getpid(), "event": name}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._lines.append(line)
+            if len(self._lines) >= self.flush_every:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._lines or not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Un solo write en modo append: las líneas de varios procesos no se mezclan
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("\n".join(self._lines) + "\n")
+        self._lines = []
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    # --- agregados ---
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "n": 0}
+            histogram["sum"] += seconds
+            histogram["n"] += 1
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["counts"][i] += 1
+                    break
+
+    def record_duration(self, name: str, seconds: float, **labels):
+        """Duración como histograma `name` (segundos) y como evento."""
+        self.observe(name, seconds, **labels)
+        self.event(name, seconds=round(seconds, 4), **labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_duration(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name: str, **labels) -> float:
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def snapshot(self) -> dict:
+        """Copia de los agregados, para enviarla desde el proceso de un shard al principal."""
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges),
+                    "histograms": {key: {"counts": list(h["counts"]), "sum": h["sum"], "n": h["n"]}
+                                   for key, h in self._histograms.items()}}
+
+    def merge(self, snapshot: dict):
+        """Suma los agregados de `snapshot()` (contadores e histogramas; los gauges se sobrescriben)."""
+        with self._lock:
+            for key, value in snapshot["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            self._gauges.update(snapshot["gauges"])
+            for key, other in snapshot["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "n": 0}
+                histogram["counts"] = [a + b for a, b in zip(histogram["counts"], other["counts"])]
+                histogram["sum"] += other["sum"]
+                histogram["n"] += other["n"]
+
+    # --- salida ---
+    def write_prometheus(self):
+        """Escribe el textfile (formato de exposición de Prometheus) de forma atómica."""
+        if not self.prometheus_path:
+            return
+        with self._lock:
+            lines = []
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted({name for name, _ in series}):
+                    lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+                    for (metric, key), value in sorted(series.items()):
+                        if metric == name:
+                            lines.append(f"{METRIC_PREFIX}{name}{_format_labels(key)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} histogram")
+                for (metric, key), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram["counts"]):
+                        cumulative += count
+                        bucket = _format_labels(key, (('le', bound),))
+                        lines.append(f"{METRIC_PREFIX}{name}_bucket{bucket} {cumulative}")
+                    bucket = _format_labels(key, (('le', '+Inf'),))
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{bucket} {histogram['n']}")
+                    lines.append(f"{METRIC_PREFIX}{name}_sum{_format_labels(key)} {histogram['sum']}")
+                    lines.append(f"{METRIC_PREFIX}{name}_count{_format_labels(key)} {histogram['n']}")
+        lines.append(f"{METRIC_PREFIX}last_run_timestamp_seconds {math.floor(time.time())}")
+
+        os.makedirs(os.path.dirname(self.prometheus_path) or ".", exist_ok=True)
+        tmp_path = f"{self.prometheus_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+    def close(self):
+        self.flush()
+        self.write_prometheus()
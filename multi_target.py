@@ -0,0 +1,72 @@
+# multi_target.py
+"""Varias cuentas objetivo en una sola ejecución.
+
+La Fase 1 se hace por objetivo, pero la Fase 2 trabaja sobre la unión sin duplicados de todas
+las listas: un seguido que aparece en 50 listas se visita una vez. Después, los conteos se
+reparten en el CSV de cada objetivo para su propio análisis de Benford.
+"""
+import csv
+import os
+
+import results_store
+
+
+def read_following_list(filename: str) -> tuple[list[str], dict]:
+    """Usuarios de una lista de la Fase 1, en orden, y los conteos que ya traiga (columna opcional)."""
+    usernames = []
+    known = {}
+    with open(filename, mode='r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            username = (row.get('username') or '').strip()
+            if not username:
+                continue
+            usernames.append(username)
+            count = (row.get('followers_count') or '').strip()
+            if count:
+                known[username] = count
+    return usernames, known
+
+
+def merge_following_lists(list_files: list[str], combined_csv: str) -> tuple[int, int]:
+    """Une las listas en `combined_csv` (username, followers_count) sin duplicados, en orden de
+    primera aparición; se queda con el primer conteo conocido de cada usuario.
+
+    Devuelve (filas de todas las listas, usuarios únicos).
+    """
+    unique = {}
+    total = 0
+    for filename in list_files:
+        if not os.path.exists(filename):
+            print(f"⚠️ Lista '{filename}' no encontrada; se omite.")
+            continue
+        usernames, known = read_following_list(filename)
+        total += len(usernames)
+        for username in usernames:
+            if not unique.get(username):
+                unique[username] = known.get(username, '')
+
+    with results_store.CountsCsvWriter(combined_csv, flush_every=len(unique) or 1) as writer:
+        for username, count in unique.items():
+            writer.write(username, count)
+    return total, len(unique)
+
+
+def split_counts(combined_counts_csv: str, outputs: dict) -> dict:
+    """Reparte los conteos de la Fase 2 común en el CSV de cada objetivo.
+
+    `outputs` es {lista de la Fase 1: CSV de conteos del objetivo}; cada CSV conserva el orden de
+    su lista. Devuelve {CSV de conteos: filas escritas}; los usuarios sin resultado no se escriben.
+    """
+    results = results_store.load_existing_results(combined_counts_csv)
+    written = {}
+    for list_csv, counts_csv in outputs.items():
+        if not os.path.exists(list_csv):
+            continue
+        usernames, _ = read_following_list(list_csv)
+        own_results = {username: results[username] for username in usernames if username in results}
+        rows = results_store.ordered_results(usernames, own_results)
+        with results_store.CountsCsvWriter(counts_csv, flush_every=len(rows) or 1) as writer:
+            for row in rows:
+                writer.write(row['username'], row['followers_count'])
+        written[counts_csv] = len(rows)
+    return written
@@ -0,0 +1,82 @@
+# pipeline.py
+import asyncio
+import time
+
+import numpy as np
+
+from benford import BenfordAccumulator
+from count_parsing import convert_count_to_numeric
+from data_analyzer import DataAnalyzer
+
+
+class StreamingBenford:
+    """Recibe cada resultado de la Fase 2 y lo va sumando al histograma de Benford por lotes."""
+
+    def __init__(self, batch_size: int = 256):
+        self.accumulator = BenfordAccumulator()
+        self.batch_size = batch_size
+        self.rows = 0
+        self._buffer = []
+
+    def __call__(self, username, count):
+        self.rows += 1
+        value = convert_count_to_numeric(count)
+        if value == value and value > 0:
+            self._buffer.append(int(value))
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.accumulator.update(np.array(self._buffer, dtype=np.int64))
+            self._buffer = []
+
+
+async def run_pipelined(downloader, scraper, target_account: str, limit: int, followers_list_csv: str,
+                        output_counts_csv: str, graph_filename: str, concurrency: int = 1,
+                        queue_size: int = 500, metrics=None, show_plot: bool = True):
+    """Fases 1 → 2 → 3 solapadas: cada usuario pasa a la Fase 2 en cuanto la Fase 1 lo descubre.
+
+    Las dos fases son tareas del mismo bucle asyncio y, si comparten BrowserSession, del mismo
+    navegador y el mismo login. La Fase 1 deja los usuarios en una cola acotada (si la Fase 2 va
+    más lenta, el scroll espera). Los conteos se acumulan en el histograma de Benford según
+    llegan. Los CSV de siempre se siguen escribiendo, así que las fases 2 y 3 pueden volver a
+    lanzarse por separado.
+    """
+    discovered = asyncio.Queue(maxsize=queue_size)
+    consumer_done = False
+
+    async def publish(batch):
+        for item in batch:
+            await discovered.put(item)
+
+    async def phase_1():
+        try:
+            await downloader.download_followers(target_account, limit, followers_list_csv, on_batch=publish)
+        except Exception as e:
+            print(f"Error en la Fase 1: {e}")
+        finally:
+            await downloader.close()
+            if not consumer_done:
+                await discovered.put(None)
+
+    start_time = time.time()
+    producer = asyncio.create_task(phase_1())
+
+    benford = StreamingBenford()
+    try:
+        await scraper.scrape_stream(discovered, output_counts_csv, concurrency, listener=benford)
+    except Exception as e:
+        print(f"Error en la Fase 2: {e}")
+    finally:
+        # Si la Fase 2 se cae, la Fase 1 no debe quedarse bloqueada en una cola llena
+        consumer_done = True
+        if not producer.done():
+            producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+    print("\n--- Fase 3: análisis de Benford (acumulado durante la Fase 2) ---")
+    benford.flush()
+    analyzer = DataAnalyzer(output_counts_csv, metrics=metrics, show_plot=show_plot)
+    analyzer.report_accumulator(benford.accumulator, graph_filename, benford.rows)
+    print(f"Tiempo total en tubería: {time.time() - start_time:.2f}s")
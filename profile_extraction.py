@@ -0,0 +1,208 @@
+# profile_extraction.py
+"""Conteo de seguidores de un perfil ya cargado sin traer la página a Python.
+
+Un solo `page.evaluate` prueba, por orden, las fuentes baratas y precisas: la etiqueta
+`og:description`, el JSON del perfil embebido en la página y la cabecera visible. Todo se lee
+dentro del navegador (nada de `page.content()`) y solo vuelven unos pocos bytes. Los avisos de
+cuenta privada / inexistente se buscan en los títulos de la página, no en todo el texto, para que
+una biografía o un script que digan "private" no conviertan un perfil público en PRIVADA.
+"""
+import re
+
+from rate_controller import THROTTLE_MARKERS
+
+PRIVATE_MARKERS = ("This account is private", "Esta cuenta es privada")
+MISSING_MARKERS = ("Sorry, this page", "Lo sentimos, esta página")
+
+# "1,234 Followers", "12.3K followers", "1.234 seguidores", "12,3 mil seguidores", "1,2 M seguidores"
+_COUNT_TEXT = re.compile(r"^([0-9][0-9.,]*)\s*(k|m|mil|mill\.|millones)?$", re.IGNORECASE)
+_SUFFIX_FACTORS = {"k": 1_000, "mil": 1_000, "m": 1_000_000, "mill.": 1_000_000, "millones": 1_000_000}
+
+# Devuelve las señales de cada fuente y se detiene en la primera con un conteo exacto
+EXTRACT_PROFILE_SCRIPT = r"""(args) => {
+    const username = args.username;
+    const result = {og: null, json: null, header: null, private: false, missing: false, throttled: false};
+    const COUNT_RE = /([0-9][0-9.,]*(?:\s?(?:k|m|mil|mill\.|millones))?)\s+(?:followers|seguidores)/i;
+    const EXACT_RE = /^[0-9][0-9.,]*$/;
+    const text = (el) => ((el && el.textContent) || '').trim();
+
+    // 1. og:description: "1,234 Followers, 56 Following, 78 Posts - ... (@usuario) ..."
+    const meta = document.querySelector('meta[property="og:description"]');
+    const og = (meta && meta.getAttribute('content')) || '';
+    const ogMatch = og.match(COUNT_RE);
+    if (ogMatch && (!og.includes('(@') || og.includes('(@' + username + ')'))) {
+        result.og = ogMatch[1];
+        if (EXACT_RE.test(result.og)) return result;
+    }
+
+    // 2. JSON embebido: solo el objeto del propio usuario (no el de los perfiles sugeridos)
+    const quoted = '"' + username + '"';
+    const scripts = document.querySelectorAll('script[type="application/json"], script[type="application/ld+json"]');
+    for (const script of scripts) {
+        const source = script.textContent;
+        if (!source.includes(quoted) && !source.includes('"@' + username + '"')) continue;
+        let found = null;
+        try {
+            JSON.parse(source, (key, value) => {
+                if (found === null && value && typeof value === 'object') {
+                    if (value.username === username) {
+                        const edge = value.edge_followed_by;
+                        const count = edge && typeof edge.count === 'number' ? edge.count
+                            : (typeof value.follower_count === 'number' ? value.follower_count : null);
+                        if (count !== null || typeof value.is_private === 'boolean') {
+                            found = {count: count, private: value.is_private === true};
+                        }
+                    } else if (value.alternateName === '@' + username && Array.isArray(value.interactionStatistic)) {
+                        // ld+json (schema.org ProfilePage): FollowAction = seguidores
+                        const follow = value.interactionStatistic.find(
+                            s => /FollowAction/.test(s.interactionType || ''));
+                        if (follow && typeof follow.userInteractionCount === 'number') {
+                            found = {count: follow.userInteractionCount, private: false};
+                        }
+                    }
+                }
+                return value;
+            });
+        } catch (e) {
+            continue;
+        }
+        if (found !== null) {
+            result.json = found;
+            if (found.count !== null) return result;
+        }
+    }
+
+    // 3. Cabecera visible: el title del número es exacto; el texto visible, abreviado
+    const scope = document.querySelector('header') || document.querySelector('main') || document.body;
+    if (scope) {
+        for (const span of scope.querySelectorAll('span[title]')) {
+            const holder = span.closest('a, li, span[dir="auto"]');
+            if (holder && /followers|seguidores/i.test(holder.textContent)) {
+                result.header = {title: span.getAttribute('title').trim(), text: null};
+                return result;
+            }
+        }
+        for (const el of scope.querySelectorAll('a[href$="/followers/"], li')) {
+            const match = text(el).match(COUNT_RE);
+            if (match) {
+                result.header = {title: null, text: match[1]};
+                break;
+            }
+        }
+    }
+
+    // Sin conteo exacto: avisos de cuenta privada / inexistente en los títulos, no en todo el texto
+    const headings = Array.from(document.querySelectorAll('h1, h2, main span'), text);
+    const startsWithAny = (value, markers) => markers.some(marker => value.startsWith(marker));
+    result.private = headings.some(value => startsWithAny(value, args.privateMarkers));
+    result.missing = headings.some(value => startsWithAny(value, args.missingMarkers)) ||
+        /Page not found|Página no encontrada/.test(document.title);
+    if (!result.private && !result.missing && !result.og && !result.json && !result.header) {
+        // Las páginas de "espera unos minutos" son pequeñas: solo entonces se mira el texto
+        const body = text(document.body);
+        result.throttled = args.throttleMarkers.some(marker => body.includes(marker));
+    }
+    return result;
+}"""
+
+
+def parse_count_text(text: str):
+    """Número de un texto de conteo y si es exacto: "1,234" → (1234, True), "12,3K" → (12300, False).
+
+    Acepta separadores de miles con coma o punto y las abreviaturas en inglés y en español.
+    Devuelve (None, False) si el texto no es un conteo.
+    """
+    match = _COUNT_TEXT.match((text or "").strip())
+    if not match:
+        return None, False
+    number, suffix = match.groups()
+    if not suffix:
+        return int(re.sub(r"\D", "", number)), True
+    # Abreviado: el último punto o coma seguido de 1-2 dígitos es el decimal ("12,3K", "1.2M",
+    # "1,234.5K", "1.234,5 mil"); los demás separadores son de miles
+    decimal = re.fullmatch(r"(.*)[.,](\d{1,2})", number)
+    if decimal:
+        whole, fraction = decimal.groups()
+        value = float(re.sub(r"\D", "", whole) + "." + fraction)
+    else:
+        value = int(re.sub(r"\D", "", number))
+    return int(round(value * _SUFFIX_FACTORS[suffix.lower()])), False
+
+
+class ProfileExtraction:
+    """Resultado estructurado de la extracción: conteo, privada o no, existe o no, y de dónde salió.
+
+    `status` lo traduce a lo que se escribe en el CSV (el conteo o PRIVADA / NO_EXISTE / LIMITADO /
+    NO_ENCONTRADO). Un conteo visible gana siempre: las cuentas privadas también lo muestran.
+    """
+
+    def __init__(self, count: int = None, exact: bool = False, private: bool = None, exists: bool = True,
+                 throttled: bool = False, source: str = None):
+        self.count = count
+        self.exact = exact
+        self.private = private
+        self.exists = exists
+        self.throttled = throttled
+        self.source = source
+
+    @classmethod
+    def from_signals(cls, signals: dict) -> "ProfileExtraction":
+        """Elige entre las señales de EXTRACT_PROFILE_SCRIPT: primero un conteo exacto (og, JSON,
+        title de la cabecera) y, si no hay, uno abreviado (og o texto de la cabecera)."""
+        json_data = signals.get("json") or {}
+        header = signals.get("header") or {}
+        private = bool(signals.get("private") or json_data.get("private"))
+
+        candidates = [("og", signals.get("og")), ("json", json_data.get("count")),
+                      ("cabecera", header.get("title")), ("cabecera", header.get("text"))]
+        approximate = None
+        for source, value in candidates:
+            if value is None:
+                continue
+            count, exact = (int(value), True) if isinstance(value, (int, float)) else parse_count_text(value)
+            if count is None:
+                continue
+            if exact:
+                return cls(count, True, private, True, source=source)
+            approximate = approximate or cls(count, False, private, True, source=source)
+        if approximate:
+            return approximate
+
+        if signals.get("throttled"):
+            return cls(throttled=True, source="limitado")
+        if private:
+            return cls(private=True, source="json" if json_data.get("private") else "aviso")
+        if signals.get("missing"):
+            return cls(exists=False, source="aviso")
+        return cls(source="ninguna")
+
+    @property
+    def status(self) -> str:
+        if self.count is not None:
+            return str(self.count)
+        if self.throttled:
+            return "LIMITADO"
+        if self.private:
+            return "PRIVADA"
+        if not self.exists:
+            return "NO_EXISTE"
+        return "NO_ENCONTRADO"
+
+    def to_dict(self) -> dict:
+        return {'conteo': self.count, 'exacto': self.exact, 'privada': self.private, 'existe': self.exists,
+                'limitado': self.throttled, 'fuente': self.source}
+
+
+async def read_signals(page, username: str) -> dict:
+    """Las señales de EXTRACT_PROFILE_SCRIPT para `username`: lo único que vuelve del navegador."""
+    return await page.evaluate(EXTRACT_PROFILE_SCRIPT, {
+        "username": username,
+        "privateMarkers": list(PRIVATE_MARKERS),
+        "missingMarkers": list(MISSING_MARKERS),
+        "throttleMarkers": list(THROTTLE_MARKERS),
+    })
+
+
+async def extract_profile(page, username: str) -> ProfileExtraction:
+    """Extrae el conteo de `username` de la página ya cargada con una sola ida y vuelta al navegador."""
+    return ProfileExtraction.from_signals(await read_signals(page, username))
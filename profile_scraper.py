@@ -1,88 +1,81 @@
 # profile_scraper.py
 import asyncio
 import csv
-import pandas as pd
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import time
-import random
-
+from wait_stats import WaitStats
+from rate_controller import RateController, is_login_redirect
+from metrics import MetricsRecorder, status_label
+import results_store
+from browser_session import BrowserSession, INSTAGRAM_URL, PROFILE_READY_TIMEOUT_MS
+from browser_recycler import PageRecycler
+from profile_extraction import extract_profile, PRIVATE_MARKERS, MISSING_MARKERS
+
+# Endpoint JSON del perfil para el modo HTTP (el mismo que usa la web)
+PROFILE_API_PATH = "/api/v1/users/web_profile_info/?username={username}"
+IG_APP_ID = "936619743392459"
+
+# Reintentos del mismo perfil en una página nueva cuando el renderer se cae
+MAX_CRASH_RETRIES = 2
+
+FOLLOWERS_SELECTOR = (
+    'span[dir="auto"]:has-text("seguidores") span[title], '
+    'span[dir="auto"]:has-text("followers") span[title]'
+)
+# El perfil está "listo" cuando aparece el conteo (en la cabecera o ya en og:description, que
+# llega con el HTML) o un aviso de cuenta privada / inexistente
+PROFILE_READY_SELECTOR = ", ".join([
+    FOLLOWERS_SELECTOR,
+    'meta[property="og:description"][content*="ollowers"]',
+    'meta[property="og:description"][content*="seguidores"]',
+    *(f':text("{marker}")' for marker in PRIVATE_MARKERS + MISSING_MARKERS),
+])
 
 class ProfileScraper:
     """Clase para el scraping de conteos de seguidores usando Playwright."""
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, profile_timeout: float = 60, lean: bool = False,
+                 session_file: str = None, cache=None, fetch_mode: str = "browser",
+                 base_url: str = INSTAGRAM_URL, rate_controller: RateController = None,
+                 metrics: MetricsRecorder = None, session: BrowserSession = None, headless: bool = True,
+                 recycle_limits: dict = None):
         self.username = username
         self.password = password
-        self.browser = None
-        self.context = None
+        # "browser": render completo de cada perfil; "http": petición JSON ligera con las cookies
+        # de la sesión y, solo si falla, el render completo
+        if fetch_mode not in ("browser", "http"):
+            raise ValueError(f"Modo de obtención desconocido: {fetch_mode}")
+        self.fetch_mode = fetch_mode
+        self.http_fallbacks = 0
+        # Caché opcional de conteos (FollowerCountCache) compartida entre objetivos y ejecuciones
+        self.cache = cache
+        # Tiempo máximo por perfil antes de dar la pestaña por colgada (segundos)
+        self.profile_timeout = profile_timeout
+        # Ritmo de peticiones de la cuenta (AIMD); sustituye a la pausa aleatoria fija entre perfiles
+        self.rate_controller = rate_controller or RateController()
+        self.wait_stats = WaitStats()
+        # Métricas estructuradas (JSON lines / Prometheus): login, etapas por perfil, estados, bytes
+        self.metrics = metrics or MetricsRecorder()
+        # Navegador y login: los de la Fase 1 si se pasa su sesión; si no, uno propio que se cierra
+        # al terminar (con la sesión guardada en `session_file` y, en modo ligero, sin imágenes)
+        self._owns_session = session is None
+        self.session = session or BrowserSession(username, password, lean=lean, session_file=session_file,
+                                                 base_url=base_url, metrics=self.metrics,
+                                                 wait_stats=self.wait_stats, headless=headless)
+        self.base_url = self.session.base_url
+        self.resource_blocker = self.session.resource_blocker
         self.page = None
-        self.playwright = None
-        self._closed = False
-
-    async def _init_playwright(self):
-        if self._closed:
-            raise RuntimeError("El scraper ya fue cerrado y no puede reutilizarse")
+        # Memoria acotada en listas largas: páginas con vida limitada, contexto reciclado por
+        # navegaciones o memoria, y páginas caídas reiniciadas (argumentos de PageRecycler)
+        self.recycler = PageRecycler(self.session, '2', open_page=self._new_worker_page, metrics=self.metrics,
+                                     **(recycle_limits or {}))
 
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=False)
-        self.context = await self.browser.new_context()
-        self.page = await self.context.new_page()
-        return self.page
+    @property
+    def context(self):
+        return self.session.context
 
     async def _login_instagram(self) -> bool:
-        """Realiza el inicio de sesión en Instagram (LOGIN CORREGIDO)."""
-        if not self.page:
-            await self._init_playwright()
-
-        print("Iniciando sesión en Instagram...")
-        await self.page.goto("https://www.instagram.com/accounts/login/")
-        await self.page.wait_for_timeout(5000)
-
-        try:
-            # Esperar inputs
-            await self.page.wait_for_selector('input[name="username"]', timeout=10000)
-            await self.page.wait_for_selector('input[name="password"]', timeout=10000)
-
-            # Llenar credenciales
-            await self.page.fill('input[name="username"]', self.username)
-            await self.page.fill('input[name="password"]', self.password)
-
-            # 🔥 MÉTODO ESTABLE: ENTER (evita problemas con el botón)
-            await self.page.keyboard.press("Enter")
-
-            # Esperar navegación
-            await self.page.wait_for_timeout(10000)
-
-            # Verificar si sigue en login
-            if "accounts/login" in self.page.url:
-                print("❌ Login fallido (sigue en pantalla de login)")
-                return False
-
-            print("✅ Sesión iniciada exitosamente.")
-            await self._handle_popups()
-            return True
-
-        except Exception as e:
-            print(f"Error durante el login: {e}")
-            return False
-
-    async def _handle_popups(self):
-        try:
-            selectors = [
-                "//button[contains(text(), 'Ahora no')]",
-                "//button[contains(text(), 'Not Now')]"
-            ]
-
-            for selector in selectors:
-                try:
-                    await self.page.wait_for_selector(f'xpath={selector}', timeout=3000)
-                    await self.page.click(f'xpath={selector}')
-                    await self.page.wait_for_timeout(2000)
-                except:
-                    pass
-
-        except Exception as e:
-            print(f"No se pudieron cerrar pop-ups: {e}")
+        return await self.session.login(phase='2')
 
     def read_usernames_from_csv(self, filename: str) -> list[str]:
         usernames = []
@@ -99,86 +92,470 @@ class ProfileScraper:
             print(f"Error al leer el CSV: {e}")
             return []
 
-    async def _get_follower_count(self, username: str) -> str:
+    def read_known_counts_from_csv(self, filename: str) -> dict:
+        """Conteos que la Fase 1 ya obtuvo de la red (columna opcional `followers_count`)."""
+        known = {}
         try:
-            await self.page.goto(f"https://www.instagram.com/{username}/")
-            await self.page.wait_for_timeout(5000)
+            with open(filename, mode='r', encoding='utf-8') as file:
+                for row in csv.DictReader(file):
+                    count = (row.get('followers_count') or '').strip()
+                    if row.get('username') and count:
+                        known[row['username']] = count
+        except Exception as e:
+            print(f"Error al leer conteos conocidos del CSV: {e}")
+        return known
 
-            followers_text = "NO_ENCONTRADO"
+    async def _get_follower_count(self, username: str, page=None, timings: dict = None) -> str:
+        """Conteo desde el perfil renderizado; `timings` recibe la duración de cada etapa (segundos)."""
+        page = page or self.page
+        timings = {} if timings is None else timings
+        try:
+            start = time.perf_counter()
+            response = await page.goto(f"{self.base_url}/{username}/", wait_until="domcontentloaded")
+            timings['navegacion'] = time.perf_counter() - start
+            # Instagram frenando: 429 o vuelta al login en lugar del perfil
+            if (response is not None and response.status == 429) or is_login_redirect(page.url):
+                return "LIMITADO"
+            if response is not None and response.status == 404:
+                return "NO_EXISTE"
 
+            # Esperar al conteo (o a un aviso de privada/inexistente), no un tiempo fijo
+            start = time.perf_counter()
             try:
-                elem = await self.page.query_selector(
-                    'span[dir="auto"]:has-text("seguidores") span[title], '
-                    'span[dir="auto"]:has-text("followers") span[title]'
-                )
-                if elem:
-                    followers_text = await elem.get_attribute("title")
-                    followers_text = followers_text.replace(",", "").replace(".", "").strip()
-                    return followers_text
-            except:
+                with self.wait_stats.measure('perfil_listo'):
+                    await page.wait_for_selector(PROFILE_READY_SELECTOR, state="attached",
+                                                 timeout=PROFILE_READY_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
                 pass
+            timings['espera'] = time.perf_counter() - start
 
-            page_text = await self.page.content()
-
-            if "private" in page_text.lower():
-                return "PRIVADA"
-            if "Sorry" in page_text or "Lo sentimos" in page_text:
-                return "NO_EXISTE"
-
-            return followers_text
+            start = time.perf_counter()
+            count = await self._extract_count(page, username)
+            timings['extraccion'] = time.perf_counter() - start
+            return count
 
         except Exception as e:
             print(f"Error al procesar {username}: {e}")
             return "ERROR"
 
+    async def _extract_count(self, page, username: str) -> str:
+        """og:description, JSON embebido o cabecera, evaluados en la página (sin `page.content()`)."""
+        extraction = await extract_profile(page, username)
+        self.metrics.increment('extraccion_fuente_total', fuente=extraction.source,
+                               exacto=extraction.exact)
+        return extraction.status
+
     def _save_results_to_csv(self, data: list[dict], filename: str):
         if not data:
             return
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=['username', 'followers_count'])
+                writer = csv.DictWriter(file, fieldnames=results_store.FIELDNAMES)
                 writer.writeheader()
                 writer.writerows(data)
             print(f"Resultados guardados en: {filename}")
         except Exception as e:
             print(f"Error al guardar el CSV: {e}")
 
-    async def _scrape_follower_counts_async(self, usernames_list: list[str], output_csv: str):
+    async def _new_worker_page(self, worker_id: int):
+        """Devuelve la página del worker: el primero reutiliza la de login (si sigue libre), el resto
+        abre una nueva."""
+        if worker_id == 0:
+            if self.page is None or self.page.is_closed():
+                self.page = await self.session.acquire_page('2')
+            return self.page
+        return await self.session.new_page('2')
+
+    async def _get_follower_count_http(self, username: str):
+        """Conteo vía el endpoint JSON del perfil, reutilizando cookies y conexiones del contexto.
+
+        Devuelve None si la petición ligera no sirve, para recurrir al navegador.
+        """
+        try:
+            response = await self.context.request.get(
+                f"{self.base_url}{PROFILE_API_PATH.format(username=username)}",
+                headers={"X-IG-App-ID": IG_APP_ID, "X-Requested-With": "XMLHttpRequest"},
+                fail_on_status_code=False,
+            )
+            if response.status == 404:
+                return "NO_EXISTE"
+            # Ir al navegador en estos casos solo insistiría sobre el mismo límite
+            if response.status == 429 or is_login_redirect(response.url):
+                return "LIMITADO"
+            if not response.ok:
+                return None
+            data = await response.json()
+        except Exception:
+            return None
+
+        if not isinstance(data, dict) or "data" not in data:
+            return None
+        user = (data.get("data") or {}).get("user")
+        if user is None:
+            return "NO_EXISTE"
+        count = (user.get("edge_followed_by") or {}).get("count")
+        if isinstance(count, int):
+            return str(count)
+        if user.get("is_private"):
+            return "PRIVADA"
+        return None
+
+    async def _scrape_worker(self, worker_id: int, next_item, on_result, total: int):
+        """Pide trabajo a `next_item()` hasta que devuelve None; la página propia se abre solo si hace falta."""
+        page = None
+        while True:
+            item = await next_item()
+            if item is None:
+                break
+            index, username = item
+
+            timings = {}
+            engine = self.fetch_mode
+            start = time.perf_counter()
+            try:
+                print(f"\n[{index + 1}/{total or '?'}] @{username} (worker {worker_id + 1}, "
+                      f"{self.rate_controller.rate:.2f} perfiles/s)")
+                async with self.rate_controller.slot():
+                    timings['cola'] = time.perf_counter() - start
+                    with self.wait_stats.measure('perfil'):
+                        for _ in range(MAX_CRASH_RETRIES + 1):
+                            count, page, engine, crashed = await self._visit_profile(username, worker_id, page,
+                                                                                     timings)
+                            if not crashed:
+                                break
+                            # Renderer (o navegador) caído: página nueva y el mismo perfil otra vez
+                            print(f"💥 La página del worker {worker_id + 1} se cayó con @{username}; se reintenta.")
+                            self.metrics.increment('reintentos_total', tipo='caida_renderer')
+                            count = "ERROR"
+            except asyncio.TimeoutError:
+                print(f"Tiempo agotado al procesar {username} (worker {worker_id + 1})")
+                count = "TIMEOUT"
+            except Exception as e:
+                print(f"Error en el worker {worker_id + 1} con {username}: {e}")
+                count = "ERROR"
+
+            self.rate_controller.record_result(count)
+            self._record_profile_metrics(username, count, engine, worker_id, time.perf_counter() - start, timings)
+            on_result(index, username, count)
+            print(f"{username} → {count}")
+
+            # Una pestaña con error no debe frenar al resto: se reemplaza en la próxima visita (las
+            # que cuelgan o lanzan una excepción ya las cerró `_visit_profile`)
+            if page is not None and not page.is_closed() and count in ("TIMEOUT", "ERROR"):
+                self.metrics.increment('reintentos_total', tipo='pagina_reemplazada')
+                self.recycler.retire(page)
+
+        if page is not None and page is not self.page and not page.is_closed():
+            await page.close()
+
+    async def _visit_profile(self, username: str, worker_id: int, page, timings: dict):
+        """Una visita (HTTP y, si hace falta, navegador) dentro del reciclador de páginas.
+
+        Devuelve (conteo, página del worker, motor usado, si la página se cayó durante la visita).
+        """
+        engine = self.fetch_mode
+        count = None
+        async with self.recycler.visit():
+            if self.fetch_mode == "http":
+                http_start = time.perf_counter()
+                count = await asyncio.wait_for(self._get_follower_count_http(username),
+                                               timeout=self.profile_timeout)
+                timings['http'] = time.perf_counter() - http_start
+                if count is None:
+                    self.http_fallbacks += 1
+                    self.metrics.increment('reintentos_total', tipo='http_a_navegador')
+                    engine = "browser"
+            if count is not None:
+                return count, page, engine, False
+
+            page = await self.recycler.page_for(page, worker_id)
+            try:
+                count = await asyncio.wait_for(
+                    self._get_follower_count(username, page, timings),
+                    timeout=self.profile_timeout
+                )
+            except Exception:
+                # La página colgada no vuelve al worker: se cierra aquí y la próxima visita abre otra
+                self.metrics.increment('reintentos_total', tipo='pagina_reemplazada')
+                await self.recycler.discard(page)
+                raise
+            finally:
+                self.recycler.navigated(page)
+            return count, page, engine, self.recycler.crashed(page)
+
+    def _record_profile_metrics(self, username: str, count: str, engine: str, worker_id: int,
+                                seconds: float, timings: dict):
+        status = status_label(count)
+        self.metrics.increment('perfiles_total', estado=status, origen='visita')
+        self.metrics.observe('perfil_segundos', seconds, motor=engine)
+        for stage, stage_seconds in timings.items():
+            self.metrics.observe('perfil_etapa_segundos', stage_seconds, etapa=stage)
+        self.metrics.event('perfil', username=username, estado=status, motor=engine, worker=worker_id + 1,
+                           seconds=round(seconds, 4), **{k: round(v, 4) for k, v in timings.items()})
+
+    async def _run_workers(self, next_item, writer, concurrency: int, total: int, listener=None) -> set:
+        """Lanza `concurrency` workers sobre la misma fuente y escribe cada resultado según llega.
+
+        `listener(username, conteo)` recibe además cada resultado. Devuelve los índices terminados,
+        para poder marcar lo que quedó a medias.
+        """
+        done = set()
+
+        def on_result(index, username, count):
+            done.add(index)
+            writer.write(username, count)
+            if self.cache:
+                self.cache.put(username, count)
+            if listener:
+                listener(username, count)
+
+        print(f"Procesando {total or 'los'} perfiles con {concurrency} worker(s) en paralelo "
+              f"(modo {self.fetch_mode})...")
+
+        workers = [
+            asyncio.create_task(self._scrape_worker(worker_id, next_item, on_result, total))
+            for worker_id in range(concurrency)
+        ]
+        outcomes = await asyncio.gather(*workers, return_exceptions=True)
+        for worker_id, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                print(f"El worker {worker_id + 1} terminó con error: {outcome}")
+        return done
+
+    async def _scrape_pending(self, pending: list[str], writer, concurrency: int):
+        """Reparte `pending` entre `concurrency` workers y escribe cada resultado según llega."""
+        # Cola de trabajo con el índice original; el CSV final se reordena según la entrada
+        queue = asyncio.Queue()
+        for item in enumerate(pending):
+            queue.put_nowait(item)
+
+        async def next_item():
+            try:
+                return queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return None
+
+        done = await self._run_workers(next_item, writer, max(1, min(concurrency, len(pending))), len(pending))
+
+        # Lo que un worker caído no llegó a procesar queda como ERROR (se reintenta al reanudar)
+        for index, username in enumerate(pending):
+            if index not in done:
+                writer.write(username, 'ERROR')
+
+    def serve_without_browser(self, pending: list[str], writer, known_counts: dict = None) -> list[str]:
+        """Escribe lo que ya se sabe sin visitar perfiles (Fase 1 y caché) y devuelve lo que falta."""
+        # Conteos que ya vinieron en las respuestas de la Fase 1: no hace falta visitar el perfil
+        if known_counts:
+            to_fetch = []
+            for username in pending:
+                if username in known_counts:
+                    writer.write(username, known_counts[username])
+                    self.metrics.increment('perfiles_total', estado=status_label(known_counts[username]),
+                                           origen='fase1')
+                    if self.cache:
+                        self.cache.put(username, known_counts[username])
+                else:
+                    to_fetch.append(username)
+            if len(to_fetch) < len(pending):
+                print(f"{len(pending) - len(to_fetch)} conteos ya conocidos por la Fase 1.")
+            pending = to_fetch
+
+        # Los aciertos vigentes de la caché se sirven sin abrir ninguna página
+        if self.cache:
+            to_fetch = []
+            for username in pending:
+                cached = self.cache.get(username)
+                if cached is None:
+                    to_fetch.append(username)
+                else:
+                    writer.write(username, cached)
+                    self.metrics.increment('perfiles_total', estado=status_label(cached), origen='cache')
+            pending = to_fetch
+            print(f"Caché: {self.cache.hits} perfiles servidos sin visitar, {len(pending)} por visitar.")
+        return pending
+
+    async def scrape_follower_counts_async(self, usernames_list: list[str], output_csv: str,
+                                           concurrency: int = 1, resume: bool = False,
+                                           flush_every: int = 25, known_counts: dict = None):
+        """Igual que `scrape_follower_counts`, dentro de un bucle ya en marcha (p. ej. con la sesión de la Fase 1)."""
         start_time = time.time()
         try:
-            if not await self._login_instagram():
+            # Reanudar: saltar los ya hechos y reintentar solo los ERROR / NO_ENCONTRADO
+            existing = results_store.load_existing_results(output_csv) if resume else {}
+            pending = results_store.pending_usernames(usernames_list, existing)
+            if resume and existing:
+                print(f"Reanudando: {len(usernames_list) - len(pending)} ya procesados, "
+                      f"{len(pending)} pendientes.")
+            if not pending:
+                print("No hay perfiles pendientes.")
                 return
 
-            resultados = []
-            for i, username in enumerate(usernames_list):
-                print(f"\n[{i + 1}/{len(usernames_list)}] @{username}")
-                await self.page.wait_for_timeout(random.randint(3000, 6000))
-                count = await self._get_follower_count(username)
-                resultados.append({'username': username, 'followers_count': count})
-                print(f"{username} → {count}")
+            with results_store.CountsCsvWriter(output_csv, flush_every, append=resume) as writer:
+                pending = self.serve_without_browser(pending, writer, known_counts)
 
-            self._save_results_to_csv(resultados, output_csv)
+                if pending:
+                    if not await self._login_instagram():
+                        return
+                    await self._scrape_pending(pending, writer, concurrency)
+
+            # Compactar: una fila por usuario, en el orden de entrada
+            final_results = results_store.load_existing_results(output_csv)
+            self._save_results_to_csv(results_store.ordered_results(usernames_list, final_results), output_csv)
 
         finally:
             print(f"Tiempo total: {time.time() - start_time:.2f}s")
+            self.wait_stats.print_report("Tiempos de espera (Fase 2)")
+            self.rate_controller.print_report("Ritmo de peticiones (Fase 2)")
+            self.recycler.print_report("Reciclado del navegador (Fase 2)")
+            self._flush_metrics()
+            if self.resource_blocker:
+                self.resource_blocker.print_report("Modo ligero (Fase 2)")
+            if self.cache:
+                self.cache.print_report()
+            if self.fetch_mode == "http":
+                print(f"Modo HTTP: {self.http_fallbacks} perfiles necesitaron el navegador.")
             await self._close_resources()
 
+    async def scrape_from_queue(self, work_queue, output_csv: str, concurrency: int = 1,
+                                total: int = 0, flush_every: int = 25):
+        """Consume (índice, usuario) de una cola compartida entre procesos hasta recibir None.
+
+        Los resultados van a `output_csv` (el archivo de este shard). Si el login falla no se toma
+        ningún trabajo, así el resto de shards se lo reparte.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def next_item():
+            return await loop.run_in_executor(None, work_queue.get)
+
+        start_time = time.time()
+        try:
+            if not await self._login_instagram():
+                return
+            with results_store.CountsCsvWriter(output_csv, flush_every) as writer:
+                await self._run_workers(next_item, writer, max(1, concurrency), total)
+        finally:
+            print(f"Tiempo del shard: {time.time() - start_time:.2f}s")
+            self.wait_stats.print_report("Tiempos de espera (shard)")
+            self.rate_controller.print_report("Ritmo de peticiones (shard)")
+            self.recycler.print_report("Reciclado del navegador (shard)")
+            self._flush_metrics()
+            await self._close_resources()
+
+    async def scrape_stream(self, source: asyncio.Queue, output_csv: str, concurrency: int = 1, listener=None,
+                            flush_every: int = 25):
+        """Fase 2 en tubería: consume (username, conteo o None) de `source` hasta None.
+
+        Se usa mientras la Fase 1 sigue descubriendo usuarios en el mismo bucle (y el mismo
+        navegador). Los conteos ya conocidos y los aciertos de caché se escriben directamente; el
+        login se pide con el primer perfil que de verdad hay que visitar (si la Fase 1 ya lo hizo,
+        se reutiliza). `listener(username, conteo)` recibe cada resultado.
+
+        Reanuda sobre `output_csv`: los usuarios con un resultado definitivo de una ejecución
+        anterior no se vuelven a visitar (el listener recibe ese resultado) y el CSV se amplía.
+        """
+        existing = results_store.load_existing_results(output_csv)
+        done = {username: count for username, count in existing.items()
+                if not results_store.pending_usernames([username], existing)}
+        if done:
+            print(f"Reanudando: {len(done)} perfiles ya procesados en {output_csv} no se repiten.")
+        order = []
+        next_index = 0
+        finished = False
+        logged_in = None
+        lock = asyncio.Lock()
+
+        def record(username, count):
+            writer.write(username, count)
+            if listener:
+                listener(username, count)
+
+        async def next_item():
+            nonlocal next_index, finished, logged_in
+            # Un solo worker lee la cola a la vez; el trabajo en sí se hace fuera del candado
+            async with lock:
+                while not finished:
+                    item = await source.get()
+                    if item is None:
+                        finished = True
+                        break
+                    username, count = item
+                    order.append(username)
+                    if username in done:
+                        if listener:
+                            listener(username, done[username])
+                        continue
+                    if count is not None:
+                        record(username, str(count))
+                        self.metrics.increment('perfiles_total', estado=status_label(count), origen='fase1')
+                        if self.cache:
+                            self.cache.put(username, str(count))
+                        continue
+                    cached = self.cache.get(username) if self.cache else None
+                    if cached is not None:
+                        record(username, cached)
+                        self.metrics.increment('perfiles_total', estado=status_label(cached), origen='cache')
+                        continue
+                    if logged_in is None:
+                        logged_in = await self._login_instagram()
+                    if not logged_in:
+                        # Sin sesión no se puede visitar nada, pero hay que seguir vaciando la cola
+                        record(username, 'ERROR')
+                        continue
+                    next_index += 1
+                    return next_index - 1, username
+                return None
+
+        start_time = time.time()
+        try:
+            with results_store.CountsCsvWriter(output_csv, flush_every, append=True) as writer:
+                await self._run_workers(next_item, writer, max(1, concurrency), 0, listener)
+
+            # Compactar: una fila por usuario, en el orden en que la Fase 1 los descubrió y solo los
+            # que pasaron por la cola (los mismos que vio el listener, no los de ejecuciones anteriores)
+            final_results = results_store.load_existing_results(output_csv)
+            self._save_results_to_csv(results_store.ordered_results(order, final_results), output_csv)
+        finally:
+            print(f"Tiempo de la Fase 2: {time.time() - start_time:.2f}s")
+            self.wait_stats.print_report("Tiempos de espera (Fase 2)")
+            self.rate_controller.print_report("Ritmo de peticiones (Fase 2)")
+            self.recycler.print_report("Reciclado del navegador (Fase 2)")
+            self._flush_metrics()
+            if self.cache:
+                self.cache.print_report()
+            await self._close_resources()
+
+    def _flush_metrics(self):
+        self.metrics.set_gauge('ritmo_peticiones', self.rate_controller.rate, fase='2')
+        if self.resource_blocker:
+            for kind, blocked in self.resource_blocker.blocked.items():
+                self.metrics.set_gauge('peticiones_bloqueadas', blocked, tipo=kind)
+        self.metrics.flush()
+
     async def _close_resources(self):
+        """Cierra el navegador si es propio; con una sesión compartida, solo la página de este scraper."""
         try:
-            if self.browser and not self._closed:
-                await self.browser.close()
-            if self.playwright and not self._closed:
-                await self.playwright.stop()
-            self._closed = True
+            if self._owns_session:
+                await self.session.close()
+            elif self.page and not self.page.is_closed():
+                await self.page.close()
         except:
             pass
 
-    def scrape_follower_counts(self, usernames_list: list[str], output_csv: str):
-        asyncio.run(self._scrape_follower_counts_async(usernames_list, output_csv))
+    def scrape_follower_counts(self, usernames_list: list[str], output_csv: str, concurrency: int = 1,
+                               resume: bool = False, flush_every: int = 25, known_counts: dict = None):
+        """Recopila los conteos usando `concurrency` páginas en paralelo dentro de la misma sesión.
+
+        Cada resultado se añade al CSV según llega (volcado cada `flush_every`). Con `resume=True`
+        se conservan los resultados ya escritos y solo se procesa lo pendiente o fallido.
+        `known_counts` ({username: conteo}) se escribe directamente sin visitar esos perfiles.
+        """
+        asyncio.run(self.scrape_follower_counts_async(usernames_list, output_csv, concurrency,
+                                                      resume, flush_every, known_counts))
 
     def close_driver(self):
         try:
-            if not self._closed:
+            if self._owns_session and not self.session.closed:
                 asyncio.run(self._close_resources())
         except:
             pass
@@ -0,0 +1,164 @@
+# rate_controller.py
+import asyncio
+import copy
+import threading
+import time
+from contextlib import asynccontextmanager
+
+# Resultados de perfil que indican que Instagram está frenando (o que la sesión se cayó)
+CONGESTION_STATUSES = {"ERROR", "TIMEOUT", "LIMITADO"}
+
+# Textos de la página de "espera unos minutos" / "inténtalo más tarde"
+THROTTLE_MARKERS = (
+    "Please wait a few minutes",
+    "Try again later",
+    "Espera unos minutos",
+    "Vuelve a intentarlo más tarde",
+    "Inténtalo de nuevo más tarde",
+)
+
+
+def is_login_redirect(url: str) -> bool:
+    """True si una navegación a un perfil acabó en la pantalla de login o en un checkpoint."""
+    return "/accounts/login" in url or "/challenge/" in url
+
+
+def looks_throttled(page_text: str) -> bool:
+    return any(marker in page_text for marker in THROTTLE_MARKERS)
+
+
+class RateController:
+    """Ritmo de peticiones de una cuenta: token bucket con ajuste AIMD.
+
+    Cada respuesta normal sube el ritmo un poco (`increase` peticiones/s) hasta `max_rate`; una
+    señal de congestión (429, redirección al login, "inténtalo más tarde", ERROR/TIMEOUT) lo
+    reduce a la mitad, vacía el cubo y, durante `cooldown` segundos, ignora nuevas señales para
+    no recortar varias veces por el mismo episodio. Además limita las peticiones en vuelo.
+
+    Lo comparten los workers de la Fase 2 (`slot()`) y el scroll de la Fase 1 (`throttle()`) en el
+    mismo bucle asyncio, como en la ejecución en tubería, donde ambas fases usan la misma cuenta.
+    """
+
+    def __init__(self, initial_rate: float = 0.3, min_rate: float = 0.05, max_rate: float = 2.0,
+                 increase: float = 0.02, decrease_factor: float = 0.5, burst: float = 2.0,
+                 max_in_flight: int = 2, cooldown: float = 30.0):
+        if not 0 < min_rate <= initial_rate <= max_rate:
+            raise ValueError("Se necesita 0 < min_rate <= initial_rate <= max_rate")
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.cooldown = cooldown
+
+        self._rate = initial_rate
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        self.in_flight = 0
+        self.successes = 0
+        self.congestion_signals = 0
+        self.decreases = 0
+        self.waited_seconds = 0.0
+        self.lowest_rate = initial_rate
+        self.highest_rate = initial_rate
+
+    # Cada proceso de un shard recibe su propia copia, sin el estado de sincronización
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"], state["_semaphore"]
+        state["in_flight"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._updated = time.monotonic()
+
+    def split(self, parts: int) -> "RateController":
+        """Copia para uno de `parts` procesos que usan la misma cuenta: el ritmo, la ráfaga y las
+        peticiones en vuelo se reparten entre ellos, así la cuenta en conjunto no pasa de los límites."""
+        share = copy.copy(self)
+        parts = max(1, int(parts))
+        if parts > 1:
+            for name in ("min_rate", "max_rate", "increase", "_rate", "lowest_rate", "highest_rate"):
+                setattr(share, name, getattr(self, name) / parts)
+            share.burst = max(1.0, self.burst / parts)
+            share.max_in_flight = max(1, self.max_in_flight // parts)
+            share._tokens = min(share._tokens, share.burst)
+            share._semaphore = asyncio.Semaphore(share.max_in_flight)
+        return share
+
+    @property
+    def rate(self) -> float:
+        """Ritmo actual en peticiones por segundo."""
+        return self._rate
+
+    def _reserve(self) -> float:
+        """Toma un token y devuelve cuánto hay que esperar hasta que esté disponible."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            self.waited_seconds += delay
+            return delay
+
+    @asynccontextmanager
+    async def slot(self):
+        """Espera turno (peticiones en vuelo y token) antes de una petición de la Fase 2."""
+        async with self._semaphore:
+            delay = self._reserve()
+            if delay:
+                await asyncio.sleep(delay)
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    async def throttle(self):
+        """Solo el token, para el scroll de la Fase 1 (una petición a la vez)."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self._rate = min(self.max_rate, self._rate + self.increase)
+            self.highest_rate = max(self.highest_rate, self._rate)
+
+    def record_congestion(self, reason: str = ""):
+        with self._lock:
+            self.congestion_signals += 1
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.decreases += 1
+            self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+            self.lowest_rate = min(self.lowest_rate, self._rate)
+            # Pausa: la siguiente petición espera un intervalo completo al nuevo ritmo
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = now
+        print(f"🐢 Congestión{f' ({reason})' if reason else ''}: ritmo reducido a {self._rate:.2f} peticiones/s")
+
+    def record_result(self, count: str):
+        """Clasifica el resultado de un perfil como respuesta normal o como señal de congestión."""
+        if count in CONGESTION_STATUSES:
+            self.record_congestion(count)
+        else:
+            self.record_success()
+
+    def print_report(self, title: str = "Ritmo de peticiones"):
+        print(f"\n🚦 {title}: {self._rate:.2f} peticiones/s al final "
+              f"(mín. {self.lowest_rate:.2f}, máx. {self.highest_rate:.2f}); "
+              f"{self.successes} respuestas normales, {self.congestion_signals} señales de congestión, "
+              f"{self.decreases} reducciones; {self.waited_seconds:.1f}s de espera acumulada.")
@@ -0,0 +1,65 @@
+# resource_blocker.py
+from collections import Counter
+
+# Tipos de recurso que no hacen falta para leer texto del perfil
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Endpoints de seguimiento conocidos
+TRACKING_KEYWORDS = [
+    "logging_client_events", "/ajax/bz", "bulk-route-definitions",
+    "facebook.com/tr", "connect.facebook.net", "google-analytics.com", "doubleclick.net",
+]
+
+
+def _is_tracking(url: str) -> bool:
+    return any(keyword in url for keyword in TRACKING_KEYWORDS)
+
+
+def _format_bytes(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ResourceBlocker:
+    """Modo "ligero" para Playwright: aborta imágenes, vídeo, fuentes y tracking en el contexto.
+
+    Las peticiones abortadas nunca se descargan, así que su tamaño no se conoce; el resumen
+    muestra cuántas se bloquearon por tipo y los bytes que sí se descargaron, para poder
+    comparar una ejecución ligera con una normal.
+    """
+
+    def __init__(self):
+        self.blocked = Counter()
+        self.allowed_requests = 0
+        self.bytes_downloaded = 0
+
+    async def attach(self, context):
+        await context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+
+    async def _handle_route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            self.blocked[request.resource_type] += 1
+            await route.abort()
+        elif _is_tracking(request.url):
+            self.blocked["tracking"] += 1
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            await route.continue_()
+
+    def _on_response(self, response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.bytes_downloaded += int(length)
+
+    def print_report(self, title: str = "Modo ligero"):
+        total_blocked = sum(self.blocked.values())
+        detalle = ", ".join(f"{tipo}={n}" for tipo, n in self.blocked.most_common())
+        print(f"\n🪶 {title}: {total_blocked} peticiones bloqueadas ({detalle or 'ninguna'}); "
+              f"{self.allowed_requests} permitidas, {_format_bytes(self.bytes_downloaded)} descargados.")
+
@@ -0,0 +1,105 @@
+# results_store.py
+import csv
+import os
+
+FIELDNAMES = ['username', 'followers_count']
+
+# Resultados que no se consideran definitivos y se reintentan al reanudar
+RETRY_STATUSES = {'ERROR', 'NO_ENCONTRADO', 'TIMEOUT', 'LIMITADO'}
+
+
+def load_existing_results(filename: str) -> dict:
+    """Lee un CSV de conteos (posiblemente interrumpido) → {username: followers_count}.
+
+    Si un usuario aparece varias veces gana la última fila, que es la más reciente.
+    """
+    results = {}
+    if not os.path.exists(filename):
+        return results
+    try:
+        with open(filename, mode='r', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                username = (row.get('username') or '').strip()
+                if username:
+                    results[username] = (row.get('followers_count') or '').strip()
+    except Exception as e:
+        print(f"Error al leer resultados previos de '{filename}': {e}")
+    return results
+
+
+def pending_usernames(usernames_list: list[str], existing: dict) -> list[str]:
+    """Usuarios que faltan por hacer: los no procesados y los que quedaron con error."""
+    return [u for u in usernames_list
+            if u not in existing or existing[u] in RETRY_STATUSES or existing[u] == '']
+
+
+def ordered_results(usernames_list: list[str], results: dict) -> list[dict]:
+    """Resultados sin duplicados en el orden de entrada, solo de los usuarios de la lista.
+
+    Los de ejecuciones anteriores que ya no están en la lista (cuentas que se dejaron de seguir)
+    se descartan: sirvieron para no repetir trabajo, pero no deben llegar al análisis.
+    """
+    rows = []
+    seen = set()
+    for username in usernames_list:
+        if username in results and username not in seen:
+            rows.append({'username': username, 'followers_count': results[username]})
+            seen.add(username)
+    return rows
+
+
+class CountsCsvWriter:
+    """Escribe cada resultado en el CSV según llega, volcando a disco por lotes."""
+
+    def __init__(self, filename: str, flush_every: int = 25, append: bool = False):
+        self.filename = filename
+        self.flush_every = max(1, flush_every)
+        self.append = append
+        self._buffer = []
+        self._file = None
+        self._writer = None
+        self.written = 0
+
+    def open(self):
+        write_header = not self.append or not os.path.exists(self.filename) \
+            or os.path.getsize(self.filename) == 0
+        self._file = open(self.filename, 'a' if self.append else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDNAMES)
+        if self.append and not write_header and not self._ends_with_newline():
+            # Una ejecución cortada puede dejar la última fila a medias
+            self._file.write('\r\n')
+        if write_header:
+            self._writer.writeheader()
+            self._file.flush()
+        return self
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.filename, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b'\n'
+
+    def write(self, username: str, followers_count: str):
+        self._buffer.append({'username': username, 'followers_count': followers_count})
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._file or not self._buffer:
+            return
+        self._writer.writerows(self._buffer)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        if self._file:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,52 @@
+# session_store.py
+import json
+import os
+import time
+
+SESSIONS_DIR = ".sessions"
+SESSION_COOKIE = "sessionid"
+# Página que exige sesión: si redirige al login, la sesión guardada ya no vale
+SESSION_CHECK_PATH = "/accounts/edit/"
+
+
+def default_session_path(username: str) -> str:
+    """Ruta del archivo de sesión (formato storage_state de Playwright) para una cuenta."""
+    return os.path.join(SESSIONS_DIR, f"{username}_state.json")
+
+
+def load_state(path: str):
+    """Devuelve el storage_state guardado o None si no existe o no tiene una cookie de sesión vigente."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    now = time.time()
+    for cookie in state.get("cookies", []):
+        if cookie.get("name") == SESSION_COOKIE and cookie.get("value"):
+            expires = cookie.get("expires", -1)
+            if expires in (-1, None) or expires > now:
+                return state
+    return None
+
+
+def save_state(path: str, state: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(tmp_path, path)
+    # Contiene cookies de sesión: solo legible por el usuario
+    try:
+        os.chmod(path, 0o600)
+    except OSError:
+        pass
+
+
+def delete_state(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
@@ -0,0 +1,166 @@
+# sharded_scraper.py
+import asyncio
+import multiprocessing
+import os
+import queue
+from collections import Counter
+
+import results_store
+from count_cache import FollowerCountCache
+from metrics import MetricsRecorder
+from profile_scraper import ProfileScraper
+from rate_controller import RateController
+
+# Cada cuánto se mira si los shards siguen vivos mientras se esperan sus métricas (segundos)
+RESULTS_POLL_SECONDS = 1
+
+
+def _shard_worker(shard_id: int, account: tuple, work_queue, metrics_queue, shard_csv: str,
+                  concurrency: int, total: int, scraper_kwargs: dict, cache_kwargs: dict,
+                  metrics: MetricsRecorder):
+    """Proceso de un shard: su propio navegador y su propia cuenta, tomando trabajo de la cola común.
+
+    Los eventos van directamente al JSON lines; los agregados vuelven al proceso principal por
+    `metrics_queue` al terminar.
+    """
+    cache = FollowerCountCache(**cache_kwargs) if cache_kwargs else None
+    scraper = ProfileScraper(account[0], account[1], cache=cache, metrics=metrics, **scraper_kwargs)
+    print(f"[shard {shard_id + 1}] Iniciando con la cuenta {account[0]}")
+    try:
+        asyncio.run(scraper.scrape_from_queue(work_queue, shard_csv, concurrency, total))
+    finally:
+        if cache:
+            cache.close()
+        metrics_queue.put(scraper.metrics.snapshot())
+
+
+def _collect_metrics(processes: list, metrics_queue, metrics: MetricsRecorder):
+    """Suma en `metrics` los agregados de cada shard según llegan. Se leen antes del join (un hijo
+    no termina hasta vaciar lo que puso en la cola) y sin bloquear si uno murió sin enviarlos."""
+    received = 0
+    while received < len(processes):
+        try:
+            snapshot = metrics_queue.get(timeout=RESULTS_POLL_SECONDS)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        metrics.merge(snapshot)
+        received += 1
+
+
+def shard_csv_path(output_csv: str, shard_id: int) -> str:
+    return f"{output_csv}.shard{shard_id}.csv"
+
+
+def merge_shard_results(usernames_list: list[str], output_csv: str, pending: list[str],
+                        partial_files: list[str], existing: dict = None):
+    """Une los resultados previos y los de cada shard en un solo CSV, sin duplicados y en orden.
+
+    Si un usuario aparece en varios archivos gana un resultado definitivo sobre uno a reintentar.
+    Lo pendiente que ningún shard llegó a procesar queda como ERROR, igual que en un solo proceso.
+    Solo se conservan los usuarios de `usernames_list`: las filas de ejecuciones anteriores de
+    cuentas que ya no están en la lista se descartan.
+    """
+    listed = set(usernames_list)
+    merged = {username: count for username, count in (existing or {}).items() if username in listed}
+    for partial in partial_files:
+        for username, count in results_store.load_existing_results(partial).items():
+            if username not in listed:
+                continue
+            previous = merged.get(username)
+            if previous is None or previous in results_store.RETRY_STATUSES or \
+                    count not in results_store.RETRY_STATUSES:
+                merged[username] = count
+    for username in pending:
+        merged.setdefault(username, 'ERROR')
+
+    rows = results_store.ordered_results(usernames_list, merged)
+    with results_store.CountsCsvWriter(output_csv, flush_every=len(rows) or 1) as writer:
+        for row in rows:
+            writer.write(row['username'], row['followers_count'])
+    print(f"Resultados de {len(partial_files)} archivos unidos en: {output_csv}")
+
+
+def run_sharded_scrape(usernames_list: list[str], output_csv: str, accounts: list[tuple],
+                       shards: int, concurrency: int = 1, resume: bool = True,
+                       known_counts: dict = None, cache_kwargs: dict = None, scraper_kwargs: dict = None,
+                       metrics: MetricsRecorder = None):
+    """Fase 2 repartida en `shards` procesos, cada uno con su navegador y (opcionalmente) su cuenta.
+
+    El trabajo sale de una cola común: un shard rápido simplemente toma más elementos. Al terminar,
+    los CSV de cada shard se unen en `output_csv` con el mismo formato que una ejecución normal.
+    `cache_kwargs` son los argumentos de FollowerCountCache: cada proceso abre su propia conexión.
+    Espera a los procesos de forma síncrona: desde código asíncrono, ejecútala en un hilo.
+    """
+    scraper_kwargs = scraper_kwargs or {}
+    metrics = metrics or MetricsRecorder()
+    existing = results_store.load_existing_results(output_csv) if resume else {}
+    pending = results_store.pending_usernames(usernames_list, existing)
+    if resume and existing:
+        print(f"Reanudando: {len(usernames_list) - len(pending)} ya procesados, {len(pending)} pendientes.")
+
+    # Lo que ya se sabe (Fase 1 y caché) se resuelve aquí, sin lanzar ningún navegador
+    served_csv = f"{output_csv}.served.csv"
+    cache = FollowerCountCache(**cache_kwargs) if cache_kwargs else None
+    try:
+        # Con las mismas métricas: los servidos de la Fase 1 y de la caché cuentan como en un solo proceso
+        planner = ProfileScraper(accounts[0][0], accounts[0][1], cache=cache, metrics=metrics)
+        with results_store.CountsCsvWriter(served_csv) as writer:
+            to_fetch = planner.serve_without_browser(pending, writer, known_counts)
+    finally:
+        if cache:
+            cache.print_report()
+            cache.close()
+
+    shards = max(1, min(shards, len(to_fetch)))
+    # Varios procesos con la misma cuenta se reparten su ritmo y sus peticiones en vuelo; cada
+    # proceso necesita al menos una, así que no puede haber más procesos por cuenta que ese límite
+    rate_controller = scraper_kwargs.get('rate_controller') or RateController()
+    max_shards = len(accounts) * rate_controller.max_in_flight
+    if shards > max_shards:
+        print(f"⚠️ {shards} procesos para {len(accounts)} cuenta(s) superan las peticiones en vuelo "
+              f"permitidas por cuenta ({rate_controller.max_in_flight}); se usan {max_shards}.")
+        shards = max_shards
+    shards_per_account = Counter(shard_id % len(accounts) for shard_id in range(shards))
+    shard_kwargs = [dict(scraper_kwargs, rate_controller=rate_controller.split(
+        shards_per_account[shard_id % len(accounts)])) for shard_id in range(shards)]
+    shard_files = [shard_csv_path(output_csv, shard_id) for shard_id in range(shards)]
+
+    if to_fetch:
+        print(f"\nRepartiendo {len(to_fetch)} perfiles entre {shards} procesos "
+              f"({len(accounts)} cuenta(s), {concurrency} worker(s) por proceso)...")
+        ctx = multiprocessing.get_context("spawn")
+        work_queue = ctx.Queue()
+        metrics_queue = ctx.Queue()
+        for item in enumerate(to_fetch):
+            work_queue.put(item)
+        # Una señal de fin por worker: cada uno se detiene al recibir la suya
+        for _ in range(shards * concurrency):
+            work_queue.put(None)
+
+        processes = [
+            ctx.Process(
+                target=_shard_worker,
+                args=(shard_id, accounts[shard_id % len(accounts)], work_queue, metrics_queue,
+                      shard_files[shard_id], concurrency, len(to_fetch), shard_kwargs[shard_id],
+                      cache_kwargs, metrics),
+                name=f"shard-{shard_id + 1}",
+            )
+            for shard_id in range(shards)
+        ]
+        for process in processes:
+            process.start()
+        _collect_metrics(processes, metrics_queue, metrics)
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                print(f"El proceso {process.name} terminó con código {process.exitcode}")
+        # Si algún shard murió, quedan elementos sin consumir: que no bloqueen la salida del proceso
+        work_queue.cancel_join_thread()
+        work_queue.close()
+
+    merge_shard_results(usernames_list, output_csv, pending, [served_csv] + shard_files, existing)
+    for partial in [served_csv] + shard_files:
+        if os.path.exists(partial):
+            os.remove(partial)
@@ -0,0 +1,51 @@
+# wait_stats.py
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class WaitStats:
+    """Registra cuánto tarda realmente cada punto de espera y resume p50/p95."""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+
+    def record(self, point: str, seconds: float):
+        self._samples[point].append(seconds)
+
+    @contextmanager
+    def measure(self, point: str):
+        """Mide el bloque (sirve también con `await` dentro, en código async)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(point, time.perf_counter() - start)
+
+    @staticmethod
+    def _percentile(sorted_values: list[float], pct: float) -> float:
+        # Percentil por rango más cercano: suficiente para tiempos de espera
+        rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def summary(self) -> dict:
+        resumen = {}
+        for point, values in self._samples.items():
+            ordered = sorted(values)
+            resumen[point] = {
+                'n': len(ordered),
+                'p50': self._percentile(ordered, 50),
+                'p95': self._percentile(ordered, 95),
+                'total': sum(ordered),
+            }
+        return resumen
+
+    def print_report(self, title: str = "Tiempos de espera"):
+        resumen = self.summary()
+        if not resumen:
+            return
+        print(f"\n⏱️ {title}:")
+        for point, s in sorted(resumen.items()):
+            print(f"   {point:<28} n={s['n']:<6} p50={s['p50'] * 1000:8.0f} ms   "
+                  f"p95={s['p95'] * 1000:8.0f} ms   total={s['total']:.1f}s")